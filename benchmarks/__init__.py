@@ -0,0 +1 @@
+"""Benchmarks dos dashboards (executar com `python -m benchmarks.<modulo>`)."""
@@ -0,0 +1,60 @@
+"""Custo de montar os dados dos cards: filtro no DataFrame por card vs. índice por (LINHA, posição)
+
+Compara, para todos os produtos de todas as linhas (o que a rotação percorre):
+- a busca anterior do dashprod (linha_data['DESCRPROD'] == descrprod, tabela inteira);
+- a do painel TV (máscara da LINHA e depois do produto);
+- a consulta ao índice montado uma vez por snapshot (mais o custo de montá-lo).
+
+Uso: python -m benchmarks.bench_cards [--linhas 65 1000 5000]
+"""
+import argparse
+
+from benchmarks.comum import carregar_amostra, cronometrar, escalar
+from dashcore.indice_cards import indexar_cards, produtos_na_linha
+from dashcore.processamento import processar_dados_base_real
+from dashcore.resumo import resumir_por_linha
+
+def busca_dashprod(df_processado, produtos):
+    """Referência: primeira linha do arquivo com a mesma descrição, em qualquer LINHA"""
+    for linha, descrprod in produtos:
+        produto_data = df_processado[df_processado['DESCRPROD'] == descrprod]
+        if not produto_data.empty:
+            produto_data['META_DIA'].iloc[0]
+            produto_data['DHAPO_LINHA'].iloc[0]
+
+def busca_tv(df_processado, produtos):
+    """Referência: máscara da LINHA e soma da meta do produto dentro dela"""
+    for linha, descrprod in produtos:
+        dados_linha = df_processado[df_processado['LINHA'] == linha]
+        dados_linha['META_DIA'][dados_linha['DESCRPROD'] == descrprod].sum()
+        dados_linha.iloc[0]['DHAPO_LINHA']
+
+def consulta_indice(indice_cards, linhas):
+    for linha in linhas:
+        for posicao in range(produtos_na_linha(indice_cards, linha)):
+            indice_cards.registro(linha, posicao)
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--linhas', type=int, nargs='+', default=[65, 1000, 5000],
+                        help="registros do df processado (a amostra é replicada como outras plantas)")
+    args = parser.parse_args()
+
+    amostra = carregar_amostra()
+    amostra = amostra[amostra['SEMANA_LABEL'] == amostra['SEMANA_LABEL'].max()]
+    print(f"{'registros':>9} | {'produtos':>8} | {'dashprod (ms)':>13} | {'TV (ms)':>8} | "
+          f"{'índice (ms)':>11} | {'montar índice (ms)':>18}")
+    for total in args.linhas:
+        df_processado = processar_dados_base_real(escalar(amostra, total))
+        produtos = list(zip(df_processado['LINHA'], df_processado['DESCRPROD']))
+        resumo_linhas = resumir_por_linha(df_processado)
+
+        tempo_indice_montar, indice_cards = cronometrar(indexar_cards, df_processado, resumo_linhas, repeticoes=3)
+        tempo_dashprod, _ = cronometrar(busca_dashprod, df_processado, produtos)
+        tempo_tv, _ = cronometrar(busca_tv, df_processado, produtos)
+        tempo_indice, _ = cronometrar(consulta_indice, indice_cards, list(resumo_linhas.index), repeticoes=5)
+        print(f"{len(df_processado):>9} | {len(produtos):>8} | {tempo_dashprod * 1000:>13.1f} | {tempo_tv * 1000:>8.1f} | "
+              f"{tempo_indice * 1000:>11.3f} | {tempo_indice_montar * 1000:>18.1f}")
+
+if __name__ == '__main__':
+    main()
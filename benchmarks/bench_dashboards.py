@@ -0,0 +1,183 @@
+"""Tempo por execução do dashprod.py e do dashprodtv.py sem navegador, com fixtures escaladas
+
+Cada fixture é um CSV no formato do ERP derivado do querygerencial.csv (veja
+comum.gerar_fixture), com N LINHAs na semana atual e M registros no arquivo,
+servido por HTTP local. Para cada fixture e cada script, o AppTest mede:
+- partida a frio: primeira execução de uma sessão com o processo sem snapshot
+  (nem em memória nem no cache em disco): download, leitura, processamento e grade;
+- rerun estável: execução completa sem nada mudar e ciclo do fragmento da grade;
+- atualização com dados novos: o arquivo servido troca de versão (novo
+  apontamento na semana atual) e o botão "Atualizar Dados" é clicado; conta
+  até o rerun com os dados novos terminar.
+
+Os resultados vão para um JSON (--saida); com --comparar, cada medida é
+confrontada com a do arquivo anterior (razão novo/anterior).
+
+Uso: python -m benchmarks.bench_dashboards [--linhas 50 500 2000] [--registros 1000 100000 1000000]
+         [--reruns 10] [--atualizacoes 3] [--saida ARQUIVO] [--comparar ARQUIVO]
+"""
+import argparse
+import json
+import logging
+import os
+import platform
+import statistics
+import tempfile
+import threading
+import time
+from datetime import datetime
+from pathlib import Path
+
+import streamlit as st
+from streamlit.testing.v1 import AppTest
+
+from benchmarks.bench_fragmento import reruns_de_fragmento
+from benchmarks.bench_rotacao import servir_amostra
+from benchmarks.comum import RAIZ, gerar_fixture
+from dashcore import cache_disco
+from dashcore.snapshot import AtualizadorSnapshot
+
+SCRIPTS = ['dashprod.py', 'dashprodtv.py']
+SAIDA_PADRAO = RAIZ / 'benchmarks' / 'resultados' / 'dashboards.json'
+MEDIDAS = ['partida_ms', 'rerun_ms', 'ciclo_ms', 'atualizacao_ms']
+TIMEOUT = 300  # segundos por execução do AppTest (fixtures de 1M registros)
+
+class FonteLocal:
+    """CSV servido por HTTP local cujo conteúdo pode ser trocado entre execuções"""
+
+    def __init__(self, diretorio):
+        self.caminho = Path(diretorio) / 'dados.csv'
+        self.caminho.write_bytes(b'')
+        self.servidor, self.url = servir_amostra(self.caminho)
+        self._mtime = time.time()
+
+    def publicar(self, conteudo):
+        temporario = self.caminho.with_suffix('.tmp')
+        temporario.write_bytes(conteudo)
+        # Last-Modified tem resolução de 1s: cada versão ganha um mtime maior que o da anterior
+        self._mtime += 2
+        os.utime(temporario, (self._mtime, self._mtime))
+        os.replace(temporario, self.caminho)
+
+    def encerrar(self):
+        self.servidor.shutdown()
+
+def _processo_sem_snapshot(url):
+    """Esquece o snapshot da URL: para as threads de atualização, limpa o cache_resource e o disco"""
+    # Fora de uma execução do script o clear() avisa que não há ScriptRunContext
+    logging.getLogger('streamlit.runtime.scriptrunner_utils.script_run_context').setLevel(logging.ERROR)
+    for thread in threading.enumerate():
+        if isinstance(thread, AtualizadorSnapshot):
+            thread.parar()
+    st.cache_resource.clear()
+    cache_disco.caminho_cache(url).unlink(missing_ok=True)
+
+def _executar(app):
+    inicio = time.perf_counter()
+    app.run()
+    tempo = (time.perf_counter() - inicio) * 1000
+    if app.exception:
+        raise RuntimeError(app.exception[0].value)
+    return tempo
+
+def medir(script, fonte, versoes, reruns, atualizacoes):
+    """{medida: ms} do script com a fonte publicando `versoes` em sequência (p50 nas repetidas)"""
+    _processo_sem_snapshot(fonte.url)
+    fonte.publicar(versoes[0])
+    app = AppTest.from_file(str(RAIZ / script), default_timeout=TIMEOUT)
+    app.session_state['github_url'] = fonte.url
+    try:
+        resultado = {'partida_ms': _executar(app)}
+        _executar(app)  # primeira execução com os dados já na sessão (monta o HTML da grade)
+        resultado['rerun_ms'] = statistics.median(_executar(app) for _ in range(reruns))
+        with reruns_de_fragmento(app):
+            resultado['ciclo_ms'] = statistics.median(_executar(app) for _ in range(reruns))
+        _executar(app)  # depois de um ciclo a árvore do AppTest só tem os elementos do fragmento
+
+        tempos = []
+        for i in range(atualizacoes):
+            fonte.publicar(versoes[(i + 1) % len(versoes)])
+            botao = next(botao for botao in app.button if botao.label == "🔄 Atualizar Dados")
+            botao.click()
+            tempos.append(_executar(app))
+        resultado['atualizacao_ms'] = statistics.median(tempos)
+    finally:
+        _processo_sem_snapshot(fonte.url)
+    return resultado
+
+def _chave(resultado):
+    return resultado['script'], resultado['linhas'], resultado['registros']
+
+def comparar(resultados, anterior):
+    """Razão novo/anterior de cada medida, casando script, linhas e registros"""
+    anteriores = {_chave(resultado): resultado for resultado in anterior['resultados']}
+    print(f"\nComparação com {anterior['gerado_em']} (novo / anterior; > 1 é mais lento)")
+    for resultado in resultados:
+        base = anteriores.get(_chave(resultado))
+        if base is None:
+            continue
+        razoes = " | ".join(f"{medida[:-3]} {resultado[medida] / base[medida]:.2f}x" for medida in MEDIDAS)
+        print(f"{resultado['script']:>13} | {resultado['linhas']:>6} | {resultado['registros']:>8} | {razoes}")
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--linhas', type=int, nargs='+', default=[50, 500, 2000],
+                        help="LINHAs distintas na semana atual")
+    parser.add_argument('--registros', type=int, nargs='+', default=[1000, 100000, 1000000],
+                        help="registros no arquivo (semana atual + histórico)")
+    parser.add_argument('--reruns', type=int, default=10)
+    parser.add_argument('--atualizacoes', type=int, default=3)
+    parser.add_argument('--saida', type=Path, default=SAIDA_PADRAO)
+    parser.add_argument('--comparar', type=Path, help="JSON de uma execução anterior")
+    args = parser.parse_args()
+
+    resultados = []
+    with tempfile.TemporaryDirectory() as diretorio:
+        fonte = FonteLocal(diretorio)
+        try:
+            print(f"{'script':>13} | {'linhas':>6} | {'registros':>8} | {'MB':>6} | {'partida':>8} | "
+                  f"{'rerun':>7} | {'ciclo':>7} | {'atualização':>11}  (ms)")
+            for linhas in args.linhas:
+                for registros in args.registros:
+                    versoes = [gerar_fixture(linhas, registros, variante) for variante in range(2)]
+                    conteudo, registros_semana = versoes[0]
+                    if registros_semana > registros:
+                        print(f"{'-':>13} | {linhas:>6} | {registros:>8} | a semana atual já tem "
+                              f"{registros_semana} registros; combinação ignorada")
+                        continue
+                    for script in SCRIPTS:
+                        medidas = medir(script, fonte, [versao for versao, _ in versoes],
+                                        args.reruns, args.atualizacoes)
+                        resultado = {
+                            'script': script,
+                            'linhas': linhas,
+                            'registros': registros,
+                            'registros_semana': registros_semana,
+                            'bytes': len(conteudo),
+                            **{medida: round(valor, 1) for medida, valor in medidas.items()},
+                        }
+                        resultados.append(resultado)
+                        print(f"{script:>13} | {linhas:>6} | {registros:>8} | {len(conteudo) / 1e6:>6.1f} | "
+                              f"{resultado['partida_ms']:>8.0f} | {resultado['rerun_ms']:>7.1f} | "
+                              f"{resultado['ciclo_ms']:>7.1f} | {resultado['atualizacao_ms']:>11.0f}")
+        finally:
+            fonte.encerrar()
+
+    anterior = None
+    if args.comparar is not None:
+        anterior = json.loads(args.comparar.read_text(encoding='utf-8'))
+    args.saida.parent.mkdir(parents=True, exist_ok=True)
+    args.saida.write_text(json.dumps({
+        'gerado_em': datetime.now().isoformat(timespec='seconds'),
+        'python': platform.python_version(),
+        'streamlit': st.__version__,
+        'reruns': args.reruns,
+        'atualizacoes': args.atualizacoes,
+        'resultados': resultados,
+    }, ensure_ascii=False, indent=1) + '\n', encoding='utf-8')
+    print(f"\nResultados salvos em {args.saida}")
+    if anterior is not None:
+        comparar(resultados, anterior)
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,94 @@
+"""Arquivo local (stat + cópia em blocos) vs. leitura inteira vs. download HTTP do mesmo CSV
+
+Para cada tamanho, grava o CSV do ERP em disco, servido também por HTTP local
+(sem cache em disco do repositório), e mede:
+- verificação sem mudança: stat() com a assinatura anterior (ler_arquivo) e
+  GET condicional com ETag/Last-Modified respondido com 304 (buscar_csv);
+- arquivo novo: obter os bytes, calcular o digest e dividir por semana
+  (particionar), por ler_arquivo (cópia em blocos para um temporário mapeado),
+  por Path.read_bytes() e por HTTP: tempo e pico de memória alocada pelo Python
+  (tracemalloc; as páginas mapeadas ficam de fora, são do cache de páginas do
+  sistema), sem partições anteriores e com as da
+  versão anterior (só a semana atual mudou, o caso do apontamento no dia).
+
+Uso: python -m benchmarks.bench_fonte_local [--registros 100000 1000000] [--repeticoes 3]
+"""
+import argparse
+import statistics
+import tempfile
+import time
+import tracemalloc
+
+from benchmarks.bench_dashboards import FonteLocal
+from benchmarks.comum import cronometrar, gerar_fixture
+from dashcore.fonte_github import buscar_csv, impressao_digital
+from dashcore.fonte_local import ler_arquivo
+from dashcore.semanas import particionar
+
+def mediana_us(funcao, *args, repeticoes):
+    tempos = []
+    for _ in range(repeticoes):
+        inicio = time.perf_counter()
+        funcao(*args)
+        tempos.append(time.perf_counter() - inicio)
+    return statistics.median(tempos) * 1e6
+
+def leitores(fonte):
+    """{nome: função que devolve os bytes (ou o mmap) do arquivo novo}"""
+    return {
+        'ler_arquivo': lambda: ler_arquivo(str(fonte.caminho))[1],
+        'read_bytes': fonte.caminho.read_bytes,
+        'http': lambda: buscar_csv(fonte.url)[1],
+    }
+
+def ler_e_particionar(ler, anteriores=None):
+    conteudo = ler()
+    versao = impressao_digital(conteudo)
+    particoes, _ = particionar(conteudo, anteriores)
+    return versao, len(particoes)
+
+def pico_memoria(funcao):
+    """MB do pico de alocações do Python durante a função"""
+    tracemalloc.start()
+    try:
+        funcao()
+        return tracemalloc.get_traced_memory()[1] / 2 ** 20
+    finally:
+        tracemalloc.stop()
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--registros', type=int, nargs='+', default=[100000, 1000000],
+                        help="registros no CSV (30 LINHAs na semana atual)")
+    parser.add_argument('--repeticoes', type=int, default=3, help="leituras do arquivo novo por medida (melhor)")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as diretorio:
+        fonte = FonteLocal(diretorio)
+        try:
+            for registros in args.registros:
+                anteriores, _ = particionar(gerar_fixture(30, registros)[0])
+                fonte.publicar(gerar_fixture(30, registros, variante=1)[0])
+                tamanho = fonte.caminho.stat().st_size / 2 ** 20
+                print(f"\n{registros} registros, {tamanho:.1f} MB")
+
+                assinatura = ler_arquivo(str(fonte.caminho))[2]
+                validadores_http = buscar_csv(fonte.url)[2]
+                stat_us = mediana_us(ler_arquivo, str(fonte.caminho), assinatura, repeticoes=1000)
+                http_us = mediana_us(buscar_csv, fonte.url, validadores_http, repeticoes=100)
+                print(f"sem mudança: stat {stat_us:.0f} µs | GET condicional 304 {http_us:.0f} µs")
+
+                print(f"{'leitura':>11} | {'ler+digest+particionar (ms)':>27} | {'pico Python (MB)':>16} | "
+                      f"{'com anteriores (ms)':>19} | {'pico (MB)':>9}")
+                for nome, ler in leitores(fonte).items():
+                    tempo, _ = cronometrar(ler_e_particionar, ler, repeticoes=args.repeticoes)
+                    pico = pico_memoria(lambda: ler_e_particionar(ler))
+                    tempo_anteriores, _ = cronometrar(ler_e_particionar, ler, anteriores, repeticoes=args.repeticoes)
+                    pico_anteriores = pico_memoria(lambda: ler_e_particionar(ler, anteriores))
+                    print(f"{nome:>11} | {tempo * 1000:>27.1f} | {pico:>16.1f} | "
+                          f"{tempo_anteriores * 1000:>19.1f} | {pico_anteriores:>9.1f}")
+        finally:
+            fonte.encerrar()
+
+if __name__ == '__main__':
+    main()
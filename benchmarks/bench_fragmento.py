@@ -0,0 +1,76 @@
+"""Tempo de um ciclo de atualização: rerun do script inteiro vs. rerun só do fragmento da grade
+
+Roda cada dashboard no AppTest contra o CSV de exemplo servido localmente e
+mede o rerun completo (o que cada tique do st_autorefresh custava) e, quando o
+script registra fragmentos, o rerun só deles (o que o tique do
+st.fragment(run_every=...) custa).
+
+Uso: python -m benchmarks.bench_fragmento [--reruns 20]
+"""
+import argparse
+import functools
+import time
+from contextlib import contextmanager
+
+import streamlit.testing.v1.local_script_runner as local_script_runner
+from streamlit.testing.v1 import AppTest
+
+from benchmarks.bench_pagina import ContadorMensagens
+from benchmarks.bench_rotacao import servir_amostra
+from benchmarks.comum import RAIZ
+
+@contextmanager
+def reruns_de_fragmento(app):
+    """Faz os app.run() seguintes reexecutarem só os fragmentos registrados, como no tique do run_every"""
+    original = local_script_runner.RerunData
+    fragmentos = list(app._fragment_storage._fragments)
+    local_script_runner.RerunData = functools.partial(original, fragment_id_queue=fragmentos, is_auto_rerun=True)
+    try:
+        yield
+    finally:
+        local_script_runner.RerunData = original
+
+def _cronometrar_reruns(app, reruns):
+    melhor = float('inf')
+    with ContadorMensagens() as contador:
+        for _ in range(reruns):
+            inicio = time.perf_counter()
+            app.run()
+            melhor = min(melhor, time.perf_counter() - inicio)
+    if app.exception:
+        raise RuntimeError(app.exception[0].value)
+    return melhor * 1000, contador.mensagens / reruns, contador.bytes / reruns / 1024
+
+def medir(script, url, no_navegador, reruns):
+    """{'completo': (ms, deltas, KB), 'fragmento': (ms, deltas, KB) ou None}"""
+    app = AppTest.from_file(str(RAIZ / script), default_timeout=60)
+    app.session_state['github_url'] = url
+    app.session_state['rotacao_no_navegador'] = no_navegador
+    app.run()  # primeira execução: download e imports fora da medida
+    resultado = {'completo': _cronometrar_reruns(app, reruns), 'fragmento': None}
+
+    if app._fragment_storage._fragments:
+        with reruns_de_fragmento(app):
+            resultado['fragmento'] = _cronometrar_reruns(app, reruns)
+    return resultado
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--reruns', type=int, default=20)
+    args = parser.parse_args()
+
+    servidor, url = servir_amostra()
+    try:
+        print(f"{'script':>13} | {'rotação':>9} | {'rerun':>10} | {'ms':>6} | {'deltas':>6} | {'KB':>6}")
+        for script in ['dashprod.py', 'dashprodtv.py']:
+            for nome, no_navegador in [('servidor', False), ('navegador', True)]:
+                resultado = medir(script, url, no_navegador, args.reruns)
+                for escopo, medida in resultado.items():
+                    if medida is not None:
+                        tempo, mensagens, tamanho = medida
+                        print(f"{script:>13} | {nome:>9} | {escopo:>10} | {tempo:>6.1f} | {mensagens:>6.0f} | {tamanho:>6.1f}")
+    finally:
+        servidor.shutdown()
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,93 @@
+"""Compara o gauge Plotly (go.Indicator) com o gauge SVG inline por página de cards
+
+Mede o CPU do servidor para montar e serializar os gauges de uma página e os bytes
+que vão para o navegador (spec JSON do st.plotly_chart vs. markup do SVG).
+
+Uso: python -m benchmarks.bench_gauge [--cards 4 10 55] [--repeticoes 5]
+"""
+import argparse
+import time
+
+import plotly.graph_objects as go
+import plotly.io as pio
+import plotly.tools
+
+from dashcore.gauge_svg import gerar_gauge_svg
+
+def create_gauge_chart_plotly(percentual, height=150):
+    """Versão anterior dos dashboards, mantida como referência"""
+    if percentual >= 85:
+        color = "#2878a7"
+    elif percentual >= 70:
+        color = "#28a745"
+    elif percentual >= 50:
+        color = "#ffc107"
+    else:
+        color = "#dc3545"
+
+    fig = go.Figure(go.Indicator(
+        mode="gauge+number",
+        value=percentual,
+        number={'suffix': '%', 'font': {'size': 50}, 'valueformat': '.0f'},
+        domain={'x': [0, 1], 'y': [0, 1]},
+        gauge={
+            'axis': {'range': [None, 100], 'tickwidth': 0, 'tickcolor': "rgba(0,0,0,0)", 'showticklabels': False},
+            'bar': {'color': color, 'thickness': 1},
+            'bgcolor': "white",
+            'borderwidth': 0,
+            'bordercolor': "black",
+            'steps': [
+                {'range': [0, 50], 'color': '#f8f9fa'},
+                {'range': [50, 70], 'color': '#e9ecef'},
+                {'range': [70, 100], 'color': '#dee2e6'}],
+            'threshold': {'line': {'color': "red", 'width': 4}, 'thickness': 0.85, 'value': 90}}))
+
+    fig.update_layout(
+        height=height,
+        margin=dict(l=10, r=10, t=10, b=10),
+        font={'family': "Arial"},
+        paper_bgcolor='rgba(0,0,0,0)',
+        plot_bgcolor='rgba(0,0,0,0)'
+    )
+    return fig
+
+def pagina_plotly(percentuais):
+    """O que st.plotly_chart faz por card: valida a figura e serializa o spec"""
+    specs = []
+    for percentual in percentuais:
+        figura = plotly.tools.return_figure_from_figure_or_data(create_gauge_chart_plotly(percentual), True)
+        specs.append(pio.to_json(figura, validate=False))
+    return specs
+
+def pagina_svg(percentuais):
+    return [gerar_gauge_svg(percentual) for percentual in percentuais]
+
+def medir(funcao, percentuais, repeticoes):
+    """Melhor tempo de CPU (s) entre as repetições e o total de bytes gerados"""
+    melhor = float('inf')
+    for _ in range(repeticoes):
+        inicio = time.process_time()
+        saidas = funcao(percentuais)
+        melhor = min(melhor, time.process_time() - inicio)
+    return melhor, sum(len(saida.encode('utf-8')) for saida in saidas)
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--cards', type=int, nargs='+', default=[4, 10, 55],
+                        help='Cards por página (55 = todas as linhas do CSV de exemplo no painel TV)')
+    parser.add_argument('--repeticoes', type=int, default=5)
+    args = parser.parse_args()
+
+    # Aquecimento: a primeira figura Plotly carrega os validadores do pacote
+    pagina_plotly([50])
+
+    print(f"{'cards':>5} | {'plotly CPU (ms)':>15} | {'plotly KB':>9} | {'svg CPU (ms)':>12} | {'svg KB':>6} | {'CPU':>6} | {'bytes':>6}")
+    for cards in args.cards:
+        percentuais = [(i * 37) % 120 for i in range(cards)]
+        cpu_plotly, bytes_plotly = medir(pagina_plotly, percentuais, args.repeticoes)
+        cpu_svg, bytes_svg = medir(pagina_svg, percentuais, args.repeticoes)
+        print(f"{cards:>5} | {cpu_plotly * 1000:>15.1f} | {bytes_plotly / 1024:>9.1f} | {cpu_svg * 1000:>12.2f} | "
+              f"{bytes_svg / 1024:>6.1f} | {cpu_plotly / cpu_svg:>5.0f}x | {bytes_plotly / bytes_svg:>5.1f}x")
+
+if __name__ == '__main__':
+    main()
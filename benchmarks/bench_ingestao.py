@@ -0,0 +1,71 @@
+"""Pico de memória da ingestão de exportações grandes por HTTP: download, primeira carga, versão nova
+
+Para cada tamanho, serve o CSV do ERP por HTTP local e mede com tracemalloc o
+pico de memória alocada pelo Python e o tempo de:
+- buscar_csv sozinho (download do corpo);
+- atualizar() de um repositório novo com cache em disco (download, digest,
+  partições, semana atual processada e cache gravado);
+- atualizar() depois de uma versão nova só na semana atual;
+- a primeira consulta de um repositório novo no mesmo diretório (partida pelo cache).
+Mostra também os bytes crus das semanas que ficam no heap depois da carga.
+
+Uso: python -m benchmarks.bench_ingestao [--registros 100000 1000000]
+"""
+import argparse
+import tempfile
+import time
+import tracemalloc
+
+from benchmarks.bench_dashboards import FonteLocal
+from benchmarks.comum import gerar_fixture
+from dashcore.fonte_github import buscar_csv
+from dashcore.instrumentacao import relatorio_memoria
+from dashcore.snapshot import RepositorioSnapshots
+
+def medir(funcao):
+    """(resultado, segundos, MB do pico de alocações do Python)"""
+    tracemalloc.start()
+    try:
+        inicio = time.perf_counter()
+        resultado = funcao()
+        return resultado, time.perf_counter() - inicio, tracemalloc.get_traced_memory()[1] / 2 ** 20
+    finally:
+        tracemalloc.stop()
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--registros', type=int, nargs='+', default=[100000, 1000000],
+                        help="registros no CSV (30 LINHAs na semana atual)")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as diretorio:
+        fonte = FonteLocal(diretorio)
+        try:
+            print(f"{'registros':>9} | {'MB':>6} | {'etapa':>15} | {'tempo (ms)':>10} | {'pico Python (MB)':>16} | "
+                  f"{'semanas no heap (MB)':>20}")
+            for registros in args.registros:
+                fonte.publicar(gerar_fixture(30, registros)[0])
+                tamanho = fonte.caminho.stat().st_size / 2 ** 20
+                with tempfile.TemporaryDirectory() as diretorio_cache:
+                    repositorio = RepositorioSnapshots(diretorio_cache=diretorio_cache)
+                    nova_versao = gerar_fixture(30, registros, variante=1)[0]
+                    etapas = [
+                        ('download', None, lambda: buscar_csv(fonte.url) and None),
+                        ('primeira carga', None, lambda: repositorio.atualizar(fonte.url)),
+                        ('versão nova', lambda: fonte.publicar(nova_versao), lambda: repositorio.atualizar(fonte.url)),
+                        ('cache em disco', None,
+                         lambda: RepositorioSnapshots(diretorio_cache=diretorio_cache).obter(fonte.url)),
+                    ]
+                    for nome, preparar, etapa in etapas:
+                        if preparar is not None:
+                            preparar()  # fora da medida
+                        snapshot, tempo, pico = medir(etapa)
+                        heap = f"{relatorio_memoria(snapshot)['particoes'] / 2 ** 20:.1f}" if snapshot else "-"
+                        print(f"{registros:>9} | {tamanho:>6.1f} | {nome:>15} | {tempo * 1000:>10.0f} | "
+                              f"{pico:>16.1f} | {heap:>20}")
+                    repositorio.parar_atualizacoes()
+        finally:
+            fonte.encerrar()
+
+if __name__ == '__main__':
+    main()
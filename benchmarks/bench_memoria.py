@@ -0,0 +1,56 @@
+"""Memória da semana atual processada: layout anterior vs. compacto
+
+Para cada tamanho, processa a amostra replicada como outras plantas e compara:
+- o df processado com textos por registro, float64 e int64 (layout anterior)
+  e com categorias, float32 e int32;
+- o índice dos cards como dict de registros por (LINHA, posição) (layout
+  anterior) e em colunas (IndiceCards).
+O resumo das linhas aparece como referência.
+
+Uso: python -m benchmarks.bench_memoria [--linhas 1000 10000]
+"""
+import argparse
+
+from benchmarks.comum import carregar_amostra, escalar
+from dashcore.indice_cards import indexar_cards, produtos_na_linha
+from dashcore.instrumentacao import tamanho_profundo
+from dashcore.processamento import COLUNAS_CATEGORICAS, processar_dados_base_real
+from dashcore.resumo import resumir_por_linha
+
+def layout_anterior(df_processado):
+    """Mesmo df com os tipos de antes: texto em cada registro, float64 e int64"""
+    return df_processado.astype({
+        **{coluna: str for coluna in COLUNAS_CATEGORICAS},
+        'SEQ': 'int64', 'META_DIA': 'int64',
+        'QTDAPONTADA': 'float64', 'TOTALSEMANA': 'float64', 'PERC': 'float64', 'SALDOSEMANA': 'float64',
+    })
+
+def indice_anterior(indice_cards):
+    """Mesmo índice no layout anterior: um dict de registro por (LINHA, posição)"""
+    return {(linha, posicao): indice_cards.registro(linha, posicao)
+            for linha in indice_cards.linhas for posicao in range(produtos_na_linha(indice_cards, linha))}
+
+def _kb(objeto):
+    return tamanho_profundo(objeto) / 1024
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--linhas', type=int, nargs='+', default=[1000, 10000],
+                        help="registros do df processado (a amostra é replicada como outras plantas)")
+    args = parser.parse_args()
+
+    amostra = carregar_amostra()
+    amostra = amostra[amostra['SEMANA_LABEL'] == amostra['SEMANA_LABEL'].max()]
+    print(f"{'registros':>9} | {'df antes (KB)':>13} | {'df agora (KB)':>13} | "
+          f"{'resumo (KB)':>11} | {'índice antes (KB)':>17} | {'índice agora (KB)':>17}")
+    for total in args.linhas:
+        df_processado = processar_dados_base_real(escalar(amostra, total))
+        anterior = layout_anterior(df_processado)
+        resumo_linhas = resumir_por_linha(df_processado)
+        indice_cards = indexar_cards(df_processado, resumo_linhas)
+        print(f"{len(df_processado):>9} | {_kb(anterior):>13.0f} | {_kb(df_processado):>13.0f} | "
+              f"{_kb(resumo_linhas):>11.0f} | {_kb(indice_anterior(indice_cards)):>17.0f} | "
+              f"{_kb(indice_cards):>17.0f}")
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,124 @@
+"""Mede o payload e o tempo por rerun da grade de cards: elementos Streamlit vs. HTML único
+
+Roda a mesma página no AppTest (sem navegador) pelos dois caminhos, a partir do
+mesmo modelo de cards, e conta as mensagens/bytes que o servidor enviaria pelo
+websocket (ForwardMsg com delta, antes da compressão).
+
+Uso: python -m benchmarks.bench_pagina [--cards 4 10 30] [--reruns 20]
+"""
+import argparse
+import time
+
+from streamlit.runtime.forward_msg_queue import ForwardMsgQueue
+from streamlit.testing.v1 import AppTest
+
+from benchmarks.comum import carregar_amostra
+from dashcore.indice_cards import indexar_cards
+from dashcore.processamento import processar_dados_base_real
+from dashcore.resumo import resumir_por_linha
+
+def montar_cards(total):
+    """Modelos de card das primeiras `total` linhas do CSV de exemplo (primeiro produto de cada)"""
+    df_processado = processar_dados_base_real(carregar_amostra())
+    resumo = resumir_por_linha(df_processado)
+    indice = indexar_cards(df_processado, resumo)
+    cards = []
+    for linha in resumo.index[:total]:
+        registro = indice.registro(linha, 0)
+        cards.append({**registro, 'linha_exibida': linha, 'descrprod_exibido': registro['descrprod']})
+    return cards
+
+def pagina_elementos(cards):
+    """Caminho anterior: cada card emite vários st.markdown, um st.columns e um st.metric"""
+    import streamlit as st
+
+    from dashcore.gauge_svg import gerar_gauge_svg
+
+    for row in range(0, len(cards), 2):
+        cols = st.columns(2)
+        for col, card in zip(cols, cards[row:row + 2]):
+            with col:
+                cor = card['cor']
+                st.markdown(f"""
+                <div style="border: 3px solid {cor}; border-radius: 12px; padding: 12px; margin: 8px; background: {cor}20; height: 80px;">
+                    <h4 style="color: white; margin: 0; font-size: 24px;" title="{card['linha']}">{card['linha_exibida']}</h4>
+                    <span style="font-size: 12px; color: {cor}; font-weight: bold;">{card['icone']}</span>
+                """, unsafe_allow_html=True)
+                st.markdown(f"<div style='font-size: 20px; color: white;' title='{card['descrprod']}'>{card['descrprod_exibido']}</div>", unsafe_allow_html=True)
+                st.markdown(f"<div style='font-size: 20px; color: white;'>| ⚙️: {card['posicao_produto']}º | ✅: {card['qtd_produzida_texto']} | 🎯: {card['meta_texto']} | 📊: {card['percentual_produto_texto']} |</div>", unsafe_allow_html=True)
+                st.markdown(f"""
+                <div style="background: #e9ecef; border-radius: 10px; height: 30px; margin: 8px 0; position: relative;">
+                    <div style="background: {cor}; border-radius: 10px; height: 100%; width: {min(card['percentual_linha'], 100)}%;"></div>
+                    <div style="position: absolute; top: 0; left: 0; right: 0; bottom: 0; font-size: 26px; font-weight: bold;">
+                        {card['total_produzido_texto']} / {card['total_objetivo_texto']}
+                    </div>
+                </div>
+                """, unsafe_allow_html=True)
+                col1, col2 = st.columns(2)
+                with col1:
+                    st.markdown(gerar_gauge_svg(card['percentual_linha']), unsafe_allow_html=True)
+                    st.markdown("<style>div[data-testid=\"stMetricValue\"] {font-size: 24px !important;}</style>", unsafe_allow_html=True)
+                with col2:
+                    st.metric("Último Apontamento", card['ultimo_apontamento'] or "N/A")
+                    st.markdown(f"<p style='color: white; font-weight: bold;'>📦 {card['posicao_produto']}/{card['total_produtos']} produtos</p>", unsafe_allow_html=True)
+
+def pagina_html(cards):
+    """Caminho novo: a grade inteira em um único st.markdown"""
+    import streamlit as st
+
+    from dashcore.pagina_html import renderizar_pagina
+
+    st.markdown(renderizar_pagina(cards, colunas=2), unsafe_allow_html=True)
+
+class ContadorMensagens:
+    """Conta as mensagens com delta e seus bytes serializados enfileirados para o navegador"""
+
+    def __init__(self):
+        self.mensagens = 0
+        self.bytes = 0
+        self._enqueue_original = ForwardMsgQueue.enqueue
+
+    def __enter__(self):
+        contador = self
+
+        def enqueue(fila, msg):
+            if msg.HasField('delta'):
+                contador.mensagens += 1
+                contador.bytes += msg.ByteSize()
+            return contador._enqueue_original(fila, msg)
+
+        ForwardMsgQueue.enqueue = enqueue
+        return self
+
+    def __exit__(self, *erro):
+        ForwardMsgQueue.enqueue = self._enqueue_original
+
+def medir(script, cards, reruns):
+    """(mensagens por rerun, bytes por rerun, melhor tempo de rerun em ms)"""
+    app = AppTest.from_function(script, args=(cards,), default_timeout=60)
+    app.run()  # primeira execução: imports e cache do script fora da medida
+    melhor = float('inf')
+    with ContadorMensagens() as contador:
+        for _ in range(reruns):
+            inicio = time.perf_counter()
+            app.run()
+            melhor = min(melhor, time.perf_counter() - inicio)
+    if app.exception:
+        raise RuntimeError(app.exception[0].value)
+    return contador.mensagens / reruns, contador.bytes / reruns, melhor * 1000
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--cards', type=int, nargs='+', default=[4, 10, 30])
+    parser.add_argument('--reruns', type=int, default=20)
+    args = parser.parse_args()
+
+    print(f"{'cards':>5} | {'caminho':>9} | {'deltas':>6} | {'KB':>6} | {'rerun (ms)':>10}")
+    for total in args.cards:
+        cards = montar_cards(total)
+        for nome, script in [('elementos', pagina_elementos), ('html', pagina_html)]:
+            mensagens, tamanho, tempo = medir(script, cards, args.reruns)
+            print(f"{len(cards):>5} | {nome:>9} | {mensagens:>6.0f} | {tamanho / 1024:>6.1f} | {tempo:>10.1f}")
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,101 @@
+"""Partida a frio do dashprod.py e do dashprodtv.py: imports e tempo até o primeiro card
+
+Cada medida roda em um processo Python novo (nada importado, nenhum
+cache_resource), com -X importtime. O Streamlit é importado antes da marca; o
+que vier depois dela é o que o script importa na primeira execução. Mede:
+- ms de imports do script (soma dos imports de topo depois da marca) e os mais caros;
+- ms da primeira execução no AppTest até a grade com os cards (inclui os imports);
+- se requests foi carregado.
+Cenários: 'amostra' (sem URL, dados de exemplo), 'url' (CSV por HTTP local sem
+cache em disco) e 'cache_disco' (mesma URL com o snapshot gravado por uma
+execução anterior).
+
+Uso: python -m benchmarks.bench_partida [--repeticoes 3] [--linhas 30]
+"""
+import argparse
+import json
+import statistics
+import subprocess
+import sys
+import tempfile
+
+from benchmarks.bench_dashboards import SCRIPTS, FonteLocal
+from benchmarks.comum import RAIZ, gerar_fixture
+from dashcore import cache_disco
+
+MARCA = 'MARCA_PARTIDA'
+CENARIOS = ['amostra', 'url', 'cache_disco']
+
+CODIGO = """
+import json, logging, sys, time
+from streamlit.testing.v1 import AppTest
+logging.getLogger('streamlit.runtime.scriptrunner_utils.script_run_context').setLevel(logging.ERROR)
+print({marca!r}, file=sys.stderr, flush=True)
+app = AppTest.from_file({script!r}, default_timeout=120)
+app.session_state['github_url'] = {url!r}
+inicio = time.perf_counter()
+app.run()
+primeiro_card = (time.perf_counter() - inicio) * 1000
+cards = sum('dp-linha' in elemento.proto.body for elemento in app.get('html'))
+print(json.dumps({{'primeiro_card_ms': primeiro_card, 'cards': cards, 'excecao': bool(app.exception),
+                  'requests': 'requests' in sys.modules}}))
+"""
+
+def imports_de_topo(stderr):
+    """{módulo: ms cumulativos} dos imports de topo registrados depois da marca"""
+    depois = stderr.split(MARCA, 1)[1]
+    imports = {}
+    for linha in depois.splitlines():
+        if not linha.startswith('import time:'):
+            continue
+        _, cumulativo, nome = linha.split('|')
+        # Um espaço antes do nome: import de topo (os aninhados já estão no cumulativo)
+        if nome.startswith(' ') and not nome.startswith('  ') and cumulativo.strip().isdigit():
+            imports[nome.strip()] = int(cumulativo) / 1000
+    return imports
+
+def medir(script, url):
+    """Uma partida a frio em um processo novo"""
+    codigo = CODIGO.format(marca=MARCA, script=str(RAIZ / script), url=url)
+    processo = subprocess.run([sys.executable, '-X', 'importtime', '-c', codigo], cwd=RAIZ,
+                              capture_output=True, text=True, timeout=300)
+    resultado = json.loads(processo.stdout.strip().splitlines()[-1])
+    if resultado['excecao'] or not resultado['cards']:
+        raise RuntimeError(f"{script} sem cards na primeira execução")
+    resultado['imports'] = imports_de_topo(processo.stderr)
+    return resultado
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--repeticoes', type=int, default=3, help="processos por medida (mediana)")
+    parser.add_argument('--linhas', type=int, default=30, help="LINHAs na semana atual do CSV")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as diretorio:
+        fonte = FonteLocal(diretorio)
+        try:
+            fonte.publicar(gerar_fixture(args.linhas, 0)[0])
+            print(f"{'script':>13} | {'cenário':>11} | {'imports (ms)':>12} | {'1º card (ms)':>12} | "
+                  f"{'requests':>8} | imports mais caros")
+            for script in SCRIPTS:
+                for cenario in CENARIOS:
+                    url = '' if cenario == 'amostra' else fonte.url
+                    if cenario == 'cache_disco':
+                        medir(script, url)  # grava o snapshot em disco
+                    medidas = []
+                    for _ in range(args.repeticoes):
+                        if cenario == 'url':
+                            cache_disco.caminho_cache(url).unlink(missing_ok=True)
+                        medidas.append(medir(script, url))
+                    imports = statistics.median(sum(m['imports'].values()) for m in medidas)
+                    primeiro_card = statistics.median(m['primeiro_card_ms'] for m in medidas)
+                    caros = sorted(medidas[-1]['imports'].items(), key=lambda item: -item[1])[:3]
+                    print(f"{script:>13} | {cenario:>11} | {imports:>12.0f} | {primeiro_card:>12.0f} | "
+                          f"{'sim' if medidas[-1]['requests'] else 'não':>8} | "
+                          + ", ".join(f"{nome} {ms:.0f}" for nome, ms in caros))
+            cache_disco.caminho_cache(fonte.url).unlink(missing_ok=True)
+        finally:
+            fonte.encerrar()
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,106 @@
+"""Compara o processar_dados_base_real antigo (iterrows) com o colunar
+
+Uso: python -m benchmarks.bench_processamento [--linhas 100000 1000000]
+"""
+import argparse
+
+import pandas as pd
+
+from benchmarks.comum import carregar_amostra, cronometrar, escalar
+from dashcore.processamento import COLUNAS_CATEGORICAS, detectar_coluna_dia, obter_dia_atual, processar_dados_base_real
+
+def processar_dados_base_real_iterrows(df):
+    """Implementação original linha a linha, mantida apenas como referência"""
+    if df is None or df.empty:
+        return pd.DataFrame()
+
+    coluna_dia_atual = detectar_coluna_dia(df)
+    dia_atual_nome = obter_dia_atual()
+
+    dados_processados = []
+
+    dh_apontamento_por_linha = {}
+    if 'DHAPO' in df.columns:
+        for linha in df['LINHA'].unique():
+            dh_linha = df[df['LINHA'] == linha]['DHAPO']
+            dh_validos = [dh for dh in dh_linha if pd.notna(dh)]
+            if dh_validos:
+                try:
+                    dh_dates = [pd.to_datetime(dh) for dh in dh_validos]
+                    dh_apontamento_por_linha[linha] = max(dh_dates)
+                except:
+                    dh_apontamento_por_linha[linha] = dh_validos[-1]
+
+    for index, row in df.iterrows():
+        try:
+            if pd.isna(row['LINHA']) or row['LINHA'] == '':
+                continue
+
+            linha = str(row['LINHA']).strip()
+            descrprod = str(row['DESCRPROD']).strip()
+
+            try:
+                meta_dia_atual = float(row[coluna_dia_atual]) if pd.notna(row[coluna_dia_atual]) else 0
+            except KeyError:
+                meta_dia_atual = 0
+
+            try:
+                qtd_apontada = float(row['QTDAPONTADA']) if pd.notna(row['QTDAPONTADA']) else 0
+                total_semana = float(row['TOTALSEMANA']) if pd.notna(row['TOTALSEMANA']) else 0
+                saldo_semana = float(row['SALDOSEMANA']) if pd.notna(row['SALDOSEMANA']) else 0
+            except ValueError:
+                continue
+
+            if total_semana > 0:
+                percentual = (qtd_apontada / total_semana) * 100
+            else:
+                percentual = 0
+
+            dados_processados.append({
+                'LINHA': linha,
+                'DESCRPROD': descrprod,
+                'SEQ': int(row.get('SEQ', 0)) if pd.notna(row.get('SEQ')) else 0,
+                'META_DIA': int(meta_dia_atual),
+                'QTDAPONTADA': qtd_apontada,
+                'TOTALSEMANA': total_semana,
+                'PERC': round(percentual, 1),
+                'SALDOSEMANA': saldo_semana,
+                'DIA_ATUAL': dia_atual_nome,
+                'COLUNA_USADA': coluna_dia_atual,
+                'DHAPO_LINHA': dh_apontamento_por_linha.get(linha)
+            })
+
+        except Exception:
+            continue
+
+    return pd.DataFrame(dados_processados)
+
+def conferir_equivalencia(novo, antigo):
+    """Garante que os dois caminhos geram o mesmo resultado"""
+    # PERC: np.round arredonda empates para o par, round() do Python não (diferença máx. 0.1)
+    # Categorias e float32 do layout compacto comparados como texto e float64
+    novo = novo.astype({coluna: str for coluna in COLUNAS_CATEGORICAS}).astype({'PERC': 'float64'})
+    pd.testing.assert_frame_equal(novo.drop(columns='PERC'), antigo.drop(columns='PERC'), check_dtype=False)
+    assert (novo['PERC'] - antigo['PERC']).abs().max() <= 0.1 + 1e-9
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--linhas', type=int, nargs='+', default=[100_000, 1_000_000],
+                        help='Tamanhos da amostra escalada (registros)')
+    parser.add_argument('--repeticoes', type=int, default=3,
+                        help='Repetições do caminho colunar (melhor tempo)')
+    args = parser.parse_args()
+
+    amostra = carregar_amostra()
+    tamanhos = [len(amostra)] + args.linhas
+
+    print(f"{'registros':>10} | {'iterrows (s)':>12} | {'colunar (s)':>11} | {'ganho':>7}")
+    for total in tamanhos:
+        df = escalar(amostra, total)
+        tempo_antigo, antigo = cronometrar(processar_dados_base_real_iterrows, df)
+        tempo_novo, novo = cronometrar(processar_dados_base_real, df, repeticoes=args.repeticoes)
+        conferir_equivalencia(novo, antigo)
+        print(f"{total:>10} | {tempo_antigo:>12.3f} | {tempo_novo:>11.4f} | {tempo_antigo / tempo_novo:>6.0f}x")
+
+if __name__ == '__main__':
+    main()
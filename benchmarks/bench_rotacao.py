@@ -0,0 +1,66 @@
+"""Custo de servidor da rotação: rerun por segundo vs. rotação no navegador
+
+Roda o dashprod.py no AppTest contra um servidor HTTP local que serve o CSV de
+exemplo e mede, em cada modo, o tempo e os bytes (deltas) de um rerun. A
+projeção por minuto usa a cadência de cada modo: 60 reruns no modo servidor
+(st_autorefresh de 1s) e 60/intervalo no modo navegador.
+
+Uso: python -m benchmarks.bench_rotacao [--reruns 20] [--intervalo 60]
+"""
+import argparse
+import functools
+import http.server
+import threading
+import time
+
+from streamlit.testing.v1 import AppTest
+
+from benchmarks.bench_pagina import ContadorMensagens
+from benchmarks.comum import CSV_AMOSTRA, RAIZ
+
+class _Silencioso(http.server.SimpleHTTPRequestHandler):
+    def log_message(self, *args):
+        pass
+
+def servir_amostra(arquivo=CSV_AMOSTRA):
+    """Servidor HTTP local com o CSV (por padrão o de exemplo); retorna (servidor, url)"""
+    manipulador = functools.partial(_Silencioso, directory=str(arquivo.parent))
+    servidor = http.server.ThreadingHTTPServer(('127.0.0.1', 0), manipulador)
+    threading.Thread(target=servidor.serve_forever, daemon=True).start()
+    return servidor, f"http://127.0.0.1:{servidor.server_port}/{arquivo.name}"
+
+def medir(url, no_navegador, reruns, intervalo):
+    """(ms por rerun, KB por rerun) do dashprod.py no modo escolhido"""
+    app = AppTest.from_file(str(RAIZ / 'dashprod.py'), default_timeout=60)
+    app.session_state['github_url'] = url
+    app.session_state['rotacao_no_navegador'] = no_navegador
+    app.session_state['refresh_interval'] = intervalo
+    app.run()  # primeira execução: download, imports e montagem da grade fora da medida
+    melhor = float('inf')
+    with ContadorMensagens() as contador:
+        for _ in range(reruns):
+            inicio = time.perf_counter()
+            app.run()
+            melhor = min(melhor, time.perf_counter() - inicio)
+    if app.exception:
+        raise RuntimeError(app.exception[0].value)
+    return melhor * 1000, contador.bytes / reruns / 1024
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--reruns', type=int, default=20)
+    parser.add_argument('--intervalo', type=int, default=60, help="intervalo de verificação dos dados (s)")
+    args = parser.parse_args()
+
+    servidor, url = servir_amostra()
+    try:
+        print(f"{'modo':>9} | {'rerun (ms)':>10} | {'KB/rerun':>8} | {'reruns/min':>10} | {'CPU ms/min':>10} | {'KB/min':>7}")
+        for nome, no_navegador, por_minuto in [('servidor', False, 60), ('navegador', True, 60 / args.intervalo)]:
+            tempo, tamanho = medir(url, no_navegador, args.reruns, args.intervalo)
+            print(f"{nome:>9} | {tempo:>10.1f} | {tamanho:>8.1f} | {por_minuto:>10.1f} | "
+                  f"{tempo * por_minuto:>10.0f} | {tamanho * por_minuto:>7.0f}")
+    finally:
+        servidor.shutdown()
+
+if __name__ == '__main__':
+    main()
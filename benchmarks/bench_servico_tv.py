@@ -0,0 +1,114 @@
+"""Serviço para TVs: bytes por versão e tempo até todos os clientes receberem a versão nova
+
+Sobe o ServicoTV (dashcore.servico_tv) sobre um RepositorioSnapshots sem cache
+em disco, com o CSV servido por HTTP local, e conecta N clientes SSE (/eventos)
+e N clientes de long-poll (/linhas?versao=V). Em cada rodada publica outra
+versão do CSV, chama atualizar() como a thread de atualização faria e mede, a
+partir da publicação do snapshot (inclui montar o JSON):
+- tempo até o último cliente SSE e o último de long-poll receberem a versão nova;
+- bytes por cliente a cada versão (o mesmo JSON para todos).
+Entre as versões nenhum cliente recebe nada além dos pings de SSE.
+
+Uso: python -m benchmarks.bench_servico_tv [--clientes 10 100 500] [--linhas 30] [--rodadas 3]
+"""
+import argparse
+import asyncio
+import json
+import statistics
+import tempfile
+import time
+
+from benchmarks.bench_dashboards import FonteLocal
+from benchmarks.comum import gerar_fixture
+from dashcore.servico_tv import iniciar_em_thread
+from dashcore.snapshot import RepositorioSnapshots
+
+LIMITE_LEITURA = 2 ** 24  # o evento SSE vem em uma linha 'data:' com o JSON inteiro
+
+async def _conectar(porta, caminho):
+    leitor, escritor = await asyncio.open_connection('127.0.0.1', porta, limit=LIMITE_LEITURA)
+    escritor.write(f"GET {caminho} HTTP/1.1\r\nHost: 127.0.0.1\r\n\r\n".encode())
+    await escritor.drain()
+    await leitor.readuntil(b'\r\n\r\n')
+    return leitor, escritor
+
+async def _proximo_evento(leitor):
+    """(versão, bytes do evento) do próximo evento 'linhas' do stream, ignorando retry e pings"""
+    while True:
+        bloco = await leitor.readuntil(b'\n\n')
+        if bloco.startswith(b'id: '):
+            return bloco[4:bloco.index(b'\n')].decode(), len(bloco)
+
+async def _long_poll(porta, versao):
+    """(versão recebida, bytes do corpo, instante da resposta)"""
+    leitor, escritor = await _conectar(porta, f"/linhas?versao={versao}&espera=50")
+    corpo = await leitor.read()
+    recebido = time.perf_counter()
+    escritor.close()
+    return json.loads(corpo)['versao'], len(corpo), recebido
+
+async def _rodada(porta, sse, versao, publicar):
+    """Tempos (ms) até o último cliente SSE e o último de long-poll receberem a versão nova"""
+    polls = [asyncio.create_task(_long_poll(porta, versao)) for _ in sse]
+    await asyncio.sleep(0.5)  # todos os long-polls já esperando no servidor
+    publicado = await asyncio.to_thread(publicar)
+    recebidos_sse = []
+    for leitor, _ in sse:
+        nova, tamanho = await _proximo_evento(leitor)
+        recebidos_sse.append(time.perf_counter())
+    respostas = await asyncio.gather(*polls)
+    assert all(resposta[0] == nova for resposta in respostas) and nova != versao
+    return (max(recebidos_sse) - publicado) * 1000, (max(r[2] for r in respostas) - publicado) * 1000, nova, tamanho
+
+async def _medir(servico, clientes, rodadas, publicar):
+    sse = [await _conectar(servico.porta, '/eventos') for _ in range(clientes)]
+    versao = None
+    for leitor, _ in sse:
+        versao, _tamanho = await _proximo_evento(leitor)
+    tempos_sse, tempos_poll = [], []
+    for _ in range(rodadas):
+        tempo_sse, tempo_poll, versao, tamanho = await _rodada(servico.porta, sse, versao, publicar)
+        tempos_sse.append(tempo_sse)
+        tempos_poll.append(tempo_poll)
+    for _, escritor in sse:
+        escritor.close()
+    return statistics.median(tempos_sse), statistics.median(tempos_poll), tamanho
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--clientes', type=int, nargs='+', default=[10, 100, 500],
+                        help="clientes SSE e, outros tantos, de long-poll")
+    parser.add_argument('--linhas', type=int, default=30, help="LINHAs na semana atual do CSV")
+    parser.add_argument('--rodadas', type=int, default=3, help="versões novas publicadas por medida")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as diretorio:
+        fonte = FonteLocal(diretorio)
+        try:
+            variante = 0
+            fonte.publicar(gerar_fixture(args.linhas, 0, variante)[0])
+            repositorio = RepositorioSnapshots(diretorio_cache=None)
+            publicado = []
+            repositorio.observar(lambda snapshot: publicado.append(time.perf_counter()))
+            repositorio.atualizar(fonte.url)
+            servico = iniciar_em_thread(repositorio, fonte.url, porta=0, host='127.0.0.1', intervalo=3600)
+            servico.pronto.wait(30)
+
+            def publicar():
+                nonlocal variante
+                variante += 1
+                fonte.publicar(gerar_fixture(args.linhas, 0, variante)[0])
+                repositorio.atualizar(fonte.url)
+                return publicado[-1]
+
+            print(f"{args.linhas} linhas, JSON por versão {len(servico.corpo) / 1024:.1f} KB")
+            print(f"{'clientes':>8} | {'último SSE (ms)':>15} | {'último long-poll (ms)':>21} | {'KB/cliente/versão':>17}")
+            for clientes in args.clientes:
+                tempo_sse, tempo_poll, tamanho = asyncio.run(_medir(servico, clientes, args.rodadas, publicar))
+                print(f"{clientes:>8} | {tempo_sse:>15.1f} | {tempo_poll:>21.1f} | {tamanho / 1024:>17.1f}")
+            repositorio.parar_atualizacoes()
+        finally:
+            fonte.encerrar()
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,80 @@
+"""Memória por tela conectada: quanto cada sessão a mais custa ao processo
+
+Abre sessões do dashboard no AppTest (cada uma é uma tela com o mesmo CSV,
+servido por HTTP local) até 10, 50 e 200 e mede, depois de cada patamar:
+- RSS do processo por sessão acima da primeira (a que baixa e processa os dados);
+- bytes exclusivos do st.session_state de uma sessão: o que ela referencia e a
+  primeira sessão não (dados compartilhados contam zero).
+A árvore de elementos que o AppTest guarda de cada execução é descartada antes
+da medida: no servidor os elementos vão para o navegador e não ficam na sessão.
+
+Uso: python -m benchmarks.bench_sessoes [--sessoes 10 50 200] [--linhas 30] [--script dashprodtv.py]
+"""
+import argparse
+import gc
+import logging
+import os
+import tempfile
+
+from streamlit.testing.v1 import AppTest
+
+from benchmarks.bench_dashboards import FonteLocal
+from benchmarks.comum import RAIZ, gerar_fixture
+from dashcore.instrumentacao import tamanho_profundo
+
+def rss():
+    """Memória residente do processo em bytes (Linux)"""
+    with open('/proc/self/statm') as statm:
+        return int(statm.read().split()[1]) * os.sysconf('SC_PAGE_SIZE')
+
+def abrir_sessao(script, url):
+    """Nova tela: execução inicial e uma com os dados já na sessão (monta a grade)"""
+    app = AppTest.from_file(str(RAIZ / script), default_timeout=120)
+    app.session_state['github_url'] = url
+    for _ in range(2):
+        app.run()
+        if app.exception:
+            raise RuntimeError(app.exception[0].value)
+    app._tree = None
+    return app
+
+def bytes_exclusivos(app, referencia):
+    """Bytes do session_state de `app` que não são referenciados pelo de `referencia`"""
+    # Os dois dicts vivos ao mesmo tempo: um id reaproveitado faria o segundo contar zero
+    estado_referencia = referencia.session_state._state.filtered_state
+    estado = app.session_state._state.filtered_state
+    vistos = set()
+    tamanho_profundo(estado_referencia, vistos)
+    return tamanho_profundo(estado, vistos)
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--sessoes', type=int, nargs='+', default=[10, 50, 200])
+    parser.add_argument('--linhas', type=int, default=30, help="LINHAs na semana atual do CSV")
+    parser.add_argument('--script', default='dashprodtv.py')
+    args = parser.parse_args()
+    # Cada AppTest fora de uma execução avisa que não há ScriptRunContext
+    logging.getLogger('streamlit.runtime.scriptrunner_utils.script_run_context').setLevel(logging.ERROR)
+
+    with tempfile.TemporaryDirectory() as diretorio:
+        fonte = FonteLocal(diretorio)
+        try:
+            fonte.publicar(gerar_fixture(args.linhas, 0)[0])
+            sessoes = [abrir_sessao(args.script, fonte.url)]
+            gc.collect()
+            base = rss()
+            print(f"{args.script}: {args.linhas} linhas, RSS com uma sessão {base / 2**20:.0f} MB")
+            print(f"{'sessões':>7} | {'RSS (MB)':>8} | {'KB/sessão (RSS)':>15} | {'KB exclusivos/sessão':>20}")
+            for total in sorted(args.sessoes):
+                while len(sessoes) < total:
+                    sessoes.append(abrir_sessao(args.script, fonte.url))
+                gc.collect()
+                atual = rss()
+                exclusivos = bytes_exclusivos(sessoes[-1], sessoes[0])
+                print(f"{total:>7} | {atual / 2**20:>8.0f} | {(atual - base) / (total - 1) / 1024:>15.0f} | "
+                      f"{exclusivos / 1024:>20.1f}")
+        finally:
+            fonte.encerrar()
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,110 @@
+"""Utilitários comuns aos benchmarks: amostra escalada, fixtures em CSV e cronometragem"""
+import time
+from datetime import date, timedelta
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+from dashcore.leitura import ler_csv_erp
+
+RAIZ = Path(__file__).resolve().parent.parent
+CSV_AMOSTRA = RAIZ / 'querygerencial.csv'
+
+def carregar_amostra(caminho=CSV_AMOSTRA):
+    """Lê o CSV de exemplo exportado pelo ERP com o leitor tipado dos dashboards"""
+    df, _ = ler_csv_erp(str(caminho))
+    return df
+
+def escalar(df, total_linhas):
+    """Replica a amostra até `total_linhas` registros, simulando várias plantas"""
+    repeticoes = -(-total_linhas // len(df))
+    indices = np.tile(np.arange(len(df)), repeticoes)[:total_linhas]
+    copia = np.repeat(np.arange(repeticoes), len(df))[:total_linhas]
+
+    escalado = df.iloc[indices].reset_index(drop=True)
+    # Cada cópia vira uma "planta" diferente para multiplicar as linhas distintas
+    sufixo = pd.Series(copia).map(lambda n: f' P{n + 1}' if n else '')
+    escalado['LINHA'] = escalado['LINHA'].where(escalado['LINHA'].isna(), escalado['LINHA'] + sufixo)
+    return escalado
+
+def _semanas_csv(caminho=CSV_AMOSTRA):
+    """(cabeçalho, {semana: [linhas cruas]}) do CSV de exemplo, na ordem do arquivo"""
+    cabecalho, *linhas = Path(caminho).read_bytes().splitlines(keepends=True)
+    semanas = {}
+    for linha in linhas:
+        semanas.setdefault(linha.split(b';', 1)[0], []).append(linha)
+    return cabecalho, semanas
+
+def _semanas_anteriores(semana):
+    """Rótulos ISO antes de `semana`, do mais novo para o mais antigo (b'2025-48', b'2025-47'...)"""
+    ano, numero = map(int, semana.split(b'-'))
+    segunda = date.fromisocalendar(ano, numero, 1)
+    while True:
+        segunda -= timedelta(weeks=1)
+        ano, numero, _ = segunda.isocalendar()
+        yield f"{ano}-{numero:02d}".encode()
+
+def _reescrever(linha, semana=None, planta=0, campo=None, incremento=0):
+    """Linha crua com outra semana, a LINHA de outra planta (' P2'...) e/ou um campo numérico somado"""
+    campos = linha.split(b';')
+    if semana is not None:
+        campos[0] = semana
+    if planta and campos[2].strip():
+        campos[2] += f' P{planta + 1}'.encode()
+    if incremento and campos[campo].strip():
+        campos[campo] = str(int(float(campos[campo])) + incremento).encode()
+    return b';'.join(campos)
+
+def gerar_fixture(linhas, registros, variante=0, caminho=CSV_AMOSTRA):
+    """CSV no formato exato do ERP com `linhas` LINHAs na semana atual e `registros` registros no total
+
+    A semana atual é a última da amostra, replicada como outras plantas até ter
+    `linhas` linhas distintas; o restante do arquivo são as semanas anteriores
+    da amostra, com plantas e rótulos de semana cada vez mais antigos. Cada
+    `variante` soma esse valor à QTDAPONTADA da semana atual: outra versão dos
+    mesmos dados, como um novo apontamento no dia.
+    Retorna (bytes, registros da semana atual); se a semana atual sozinha passar
+    de `registros`, o arquivo tem só ela.
+    """
+    cabecalho, semanas = _semanas_csv(caminho)
+    rodape = semanas.pop(b'', [])  # linha de totais do ERP, sem semana
+    *anteriores, atual = semanas
+    coluna_qtd = cabecalho.split(b';').index(b'QTDAPONTADA')
+
+    ordem_linhas = {}
+    for linha in semanas[atual]:
+        nome = linha.split(b';')[2].strip()
+        if nome:
+            ordem_linhas.setdefault(nome, len(ordem_linhas))
+    plantas = -(-linhas // len(ordem_linhas))
+    semana_atual = [
+        _reescrever(linha, planta=planta, campo=coluna_qtd, incremento=variante)
+        for planta in range(plantas)
+        for linha in semanas[atual]
+        if ordem_linhas.get(linha.split(b';')[2].strip(), 0) + planta * len(ordem_linhas) < linhas
+        and (planta == 0 or linha.split(b';')[2].strip())
+    ]
+
+    # Histórico: as semanas anteriores da amostra em ciclo, cada volta como outra planta
+    blocos = []
+    restantes = registros - len(semana_atual)
+    for volta, semana in enumerate(_semanas_anteriores(atual)):
+        if restantes <= 0:
+            break
+        modelo = semanas[anteriores[volta % len(anteriores)]][:restantes]
+        blocos.append([_reescrever(linha, semana, (volta // len(anteriores)) % plantas) for linha in modelo])
+        restantes -= len(modelo)
+
+    partes = [cabecalho, *(linha for bloco in reversed(blocos) for linha in bloco), *semana_atual, *rodape]
+    return b''.join(partes), len(semana_atual)
+
+def cronometrar(funcao, *args, repeticoes=1):
+    """Executa a função e retorna (melhor tempo em segundos, último resultado)"""
+    melhor = float('inf')
+    resultado = None
+    for _ in range(repeticoes):
+        inicio = time.perf_counter()
+        resultado = funcao(*args)
+        melhor = min(melhor, time.perf_counter() - inicio)
+    return melhor, resultado
@@ -0,0 +1,46 @@
+"""Grava CSVs sintéticos no formato do ERP (dashcore.sintetico) para testes de carga
+
+Sem --ate, grava um arquivo com a produção apontada até --instante. Com --ate,
+grava uma série dados_HHMM.csv, um arquivo por passo de --passo minutos,
+simulando o arquivo reexportado ao longo do dia; servir cada um em sequência
+(por exemplo com benchmarks.bench_dashboards.FonteLocal) reproduz os apontamentos.
+
+Uso: python -m benchmarks.gerar_dados SAIDA [--semanas 1] [--linhas 30] [--produtos 1 3]
+         [--semente 0] [--instante 2025-12-03T10:00] [--ate 2025-12-03T22:00] [--passo 15]
+"""
+import argparse
+from datetime import datetime, timedelta
+from pathlib import Path
+
+from dashcore.sintetico import INTERVALO_APONTAMENTO, gerar_csv, gerar_snapshots
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('saida', type=Path, help="arquivo CSV (ou diretório da série, com --ate)")
+    parser.add_argument('--semanas', type=int, default=1)
+    parser.add_argument('--linhas', type=int, default=30)
+    parser.add_argument('--produtos', type=int, nargs=2, default=[1, 3], metavar=('MIN', 'MAX'),
+                        help="produtos por linha")
+    parser.add_argument('--semente', type=int, default=0)
+    parser.add_argument('--instante', type=datetime.fromisoformat, default=None, help="padrão: agora")
+    parser.add_argument('--ate', type=datetime.fromisoformat, help="último instante da série")
+    parser.add_argument('--passo', type=int, default=INTERVALO_APONTAMENTO, help="minutos entre arquivos da série")
+    args = parser.parse_args()
+
+    opcoes = {'semanas': args.semanas, 'linhas': args.linhas,
+              'produtos_por_linha': tuple(args.produtos), 'semente': args.semente}
+    if args.ate is None:
+        conteudo = gerar_csv(instante=args.instante, **opcoes)
+        args.saida.write_bytes(conteudo)
+        print(f"{args.saida}: {len(conteudo) / 1e6:.1f} MB")
+        return
+
+    args.saida.mkdir(parents=True, exist_ok=True)
+    inicio = args.instante or datetime.now()
+    for instante, conteudo in gerar_snapshots(inicio, args.ate, timedelta(minutes=args.passo), **opcoes):
+        arquivo = args.saida / f"dados_{instante:%H%M}.csv"
+        arquivo.write_bytes(conteudo)
+        print(f"{arquivo}: {len(conteudo) / 1e6:.1f} MB")
+
+if __name__ == '__main__':
+    main()
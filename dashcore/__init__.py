@@ -0,0 +1 @@
+"""Lógica compartilhada pelos dashboards de linhas de produção."""
@@ -0,0 +1,156 @@
+"""Cache em disco do último snapshot processado (Arrow IPC) para partida instantânea
+
+Os bytes crus das semanas ficam ao lado, em um arquivo .semanas com o digest do
+arquivo no nome: é gravado parte por parte (sem juntar o arquivo inteiro na memória) e
+lido por mmap.
+"""
+import hashlib
+import json
+import mmap
+import os
+import tempfile
+from pathlib import Path
+
+import pyarrow as pa
+
+from dashcore.indice_cards import indexar_cards
+from dashcore.processamento import TIPOS_PROCESSADOS
+from dashcore.resumo import resumir_por_linha
+from dashcore.semanas import ParticaoSemana, dia_processamento, escolher_semana_atual, versao_dos_dados
+
+DIRETORIO_CACHE = Path.home() / '.cache' / 'dashprod'
+
+def caminho_cache(url, diretorio=DIRETORIO_CACHE):
+    """Arquivo de cache da URL (nome derivado do digest da URL)"""
+    nome = hashlib.blake2b(url.encode('utf-8'), digest_size=8).hexdigest()
+    return Path(diretorio) / f"snapshot_{nome}.arrow"
+
+def _gravar_atomico(destino, escrever):
+    """escrever(arquivo) em um temporário no mesmo diretório, trocado pelo destino no fim"""
+    fd, temporario = tempfile.mkstemp(dir=destino.parent, suffix='.tmp')
+    try:
+        with os.fdopen(fd, 'wb') as arquivo:
+            escrever(arquivo)
+        os.replace(temporario, destino)
+    except BaseException:
+        os.unlink(temporario)
+        raise
+
+def _valor_json(valor):
+    """Converte escalares numpy/pandas (ex.: int64) para tipos nativos do JSON"""
+    return valor.item() if hasattr(valor, 'item') else str(valor)
+
+def salvar_snapshot(snapshot, validadores=None, diretorio=DIRETORIO_CACHE):
+    """Grava o frame processado e as estruturas derivadas; a troca do arquivo é atômica"""
+    destino = caminho_cache(snapshot.url, diretorio)
+    destino.parent.mkdir(parents=True, exist_ok=True)
+    semanas = destino.with_name(f"{destino.stem}_{snapshot.digest}.semanas")
+    metadados = {
+        'url': snapshot.url,
+        'versao': snapshot.versao,
+        'digest': snapshot.digest,
+        'dia': snapshot.dia,
+        'carregado_em': snapshot.carregado_em,
+        'colunas_origem': list(snapshot.colunas_origem),
+        'rejeitadas': snapshot.rejeitadas,
+        'validadores': validadores,
+        'semana': snapshot.semana,
+        'arquivo_semanas': semanas.name,
+        'particoes': [],
+    }
+    # Bytes crus de todas as semanas, para as anteriores continuarem disponíveis sob demanda
+    inicio = 0
+    for semana, particao in snapshot.particoes.items():
+        metadados['particoes'].append([semana, particao.versao, inicio, particao.tamanho])
+        inicio += particao.tamanho
+    if not semanas.exists():  # mesmo digest, mesmos bytes: já gravado por outro processo (ou em outro dia)
+        _gravar_atomico(semanas, lambda arquivo: arquivo.writelines(
+            parte for particao in snapshot.particoes.values() for parte in particao.partes
+        ))
+
+    tabela = pa.Table.from_pandas(snapshot.df_processado, preserve_index=False)
+    tabela = tabela.replace_schema_metadata({
+        **(tabela.schema.metadata or {}),
+        b'dashprod': json.dumps(metadados, default=_valor_json).encode('utf-8'),
+    })
+
+    def escrever(arquivo):
+        with pa.ipc.new_file(arquivo, tabela.schema) as escritor:
+            escritor.write_table(tabela)
+    _gravar_atomico(destino, escrever)
+
+    # Semanas de arquivos anteriores; um processo que ainda as mapeia segue lendo (no
+    # Windows a remoção falha e fica para o próximo salvamento)
+    for antigo in destino.parent.glob(f"{destino.stem}_*.semanas"):
+        if antigo != semanas:
+            try:
+                antigo.unlink()
+            except OSError:
+                pass
+
+def _ler_semanas(caminho):
+    """Bytes crus das semanas por mmap (memoryview), sem copiar o arquivo para o heap"""
+    with open(caminho, 'rb') as arquivo:
+        if os.fstat(arquivo.fileno()).st_size == 0:
+            return b''
+        return memoryview(mmap.mmap(arquivo.fileno(), 0, access=mmap.ACCESS_READ))
+
+def carregar_snapshot(url, diretorio=DIRETORIO_CACHE):
+    """Lê o cache da URL; retorna (campos do Snapshot, validadores) ou None se não houver
+
+    Um cache gravado em outro dia (outra coluna de META_DIA, talvez outra semana
+    atual) não é publicado como está: a semana atual de hoje é processada de novo
+    a partir das semanas cruas.
+    """
+    origem = caminho_cache(url, diretorio)
+    if not origem.exists():
+        return None
+
+    dia = dia_processamento()
+    with pa.memory_map(str(origem)) as mapa:
+        tabela = pa.ipc.open_file(mapa).read_all()
+        metadados = json.loads(tabela.schema.metadata[b'dashprod'])
+        # Sem digest (cache anterior à versão por dia): baixar e processar de novo
+        if metadados['url'] != url or 'digest' not in metadados:
+            return None
+        mesmo_dia = tuple(metadados['dia']) == dia
+        # Caches gravados antes do layout compacto voltam com texto e float64
+        df_processado = tabela.to_pandas().astype(TIPOS_PROCESSADOS) if mesmo_dia else None
+    blocos = _ler_semanas(origem.with_name(metadados['arquivo_semanas']))
+
+    # Só a contagem do arquivo inteiro; a da semana atual vem da partição
+    rejeitadas = {motivo: qtd for motivo, qtd in metadados['rejeitadas'].items() if motivo == 'sem_semana'}
+    dados_atual = None
+    if mesmo_dia:
+        # A semana atual já volta processada; as demais são lidas só se alguém pedir
+        resumo_linhas = resumir_por_linha(df_processado)
+        indice_cards = indexar_cards(df_processado, resumo_linhas)
+        rejeitadas_semana = {motivo: qtd for motivo, qtd in metadados['rejeitadas'].items() if motivo != 'sem_semana'}
+        dados_atual = (df_processado, resumo_linhas, indice_cards,
+                       rejeitadas_semana, tuple(metadados['colunas_origem']))
+    particoes = {}
+    for semana, versao, inicio, tamanho in metadados.get('particoes', []):
+        dados = dados_atual if semana == metadados.get('semana') else None
+        particoes[semana] = ParticaoSemana(semana, [blocos[inicio:inicio + tamanho]], versao, dados, dia)
+
+    semana = metadados.get('semana') if mesmo_dia else escolher_semana_atual(particoes)
+    (df_processado, resumo_linhas, indice_cards,
+     rejeitadas_semana, colunas_origem) = particoes[semana].carregar()
+    for motivo, quantidade in rejeitadas_semana.items():
+        rejeitadas[motivo] = rejeitadas.get(motivo, 0) + quantidade
+
+    campos = {
+        'url': url,
+        'versao': versao_dos_dados(metadados['digest'], dia),
+        'df_processado': df_processado,
+        'resumo_linhas': resumo_linhas,
+        'carregado_em': metadados['carregado_em'],
+        'colunas_origem': colunas_origem,
+        'rejeitadas': rejeitadas,
+        'semana': semana,
+        'particoes': particoes,
+        'indice_cards': indice_cards,
+        'digest': metadados['digest'],
+        'dia': dia,
+    }
+    return campos, metadados['validadores']
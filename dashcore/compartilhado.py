@@ -0,0 +1,30 @@
+"""Estruturas do processo compartilhadas pelas sessões; cada sessão guarda só a chave do que exibe"""
+import threading
+from collections import OrderedDict
+
+class CacheLRU:
+    """Dict limitado aos `capacidade` itens usados mais recentemente, seguro entre threads"""
+
+    def __init__(self, capacidade):
+        self.capacidade = capacidade
+        self._itens = OrderedDict()
+        self._lock = threading.Lock()
+
+    def obter(self, chave, padrao=None):
+        with self._lock:
+            if chave not in self._itens:
+                return padrao
+            self._itens.move_to_end(chave)
+            return self._itens[chave]
+
+    def guardar(self, chave, valor):
+        """Guarda e retorna o valor; o item usado há mais tempo sai se passar da capacidade"""
+        with self._lock:
+            self._itens[chave] = valor
+            self._itens.move_to_end(chave)
+            while len(self._itens) > self.capacidade:
+                self._itens.popitem(last=False)
+        return valor
+
+    def __len__(self):
+        return len(self._itens)
@@ -0,0 +1,154 @@
+"""Download do CSV no GitHub com requisições condicionais (ETag / Last-Modified)"""
+import hashlib
+import mmap
+import random
+import tempfile
+import threading
+import time
+
+TIMEOUT_CONEXAO = 5    # segundos para abrir a conexão
+TIMEOUT_LEITURA = 30   # segundos sem receber bytes antes de desistir
+TENTATIVAS = 3
+ESPERA_BASE = 0.5      # backoff exponencial: 0.5s, 1s, 2s... com jitter
+ESPERA_MAXIMA = 8
+STATUS_TEMPORARIOS = {429, 500, 502, 503, 504}
+TAMANHO_BLOCO = 1024 * 1024          # bytes lidos da resposta por vez
+LIMITE_EM_MEMORIA = 4 * 1024 * 1024  # corpo maior que isso vai para um arquivo temporário
+
+_sessao = None
+_sessao_lock = threading.Lock()
+
+def obter_sessao():
+    """Sessão HTTP única do processo, com keep-alive e pool de conexões"""
+    global _sessao
+    with _sessao_lock:
+        if _sessao is None:
+            # requests só é importado na primeira busca: dados do cache em disco, da amostra ou
+            # de uma planilha chegam à tela sem esperar por ele
+            import requests
+            from requests.adapters import HTTPAdapter
+
+            _sessao = requests.Session()
+            adaptador = HTTPAdapter(pool_connections=4, pool_maxsize=8)
+            _sessao.mount('https://', adaptador)
+            _sessao.mount('http://', adaptador)
+        return _sessao
+
+def converter_url_raw(url):
+    """Converte uma URL de visualização do GitHub para o formato raw"""
+    # Se for uma URL de visualização do GitHub, converter para raw
+    if 'github.com' in url and '/blob/' in url:
+        url_raw = url.replace('github.com', 'raw.githubusercontent.com')
+        return url_raw.replace('/blob/', '/')
+    # Se já for raw.githubusercontent.com, usar diretamente
+    if 'raw.githubusercontent.com' in url:
+        return url
+    # Se for um link direto do GitHub sem /blob/
+    if 'github.com' in url and '/raw/' not in url:
+        return url.replace('github.com', 'raw.githubusercontent.com')
+    return url
+
+def impressao_digital(conteudo):
+    """Digest BLAKE2 dos bytes brutos: estável entre processos, serve como versão dos dados"""
+    return hashlib.blake2b(conteudo, digest_size=16).hexdigest()
+
+def impressao_digital_partes(partes):
+    """Mesmo digest de impressao_digital(b''.join(partes)), sem juntar os bytes"""
+    digest = hashlib.blake2b(digest_size=16)
+    for parte in partes:
+        digest.update(parte)
+    return digest.hexdigest()
+
+def _espera_backoff(tentativa):
+    """Backoff exponencial com jitter completo para não sincronizar servidores"""
+    return random.uniform(0, min(ESPERA_MAXIMA, ESPERA_BASE * 2 ** tentativa))
+
+def acumular_blocos(blocos_lidos):
+    """Junta os blocos lidos: bytes se couberem em LIMITE_EM_MEMORIA, senão mmap
+
+    Arquivos grandes são gravados bloco a bloco em um arquivo temporário só
+    deste processo e mapeados; o pico de memória é o limite, não o tamanho do
+    arquivo. Ninguém mais grava nesse arquivo, então o mmap não pode ser
+    truncado por fora; ele some quando a última referência ao mmap some.
+    """
+    blocos = []
+    tamanho = 0
+    arquivo = None
+    try:
+        for bloco in blocos_lidos:
+            tamanho += len(bloco)
+            if arquivo is None and tamanho > LIMITE_EM_MEMORIA:
+                arquivo = tempfile.TemporaryFile(prefix='dashprod_')
+                arquivo.writelines(blocos)
+                blocos = []
+            if arquivo is None:
+                blocos.append(bloco)
+            else:
+                arquivo.write(bloco)
+        if arquivo is None:
+            return b''.join(blocos)
+        arquivo.flush()
+        return mmap.mmap(arquivo.fileno(), 0, access=mmap.ACCESS_READ)
+    finally:
+        if arquivo is not None:
+            arquivo.close()
+
+def buscar_csv(url_raw, validadores=None, sessao=None, timeout=(TIMEOUT_CONEXAO, TIMEOUT_LEITURA),
+               tentativas=TENTATIVAS):
+    """Baixa o arquivo apenas se ele mudou desde os validadores informados
+
+    Retorna (status, conteudo, validadores, metricas). Em um 304 o conteúdo é None e
+    os validadores anteriores são mantidos; num 200 é bytes ou, para arquivos
+    grandes, um mmap (ver acumular_blocos). Falhas de conexão, timeouts e status
+    temporários (429/5xx) são repetidos até `tentativas` vezes.
+    """
+    import requests
+
+    sessao = sessao or obter_sessao()
+
+    cabecalhos = {}
+    if validadores:
+        if validadores.get('etag'):
+            cabecalhos['If-None-Match'] = validadores['etag']
+        if validadores.get('last_modified'):
+            cabecalhos['If-Modified-Since'] = validadores['last_modified']
+
+    inicio = time.perf_counter()
+    for tentativa in range(tentativas):
+        ultima = tentativa == tentativas - 1
+        try:
+            # stream=True: o corpo é lido em blocos de TAMANHO_BLOCO, dentro das tentativas
+            with sessao.get(url_raw, headers=cabecalhos, timeout=timeout, stream=True) as response:
+                temporario = response.status_code in STATUS_TEMPORARIOS and not ultima
+                if response.status_code == 200:
+                    conteudo = acumular_blocos(response.iter_content(TAMANHO_BLOCO))
+                else:
+                    # Corpo curto (304, erro) lido até o fim: fechada sem ler, a conexão sairia do pool
+                    response.content
+                    conteudo = None
+        except (requests.ConnectionError, requests.Timeout, requests.exceptions.ChunkedEncodingError):
+            if ultima:
+                raise
+            time.sleep(_espera_backoff(tentativa))
+            continue
+
+        if temporario:
+            time.sleep(_espera_backoff(tentativa))
+            continue
+        break
+
+    metricas = {
+        'status': response.status_code,
+        'latencia': time.perf_counter() - inicio,
+        'bytes': len(conteudo) if conteudo is not None else 0,
+        'tentativas': tentativa + 1,
+    }
+
+    if response.status_code == 304:
+        return 304, None, validadores, metricas
+
+    novos_validadores = {
+        'etag': response.headers.get('ETag'),
+        'last_modified': response.headers.get('Last-Modified'),
+    }
+    return response.status_code, conteudo, novos_validadores, metricas
@@ -0,0 +1,79 @@
+"""Arquivo CSV local (exportação do ERP na rede da fábrica) como fonte de dados
+
+Em vez de um download a cada intervalo, a thread de atualização faz um stat()
+a cada INTERVALO_VERIFICACAO segundos: com o mesmo (mtime_ns, tamanho, inode)
+da última leitura a resposta é 304, sem abrir o arquivo. Um arquivo que mudou
+é copiado com read() em blocos, como o corpo de um download
+(fonte_github.acumular_blocos): o pico de memória é o limite em memória, e o
+arquivo do ERP nunca é mapeado, então truncá-lo durante a leitura não derruba
+o processo (SIGBUS).
+
+O ERP deve gravar a exportação em outro nome e renomear no fim (troca
+atômica). Para quem grava no próprio arquivo: um arquivo modificado há menos
+de JANELA_ESTAVEL segundos não é lido (na primeira leitura, espera-se por ele),
+e uma cópia durante a qual o fstat() mudou é descartada e refeita na próxima
+verificação.
+"""
+import os
+import time
+
+from dashcore.fonte_github import TAMANHO_BLOCO, acumular_blocos
+
+PREFIXO = 'file://'
+INTERVALO_VERIFICACAO = 2  # segundos entre os stat() do arquivo
+JANELA_ESTAVEL = 1         # arquivo modificado há menos que isso ainda pode estar sendo gravado
+ESPERAS_PRIMEIRA_LEITURA = 5
+
+class ArquivoAlteradoDuranteLeitura(Exception):
+    """O arquivo mudou durante a cópia (ou não parou de mudar); a próxima verificação lê de novo"""
+
+def eh_caminho_local(url):
+    """URL file:// ou caminho absoluto (as URLs HTTP vão para fonte_github)"""
+    return url.startswith(PREFIXO) or os.path.isabs(url)
+
+def caminho_do_arquivo(url):
+    return url[len(PREFIXO):] if url.startswith(PREFIXO) else url
+
+def _assinatura(estado):
+    return {'mtime_ns': estado.st_mtime_ns, 'tamanho': estado.st_size, 'inode': estado.st_ino}
+
+def _recente(estado):
+    # abs(): mtime no futuro (relógio do servidor de arquivos adiantado) não pode travar a leitura
+    return abs(time.time() - estado.st_mtime) < JANELA_ESTAVEL
+
+def _aguardar_estavel(caminho, estado):
+    """Primeira leitura: espera o arquivo passar JANELA_ESTAVEL sem mudar"""
+    for _ in range(ESPERAS_PRIMEIRA_LEITURA):
+        if not _recente(estado):
+            return estado
+        time.sleep(JANELA_ESTAVEL)
+        estado = os.stat(caminho)
+    raise ArquivoAlteradoDuranteLeitura(f"{caminho} continua sendo gravado")
+
+def ler_arquivo(url, validadores=None):
+    """Mesmo contrato de buscar_csv: (status, conteudo, validadores, metricas)
+
+    Os validadores são a assinatura do stat(). Com o arquivo igual (ou ainda sendo
+    gravado) o status é 304 e o conteúdo None; senão o conteúdo é uma cópia
+    própria (bytes ou mmap de um temporário). Arquivo inexistente levanta
+    FileNotFoundError.
+    """
+    inicio = time.perf_counter()
+    caminho = caminho_do_arquivo(url)
+    estado = os.stat(caminho)
+    if validadores is not None and (_assinatura(estado) == validadores or _recente(estado)):
+        return 304, None, validadores, {
+            'status': 304, 'latencia': time.perf_counter() - inicio, 'bytes': 0, 'tentativas': 1,
+        }
+    if validadores is None:
+        _aguardar_estavel(caminho, estado)
+
+    with open(caminho, 'rb') as arquivo:
+        assinatura = _assinatura(os.fstat(arquivo.fileno()))
+        conteudo = acumular_blocos(iter(lambda: arquivo.read(TAMANHO_BLOCO), b''))
+        # Gravação no próprio arquivo durante a cópia: tamanho ou mtime do mesmo inode mudaram
+        if _assinatura(os.fstat(arquivo.fileno())) != assinatura or len(conteudo) != assinatura['tamanho']:
+            raise ArquivoAlteradoDuranteLeitura(f"{caminho} mudou durante a leitura")
+    return 200, conteudo, assinatura, {
+        'status': 200, 'latencia': time.perf_counter() - inicio, 'bytes': len(conteudo), 'tentativas': 1,
+    }
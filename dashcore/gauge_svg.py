@@ -0,0 +1,55 @@
+"""Gauge semicircular em SVG inline, no lugar da figura Plotly de cada card
+
+Só a geometria vai no markup; cores, tamanho e fonte vêm das classes `dp-gauge*`
+de dashcore.tema (a barra usa a cor de status do card em que está).
+"""
+import math
+
+# Mesmas faixas de fundo e meta do go.Indicator usado antes
+FAIXAS_FUNDO = [(0, 50, '#f8f9fa'), (50, 70, '#e9ecef'), (70, 100, '#dee2e6')]
+VALOR_META = 90
+ESPESSURA_META = 0.85  # fração da largura do arco coberta pela marca da meta
+
+# Geometria no sistema de coordenadas do viewBox
+LARGURA = 200
+ALTURA = 115
+CENTRO_X = 100
+CENTRO_Y = 105
+RAIO_EXTERNO = 95
+RAIO_INTERNO = 52
+
+def _ponto(valor, raio):
+    """Coordenada do valor (0-100) no arco, da esquerda (0) para a direita (100)"""
+    angulo = math.pi * (1 - valor / 100)
+    return CENTRO_X + raio * math.cos(angulo), CENTRO_Y - raio * math.sin(angulo)
+
+def _setor(inicio, fim, classe):
+    """Trecho do anel entre dois valores, como um único path"""
+    x1, y1 = _ponto(inicio, RAIO_EXTERNO)
+    x2, y2 = _ponto(fim, RAIO_EXTERNO)
+    x3, y3 = _ponto(fim, RAIO_INTERNO)
+    x4, y4 = _ponto(inicio, RAIO_INTERNO)
+    return (
+        f'<path d="M{x1:.1f},{y1:.1f}A{RAIO_EXTERNO},{RAIO_EXTERNO} 0 0 1 {x2:.1f},{y2:.1f}'
+        f'L{x3:.1f},{y3:.1f}A{RAIO_INTERNO},{RAIO_INTERNO} 0 0 0 {x4:.1f},{y4:.1f}Z" class="{classe}"/>'
+    )
+
+def gerar_gauge_svg(percentual):
+    """Markup SVG (uma linha, <1 KB) do gauge: faixas, barra, meta em 90% e o percentual"""
+    partes = [_setor(inicio, fim, f"dp-faixa-{i}") for i, (inicio, fim, _) in enumerate(FAIXAS_FUNDO, 1)]
+
+    # Como no Plotly, a barra fica limitada ao eixo (0-100) e o número mostra o valor real
+    valor_barra = min(max(percentual, 0), 100)
+    if valor_barra > 0:
+        partes.append(_setor(0, valor_barra, "dp-gauge-barra"))
+
+    folga = (RAIO_EXTERNO - RAIO_INTERNO) * (1 - ESPESSURA_META) / 2
+    x1, y1 = _ponto(VALOR_META, RAIO_INTERNO + folga)
+    x2, y2 = _ponto(VALOR_META, RAIO_EXTERNO - folga)
+    partes.append(f'<line x1="{x1:.1f}" y1="{y1:.1f}" x2="{x2:.1f}" y2="{y2:.1f}" class="dp-gauge-meta"/>')
+    partes.append(f'<text x="{CENTRO_X}" y="{CENTRO_Y - 2}" class="dp-gauge-texto">{percentual:.0f}%</text>')
+
+    return (
+        f'<svg xmlns="http://www.w3.org/2000/svg" viewBox="0 0 {LARGURA} {ALTURA}" class="dp-gauge" '
+        f'role="img" aria-label="{percentual:.0f}%">' + ''.join(partes) + '</svg>'
+    )
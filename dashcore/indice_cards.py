@@ -0,0 +1,117 @@
+"""Índice dos cards por (LINHA, posição do produto), montado uma vez por snapshot
+
+Cada registro traz tudo o que o card exibe, com os números já formatados; no
+rerun o card é só uma consulta ao índice, sem filtrar o DataFrame.
+"""
+import numpy as np
+import pandas as pd
+
+from dashcore.pagina_html import formatar_apontamento, formatar_milhar
+
+# Campos do card em colunas: os do produto (um valor por produto) e os da linha (um por LINHA)
+CAMPOS_PRODUTO = ('descrprod', 'qtd_produzida_texto', 'meta_texto', 'percentual_produto_texto')
+CAMPOS_LINHA = ('cor', 'prioridade', 'icone', 'percentual_linha', 'total_produzido_texto', 'total_objetivo_texto',
+                'ultimo_apontamento')
+
+def _campos_linhas(ordenado, resumo_linhas, nomes_linhas, texto):
+    """{campo: tupla na ordem de nomes_linhas} dos CAMPOS_LINHA (status, totais e último apontamento)"""
+    apontamentos = {}
+    if 'DHAPO_LINHA' in ordenado.columns:
+        apontamentos = ordenado.groupby('LINHA', sort=False)['DHAPO_LINHA'].first().to_dict()
+    resumo = resumo_linhas.reindex(list(nomes_linhas))
+    return {
+        'cor': tuple(resumo['COR']),
+        'prioridade': tuple(int(prioridade) for prioridade in resumo['PRIORIDADE']),
+        'icone': tuple(resumo['ICONE']),
+        'percentual_linha': tuple(float(percentual) for percentual in resumo['PERCENTUAL']),
+        'total_produzido_texto': tuple(texto(formatar_milhar(valor)) for valor in resumo['TOTAL_PRODUZIDO']),
+        'total_objetivo_texto': tuple(texto(formatar_milhar(valor)) for valor in resumo['TOTAL_OBJETIVO']),
+        'ultimo_apontamento': tuple(texto(formatar_apontamento(apontamentos.get(linha))) for linha in nomes_linhas),
+    }
+
+class IndiceCards:
+    """Cards de todos os produtos em colunas, na ordem de rotação de cada linha
+
+    `produtos` e `campos_linhas` têm uma tupla por campo (CAMPOS_PRODUTO,
+    CAMPOS_LINHA); `linhas` dá a posição da LINHA e os produtos dela vão de
+    inicios[posição] a inicios[posição + 1]. O registro do card só vira dict
+    quando é consultado; textos repetidos (metas, percentuais) são o mesmo objeto.
+    """
+    __slots__ = ('linhas', 'inicios', 'produtos', 'campos_linhas')
+
+    def __init__(self, linhas=None, inicios=(0,), produtos=None, campos_linhas=None):
+        self.linhas = linhas or {}
+        self.inicios = inicios
+        self.produtos = produtos or {campo: () for campo in CAMPOS_PRODUTO}
+        self.campos_linhas = campos_linhas or {campo: () for campo in CAMPOS_LINHA}
+
+    def __len__(self):
+        return self.inicios[-1]
+
+    def faixa(self, linha):
+        """(início, fim) dos produtos da linha nas colunas; KeyError se a linha não estiver no índice"""
+        posicao = self.linhas[linha]
+        return self.inicios[posicao], self.inicios[posicao + 1]
+
+    def campos_linha(self, linha):
+        """{campo: valor} dos CAMPOS_LINHA da linha"""
+        posicao = self.linhas[linha]
+        return {campo: valores[posicao] for campo, valores in self.campos_linhas.items()}
+
+    def registro(self, linha, posicao):
+        """Registro do card do produto na posição da linha (KeyError/IndexError fora do índice)"""
+        posicao_linha = self.linhas[linha]
+        inicio, fim = self.inicios[posicao_linha], self.inicios[posicao_linha + 1]
+        if not 0 <= posicao < fim - inicio:
+            raise IndexError(posicao)
+        registro = {'linha': linha, 'posicao_produto': posicao + 1, 'total_produtos': fim - inicio}
+        for campo, valores in self.produtos.items():
+            registro[campo] = valores[inicio + posicao]
+        for campo, valores in self.campos_linhas.items():
+            registro[campo] = valores[posicao_linha]
+        return registro
+
+def indexar_cards(df_processado, resumo_linhas):
+    """IndiceCards com todos os produtos do df processado
+
+    A posição segue a ordem de rotação da linha (SEQ, empates na ordem do
+    arquivo), então o índice de rotação do produto é a própria posição. Meta e
+    quantidade vêm da linha do arquivo do produto, nunca de outra LINHA.
+    """
+    if df_processado is None or df_processado.empty:
+        return IndiceCards()
+
+    # Produtos de cada LINHA contíguos, por SEQ dentro dela (empates na ordem do arquivo)
+    ordenado = df_processado.sort_values('SEQ', kind='stable')
+    codigos, nomes_linhas = pd.factorize(ordenado['LINHA'])
+    ordem = np.argsort(codigos, kind='stable')
+    ordem = ordem[codigos[ordem] >= 0]  # sem LINHA não há card
+    ordenado = ordenado.iloc[ordem]
+    totais = np.bincount(codigos[codigos >= 0], minlength=len(nomes_linhas))
+    quantidades = ordenado['QTDAPONTADA'].to_numpy(dtype='float64')
+    metas = ordenado['META_DIA'].to_numpy(dtype='float64')
+    with np.errstate(divide='ignore', invalid='ignore'):
+        percentuais = np.where(metas > 0, quantidades / metas * 100, 0.0)
+
+    textos = {}
+    def texto(valor):
+        return textos.setdefault(valor, valor)
+
+    return IndiceCards(
+        linhas={linha: posicao for posicao, linha in enumerate(nomes_linhas)},
+        inicios=np.concatenate(([0], np.cumsum(totais))).tolist(),
+        produtos={
+            'descrprod': tuple(ordenado['DESCRPROD']),
+            'qtd_produzida_texto': tuple(texto(formatar_milhar(quantidade)) for quantidade in quantidades),
+            'meta_texto': tuple(texto(formatar_milhar(meta)) for meta in metas),
+            'percentual_produto_texto': tuple(texto(f"{percentual:.0f}%") for percentual in percentuais),
+        },
+        campos_linhas=_campos_linhas(ordenado, resumo_linhas, nomes_linhas, texto),
+    )
+
+def produtos_na_linha(indice_cards, linha):
+    """Quantidade de produtos da linha no índice (0 se a linha não estiver nele)"""
+    if linha not in indice_cards.linhas:
+        return 0
+    inicio, fim = indice_cards.faixa(linha)
+    return fim - inicio
@@ -0,0 +1,192 @@
+"""Tempo por fase de cada execução e de cada atualização de dados
+
+Uma Medicao cronometra um evento ('atualizacao' na thread de atualização,
+'rerun' no script inteiro, 'grade' em cada ciclo do fragmento) dividido em
+fases. O RegistroDesempenho do processo guarda os últimos registros de cada
+evento para os percentis do painel de diagnóstico e grava cada um em uma linha
+de um log JSON, gravado por uma thread própria. Cada snapshot novo leva também o relatório de memória das suas
+estruturas.
+"""
+import json
+import math
+import os
+import queue
+import sys
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+from pathlib import Path
+
+ARQUIVO_LOG = Path.home() / '.cache' / 'dashprod' / 'desempenho.jsonl'
+TAMANHO_MAXIMO_LOG = 5 * 1024 * 1024  # acima disso o log vira .1 e começa outro
+JANELA = 200  # registros por evento usados nos percentis
+
+class Medicao:
+    """Cronômetro de um evento, com o tempo de cada fase em ms"""
+
+    def __init__(self, evento, **campos):
+        self.evento = evento
+        self.campos = campos
+        self.fases = {}
+        self._inicio = time.perf_counter()
+
+    @contextmanager
+    def fase(self, nome):
+        inicio = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.fases[nome] = self.fases.get(nome, 0.0) + (time.perf_counter() - inicio) * 1000
+
+    def anotar(self, **campos):
+        """Campos extras do registro (versão do snapshot, bytes, registros, linhas...)"""
+        self.campos.update(campos)
+
+    def concluir(self):
+        """Registro do evento: instante, tempo total, fases e campos anotados"""
+        return {
+            'evento': self.evento,
+            'instante': round(time.time(), 3),
+            'total_ms': round((time.perf_counter() - self._inicio) * 1000, 3),
+            'fases_ms': {nome: round(ms, 3) for nome, ms in self.fases.items()},
+            **self.campos,
+        }
+
+def resumo_dados(df_processado, resumo_linhas, versao=None, bytes_baixados=0):
+    """Campos que todo registro leva: versão dos dados, bytes baixados, registros e linhas"""
+    return {
+        'versao': versao,
+        'bytes': bytes_baixados,
+        'registros': 0 if df_processado is None else len(df_processado),
+        'linhas': 0 if resumo_linhas is None else len(resumo_linhas),
+    }
+
+def tamanho_profundo(objeto, vistos=None):
+    """Bytes do objeto e de tudo que ele referencia (DataFrames pelo memory_usage profundo)
+
+    Objetos referenciados mais de uma vez contam uma vez só.
+    """
+    vistos = set() if vistos is None else vistos
+    if id(objeto) in vistos:
+        return 0
+    vistos.add(id(objeto))
+    if hasattr(objeto, 'memory_usage'):
+        uso = objeto.memory_usage(deep=True)
+        return int(uso.sum()) if hasattr(uso, 'sum') else int(uso)
+    if hasattr(objeto, 'nbytes'):
+        return int(objeto.nbytes)
+    tamanho = sys.getsizeof(objeto)
+    if isinstance(objeto, dict):
+        tamanho += sum(tamanho_profundo(chave, vistos) + tamanho_profundo(valor, vistos)
+                       for chave, valor in objeto.items())
+    elif isinstance(objeto, (list, tuple, set, frozenset)):
+        tamanho += sum(tamanho_profundo(item, vistos) for item in objeto)
+    elif hasattr(type(objeto), '__slots__'):
+        tamanho += sum(tamanho_profundo(getattr(objeto, nome), vistos) for nome in type(objeto).__slots__)
+    return tamanho
+
+def relatorio_memoria(snapshot):
+    """Bytes de cada estrutura do snapshot (semana atual processada e bytes crus de todas as semanas)
+
+    'particoes' conta só os bytes crus no heap; os mapeados de um arquivo vão em 'particoes_mapeadas'.
+    """
+    relatorio = {
+        'df_processado': tamanho_profundo(snapshot.df_processado),
+        'resumo_linhas': tamanho_profundo(snapshot.resumo_linhas),
+        'indice_cards': tamanho_profundo(snapshot.indice_cards),
+        'particoes': sum(particao.tamanho_em_memoria for particao in snapshot.particoes.values()),
+    }
+    relatorio['total'] = sum(relatorio.values())
+    relatorio['particoes_mapeadas'] = sum(particao.tamanho for particao in snapshot.particoes.values()) - relatorio['particoes']
+    return relatorio
+
+def _percentil(ordenados, p):
+    """Percentil por posição mais próxima (valores já ordenados)"""
+    return ordenados[max(0, math.ceil(p / 100 * len(ordenados)) - 1)]
+
+class RegistroDesempenho:
+    """Destino das medições do processo: janela móvel por evento e log JSON-lines
+
+    adicionar() só enfileira o registro para o log: uma thread gravadora junta o
+    que estiver na fila e grava tudo de uma vez, fora do lock, então quem mede
+    (rerun, fragmento, atualização) não espera pelo disco. Falhas de gravação do
+    log não interrompem o painel; a última fica em `erro_log`.
+    """
+
+    def __init__(self, arquivo=ARQUIVO_LOG, janela=JANELA, tamanho_maximo=TAMANHO_MAXIMO_LOG):
+        self.arquivo = Path(arquivo) if arquivo is not None else None
+        self.tamanho_maximo = tamanho_maximo
+        self.erro_log = None
+        self._janela = janela
+        self._registros = {}
+        self._lock = threading.Lock()
+        self._pendentes = queue.Queue()
+        self._gravador = None
+
+    def adicionar(self, registro):
+        with self._lock:
+            self._registros.setdefault(registro['evento'], deque(maxlen=self._janela)).append(registro)
+            if self.arquivo is not None and self._gravador is None:
+                self._gravador = threading.Thread(target=self._gravar_pendentes, name="gravador-desempenho",
+                                                  daemon=True)
+                self._gravador.start()
+        if self.arquivo is not None:
+            self._pendentes.put(registro)
+
+    def descarregar(self):
+        """Espera a thread gravadora gravar tudo o que já foi adicionado"""
+        if self._gravador is not None:
+            self._pendentes.join()
+
+    def _gravar_pendentes(self):
+        while True:
+            lote = [self._pendentes.get()]
+            while True:
+                try:
+                    lote.append(self._pendentes.get_nowait())
+                except queue.Empty:
+                    break
+            self._gravar(lote)
+            for _ in lote:
+                self._pendentes.task_done()
+
+    def _gravar(self, lote):
+        try:
+            self.arquivo.parent.mkdir(parents=True, exist_ok=True)
+            if self.arquivo.exists() and self.arquivo.stat().st_size > self.tamanho_maximo:
+                os.replace(self.arquivo, self.arquivo.with_name(self.arquivo.name + '.1'))
+            with open(self.arquivo, 'a', encoding='utf-8') as log:
+                log.writelines(json.dumps(registro, ensure_ascii=False) + '\n' for registro in lote)
+            self.erro_log = None
+        except OSError as e:
+            self.erro_log = str(e)
+
+    def ultimo(self, evento, campo=None):
+        """Registro mais recente do evento (com `campo`, o mais recente que o tenha); None se não houver"""
+        registros = list(self._registros.get(evento, ()))
+        for registro in reversed(registros):
+            if campo is None or campo in registro:
+                return registro
+        return None
+
+    def percentis(self):
+        """Uma linha por (evento, fase) com amostras, p50 e p95 em ms na janela atual"""
+        with self._lock:
+            janelas = {evento: list(registros) for evento, registros in self._registros.items()}
+        linhas = []
+        for evento, registros in sorted(janelas.items()):
+            tempos = {'total': [registro['total_ms'] for registro in registros]}
+            for registro in registros:
+                for fase, ms in registro['fases_ms'].items():
+                    tempos.setdefault(fase, []).append(ms)
+            for fase, valores in tempos.items():
+                valores.sort()
+                linhas.append({
+                    'evento': evento,
+                    'fase': fase,
+                    'amostras': len(valores),
+                    'p50_ms': _percentil(valores, 50),
+                    'p95_ms': _percentil(valores, 95),
+                })
+        return linhas
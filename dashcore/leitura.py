@@ -0,0 +1,213 @@
+"""Leitura tipada do CSV exportado pelo ERP (querygerencial.csv)"""
+import io
+import re
+
+import pandas as pd
+
+# Esquema fixo da exportação. Colunas numéricas com ponto decimal ('139.6001')
+# são convertidas direto pelo parser C; as colunas APONT_* vêm no formato
+# brasileiro ('1.239,00000') e são convertidas logo após a leitura.
+ESQUEMA_CSV = {
+    'SEMANA_LABEL': str,
+    'CODWCP': 'Int64',
+    'LINHA': str,
+    'CODPROD': 'Int64',
+    'DESCRPROD': str,
+    'SEGUNDA': 'float64',
+    'TERCA': 'float64',
+    'QUARTA': 'float64',
+    'QUINTA': 'float64',
+    'SEXTA': 'float64',
+    'SABADO': 'float64',
+    'DOMINGO': 'float64',
+    'SEQ': 'float64',
+    'QTDAPONTADA': 'float64',
+    'TOTALSEMANA': 'float64',
+    'SALDOSEMANA': 'float64',
+    'DHAPO': str,
+}
+
+COLUNAS_FORMATO_BR = ['APONT_SEG', 'APONT_TER', 'APONT_QUA', 'APONT_QUI', 'APONT_SEX', 'APONT_SAB', 'APONT_DOM']
+
+COLUNAS_LIDAS = set(ESQUEMA_CSV) | set(COLUNAS_FORMATO_BR)
+
+COLUNA_SEMANA = 'SEMANA_LABEL'
+
+OPCOES_LEITURA = {
+    'sep': ';',
+    'encoding': 'utf-8-sig',  # remove o BOM do início do arquivo
+    'engine': 'c',
+    'usecols': lambda coluna: coluna in COLUNAS_LIDAS,
+}
+
+REGISTROS_POR_BLOCO = 50000  # registros por pd.read_csv(chunksize=...) na leitura em blocos
+
+class _LeitorPartes(io.RawIOBase):
+    """Arquivo só de leitura sobre uma sequência de buffers, sem juntá-los"""
+
+    def __init__(self, partes):
+        self._partes = [memoryview(parte).cast('B') for parte in partes]
+        self._indice = 0
+        self._offset = 0
+
+    def readable(self):
+        return True
+
+    def seekable(self):
+        return True
+
+    def seek(self, posicao, de_onde=io.SEEK_SET):
+        if posicao != 0 or de_onde != io.SEEK_SET:
+            raise io.UnsupportedOperation("só é possível voltar ao início")
+        self._indice = self._offset = 0
+        return 0
+
+    def readinto(self, destino):
+        destino = memoryview(destino).cast('B')
+        lidos = 0
+        while lidos < len(destino) and self._indice < len(self._partes):
+            parte = self._partes[self._indice]
+            quantidade = min(len(destino) - lidos, len(parte) - self._offset)
+            destino[lidos:lidos + quantidade] = parte[self._offset:self._offset + quantidade]
+            lidos += quantidade
+            self._offset += quantidade
+            if self._offset == len(parte):
+                self._indice += 1
+                self._offset = 0
+        return lidos
+
+def _abrir(origem):
+    """Aceita o conteúdo em bytes, uma lista de buffers em ordem, um caminho ou um arquivo já aberto"""
+    if isinstance(origem, bytes):
+        return io.BytesIO(origem)
+    if isinstance(origem, (list, tuple)):
+        return io.BufferedReader(_LeitorPartes(origem))
+    return origem
+
+def _agrupar_blocos(conteudo, inicio):
+    """Agrupa as linhas em blocos consecutivos da mesma semana
+
+    O ERP exporta as semanas em sequência; a regex acha o fim de cada bloco em C,
+    sem um laço Python por linha. Os blocos são memoryviews do conteúdo (bytes ou
+    mmap), sem cópia.
+    """
+    visao = memoryview(conteudo)
+    grupos = {}
+    sem_semana = 0
+    pos = inicio
+    while pos < len(conteudo):
+        fim_linha = conteudo.find(b'\n', pos)
+        fim_linha = len(conteudo) if fim_linha < 0 else fim_linha + 1
+        semana = conteudo[pos:fim_linha].split(b';', 1)[0].strip()
+        if not semana:
+            sem_semana += bool(conteudo[pos:fim_linha].strip())  # ex.: linha de totais do ERP
+            pos = fim_linha
+            continue
+
+        outra_semana = re.compile(rb'\n(?!' + re.escape(semana) + rb';)')
+        encontrado = outra_semana.search(conteudo, pos)
+        fim = len(conteudo) if encontrado is None else encontrado.start() + 1
+        grupos.setdefault(semana, []).append(visao[pos:fim])
+        pos = fim
+    return grupos, sem_semana
+
+def dividir_por_semana(conteudo):
+    """Separa os bytes do CSV por SEMANA_LABEL sem fazer o parse das colunas
+
+    Retorna ({semana: [cabeçalho, blocos...]}, linhas sem semana), ou None se o
+    arquivo não tiver SEMANA_LABEL como primeira coluna ou usar aspas (campos
+    com ';' ou quebra de linha não podem ser separados só pelo prefixo).
+    Aceita bytes ou um mmap do arquivo; os blocos são memoryviews dele, quem
+    guarda uma semana junta as partes.
+    """
+    if conteudo.find(b'"') >= 0:
+        return None
+    fim_cabecalho = conteudo.find(b'\n') + 1
+    if not fim_cabecalho or b'\r' in conteudo[:fim_cabecalho - 2]:
+        return None  # arquivo vazio ou com quebras de linha só em '\r'
+    cabecalho = conteudo[:fim_cabecalho]
+    if cabecalho.lstrip(b'\xef\xbb\xbf').split(b';', 1)[0].strip() != COLUNA_SEMANA.encode():
+        return None
+
+    grupos, sem_semana = _agrupar_blocos(conteudo, fim_cabecalho)
+    return {semana.decode('utf-8'): [cabecalho, *partes] for semana, partes in grupos.items()}, sem_semana
+
+def _converter_formato_br(serie):
+    """Converte '1.239,00000' em 1239.0 para a coluna inteira"""
+    texto = serie.str.replace('.', '', regex=False).str.replace(',', '.', regex=False)
+    return pd.to_numeric(texto, errors='coerce')
+
+def _ler(origem, dtype, registros_por_bloco):
+    """Blocos lidos do início do arquivo: o arquivo inteiro num bloco só, ou registros_por_bloco por vez"""
+    if hasattr(origem, 'seek'):
+        origem.seek(0)
+    if registros_por_bloco is None:
+        yield pd.read_csv(origem, dtype=dtype, **OPCOES_LEITURA)
+        return
+    with pd.read_csv(origem, dtype=dtype, chunksize=registros_por_bloco, **OPCOES_LEITURA) as leitor:
+        yield from leitor
+
+def _tipar(df, numericas_como_texto):
+    """Converte as colunas lidas como texto e descarta as linhas ruins; retorna (df, rejeitadas)"""
+    rejeitadas = {}
+    invalidos = None
+
+    if numericas_como_texto:
+        # Algum valor não numérico: as colunas numéricas vieram como texto para identificar as linhas ruins
+        invalidos = pd.Series(False, index=df.index)
+        for col, tipo in ESQUEMA_CSV.items():
+            if tipo is not str and col in df.columns:
+                convertido = pd.to_numeric(df[col], errors='coerce')
+                invalidos |= convertido.isna() & df[col].notna()
+                df[col] = convertido.astype(tipo)
+
+    for col in COLUNAS_FORMATO_BR:
+        if col in df.columns:
+            convertido = _converter_formato_br(df[col])
+            falhou = convertido.isna() & df[col].notna()
+            invalidos = falhou if invalidos is None else invalidos | falhou
+            df[col] = convertido
+
+    if 'LINHA' in df.columns:
+        sem_linha = df['LINHA'].isna() | (df['LINHA'].str.strip() == '')
+        if sem_linha.any():
+            rejeitadas['sem_linha'] = int(sem_linha.sum())
+            df = df[~sem_linha]
+            if invalidos is not None:
+                invalidos = invalidos[~sem_linha]
+
+    if invalidos is not None and invalidos.any():
+        rejeitadas['valor_invalido'] = int(invalidos.sum())
+        df = df[~invalidos]
+
+    return df, rejeitadas
+
+def _ler_tipado(origem, numericas_como_texto, registros_por_bloco):
+    colunas_texto = COLUNAS_FORMATO_BR
+    if numericas_como_texto:
+        colunas_texto = colunas_texto + [col for col, tipo in ESQUEMA_CSV.items() if tipo is not str]
+    dtype = {**ESQUEMA_CSV, **{col: str for col in colunas_texto}}
+
+    blocos = []
+    rejeitadas = {}
+    for bloco in _ler(origem, dtype, registros_por_bloco):
+        df, rejeitadas_bloco = _tipar(bloco, numericas_como_texto)
+        blocos.append(df)
+        for motivo, quantidade in rejeitadas_bloco.items():
+            rejeitadas[motivo] = rejeitadas.get(motivo, 0) + quantidade
+    df = blocos[0] if len(blocos) == 1 else pd.concat(blocos)
+    return df.reset_index(drop=True), rejeitadas
+
+def ler_csv_erp(origem, registros_por_bloco=None):
+    """Lê o CSV do ERP em uma única passada tipada
+
+    Retorna (df, rejeitadas), onde rejeitadas conta as linhas descartadas por motivo.
+    Com `registros_por_bloco` o parse é feito em blocos (pd.read_csv com
+    chunksize), cada um tipado e filtrado antes do próximo: o arquivo não é
+    lido de uma vez, só o df final fica inteiro na memória.
+    """
+    origem = _abrir(origem)
+    try:
+        return _ler_tipado(origem, False, registros_por_bloco)
+    except ValueError:
+        return _ler_tipado(origem, True, registros_por_bloco)
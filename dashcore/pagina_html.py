@@ -0,0 +1,68 @@
+"""Página de cards montada como um único bloco HTML a partir de um modelo pré-calculado
+
+Cada card é um dict (o "modelo") com os valores já resolvidos e os números já
+formatados (ver dashcore.indice_cards); aqui só há markup com as classes de
+dashcore.tema. A página inteira vira um st.markdown: um delta por rerun
+em vez de cinco a dez elementos por card.
+"""
+import html
+
+import pandas as pd
+
+from dashcore.gauge_svg import gerar_gauge_svg
+
+def formatar_milhar(valor):
+    """1234.0 -> '1.234' (separador de milhar brasileiro, sem casas decimais)"""
+    return f"{valor:,.0f}".replace(",", ".")
+
+def formatar_apontamento(dh_apontamento):
+    """DHAPO_LINHA como 'dd/mm/aaaa hh:mm'; '' se não houver"""
+    if not dh_apontamento or pd.isna(dh_apontamento):
+        return ""
+    try:
+        if isinstance(dh_apontamento, str):
+            dh_apontamento = pd.to_datetime(dh_apontamento)
+        return dh_apontamento.strftime("%d/%m/%Y %H:%M")
+    except Exception:
+        return str(dh_apontamento)
+
+def renderizar_card(card, destaque=True):
+    """HTML de um card; `destaque` usa textos em negrito e gauge maior (painel de mesa) ou discretos (TV)"""
+    linha = html.escape(card['linha'])
+    descrprod = html.escape(card['descrprod'])
+    percentual_linha = card['percentual_linha']
+    classes = f"dp-card dp-status-{card['prioridade']}" + (" dp-destaque" if destaque else "")
+    classe_texto_barra = "dp-progresso-texto dp-sobre-barra" if percentual_linha > 70 else "dp-progresso-texto"
+
+    return "".join([
+        f'<div class="{classes}">',
+        # Cabeçalho com a cor do status
+        '<div class="dp-cabecalho"><div class="dp-titulo">',
+        f'<h4 class="dp-linha" title="{linha}">{html.escape(card["linha_exibida"])}</h4>',
+        f'<span class="dp-icone">{card["icone"]}</span>',
+        '</div></div>',
+        # Produto em exibição
+        f'<div class="dp-produto" title="{descrprod}">{html.escape(card["descrprod_exibido"])}</div>',
+        f'<div class="dp-produto" title="{descrprod}">| ⚙️: {card["posicao_produto"]}º | ✅: {card["qtd_produzida_texto"]} '
+        f'| 🎯: {card["meta_texto"]} | 📊: {card["percentual_produto_texto"]} |</div>',
+        # Barra de progresso da linha (a largura é o único estilo por card)
+        '<div class="dp-progresso">',
+        f'<div class="dp-progresso-barra" style="width: {min(percentual_linha, 100):.1f}%;"></div>',
+        f'<div class="{classe_texto_barra}">{card["total_produzido_texto"]} / {card["total_objetivo_texto"]}</div>',
+        '</div>',
+        # Gauge e último apontamento lado a lado
+        f'<div class="dp-rodape"><div>{gerar_gauge_svg(percentual_linha)}</div><div>',
+        '<div class="dp-apontamento-titulo">Último Apontamento</div>',
+        f'<div class="dp-apontamento">{html.escape(card["ultimo_apontamento"] or "N/A")}</div>',
+        f'<p class="dp-produtos">📦 {card["posicao_produto"]}/{card["total_produtos"]} produtos</p>',
+        '</div></div></div>',
+    ])
+
+def grade(cards_html, colunas=2, id_grade=None):
+    """Contêiner da grade; `id_grade` permite que o script de rotação o encontre"""
+    atributo_id = f' id="{id_grade}"' if id_grade else ''
+    return f'<div{atributo_id} class="dp-grade dp-colunas-{colunas}">{cards_html}</div>'
+
+def renderizar_pagina(cards, colunas=2, **opcoes):
+    """Grade de cards em um único bloco HTML (sem linhas em branco, para o markdown não quebrar o bloco)"""
+    return grade("".join(renderizar_card(card, **opcoes) for card in cards), colunas)
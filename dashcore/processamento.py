@@ -0,0 +1,147 @@
+"""Processamento colunar dos dados de produção (sem iterrows)"""
+from datetime import datetime
+
+import numpy as np
+import pandas as pd
+
+COLUNAS_NECESSARIAS = ['LINHA', 'DESCRPROD', 'QTDAPONTADA', 'TOTALSEMANA', 'SALDOSEMANA']
+
+COLUNAS_PROCESSADAS = [
+    'LINHA', 'DESCRPROD', 'SEQ', 'META_DIA', 'QTDAPONTADA', 'TOTALSEMANA',
+    'PERC', 'SALDOSEMANA', 'DIA_ATUAL', 'COLUNA_USADA', 'DHAPO_LINHA'
+]
+
+# Textos repetidos em todo registro viram categorias (um código por registro e
+# cada texto guardado uma vez); quantidades em float32 e SEQ/META_DIA em int32
+COLUNAS_CATEGORICAS = ['LINHA', 'DESCRPROD', 'DIA_ATUAL', 'COLUNA_USADA']
+TIPOS_PROCESSADOS = {
+    'SEQ': 'int32',
+    'META_DIA': 'int32',
+    'QTDAPONTADA': 'float32',
+    'TOTALSEMANA': 'float32',
+    'PERC': 'float32',
+    'SALDOSEMANA': 'float32',
+    **{coluna: 'category' for coluna in COLUNAS_CATEGORICAS},
+}
+
+def obter_dia_atual():
+    """Retorna o dia da semana atual em português MAIÚSCULO para compatibilidade"""
+    dias_semana_portugues = ['SEGUNDA', 'TERCA', 'QUARTA', 'QUINTA', 'SEXTA', 'SABADO', 'DOMINGO']
+    dia_numero = datetime.now().weekday()
+    return dias_semana_portugues[dia_numero]
+
+def detectar_coluna_dia(df):
+    """Detecta automaticamente qual coluna corresponde ao dia atual"""
+    dia_atual = obter_dia_atual()
+
+    if dia_atual in df.columns:
+        return dia_atual
+
+    variacoes = {
+        'SEGUNDA': ['SEGUNDA', 'SEG', 'SEGUNDA-FEIRA', 'MONDAY', 'MON'],
+        'TERCA': ['TERCA', 'TER', 'TERÇA', 'TERCA-FEIRA', 'TUESDAY', 'TUE'],
+        'QUARTA': ['QUARTA', 'QUA', 'QUARTA-FEIRA', 'WEDNESDAY', 'WED'],
+        'QUINTA': ['QUINTA', 'QUI', 'QUINTA-FEIRA', 'THURSDAY', 'THU'],
+        'SEXTA': ['SEXTA', 'SEX', 'SEXTA-FEIRA', 'FRIDAY', 'FRI'],
+        'SABADO': ['SABADO', 'SAB', 'SÁBADO', 'SATURDAY', 'SAT'],
+        'DOMINGO': ['DOMINGO', 'DOM', 'SUNDAY', 'SUN']
+    }
+
+    for coluna in df.columns:
+        coluna_upper = str(coluna).upper().strip()
+        if dia_atual in variacoes:
+            if coluna_upper in variacoes[dia_atual]:
+                return coluna
+
+    return dia_atual
+
+def _converter_numerico(serie):
+    """Converte a coluna inteira como float() faria; retorna valores (nulos viram 0) e máscara de falhas"""
+    numeros = pd.to_numeric(serie, errors='coerce')
+    falhou = numeros.isna() & serie.notna()
+    return numeros.fillna(0).astype('float64'), falhou
+
+def _ultimo_apontamento_por_linha(df):
+    """Calcula o DHAPO mais recente de cada linha"""
+    if 'DHAPO' not in df.columns:
+        return {}
+
+    dh = df[['LINHA', 'DHAPO']].dropna()
+    if dh.empty:
+        return {}
+
+    convertidos = pd.to_datetime(dh['DHAPO'], errors='coerce', format='mixed')
+    mais_recentes = convertidos.groupby(dh['LINHA']).max().astype(object)
+
+    # Se alguma data da linha não converter, usar o último valor não-nulo
+    linhas_com_falha = dh.loc[convertidos.isna(), 'LINHA'].unique()
+    if len(linhas_com_falha):
+        ultimos = dh.groupby('LINHA')['DHAPO'].last()
+        mais_recentes = mais_recentes.where(~mais_recentes.index.isin(linhas_com_falha), ultimos)
+
+    return mais_recentes.to_dict()
+
+def processar_dados_base_real(df):
+    """Processa os dados usando a coluna correspondente ao dia atual"""
+    if df is None or df.empty:
+        return pd.DataFrame()
+
+    if any(col not in df.columns for col in COLUNAS_NECESSARIAS):
+        return pd.DataFrame()
+
+    coluna_dia_atual = detectar_coluna_dia(df)
+    dia_atual_nome = obter_dia_atual()
+
+    dh_apontamento_por_linha = _ultimo_apontamento_por_linha(df)
+
+    validas = df['LINHA'].notna() & (df['LINHA'] != '')
+
+    qtd_apontada, falha_qtd = _converter_numerico(df['QTDAPONTADA'])
+    total_semana, falha_total = _converter_numerico(df['TOTALSEMANA'])
+    saldo_semana, falha_saldo = _converter_numerico(df['SALDOSEMANA'])
+    validas &= ~(falha_qtd | falha_total | falha_saldo)
+
+    if coluna_dia_atual in df.columns:
+        meta_dia, falha_meta = _converter_numerico(df[coluna_dia_atual])
+        validas &= ~falha_meta & np.isfinite(meta_dia)
+    else:
+        meta_dia = pd.Series(0.0, index=df.index)
+
+    if 'SEQ' in df.columns:
+        seq, falha_seq = _converter_numerico(df['SEQ'])
+        validas &= ~falha_seq & np.isfinite(seq)
+    else:
+        seq = pd.Series(0.0, index=df.index)
+
+    if not validas.any():
+        return pd.DataFrame()
+
+    linha = df['LINHA'][validas].astype(str).str.strip()
+    # fillna mantém o texto 'nan' que str() gerava para descrições vazias
+    descrprod = df['DESCRPROD'][validas].fillna('nan').astype(str).str.strip()
+    qtd_apontada = qtd_apontada[validas]
+    total_semana = total_semana[validas]
+
+    with np.errstate(divide='ignore', invalid='ignore'):
+        percentual = np.where(total_semana > 0, qtd_apontada / total_semana * 100, 0.0)
+
+    dh_linha = None
+    if dh_apontamento_por_linha:
+        dh_linha = linha.map(dh_apontamento_por_linha).astype(object)
+        dh_linha = dh_linha.where(dh_linha.notna(), None).infer_objects()
+
+    processado = pd.DataFrame({
+        'LINHA': linha,
+        'DESCRPROD': descrprod,
+        'SEQ': seq[validas],
+        'META_DIA': meta_dia[validas],
+        'QTDAPONTADA': qtd_apontada,
+        'TOTALSEMANA': total_semana,
+        'PERC': np.round(percentual, 1),
+        'SALDOSEMANA': saldo_semana[validas],
+        'DIA_ATUAL': dia_atual_nome,
+        'COLUNA_USADA': coluna_dia_atual,
+        'DHAPO_LINHA': dh_linha
+    }, columns=COLUNAS_PROCESSADAS)
+
+    return processado.astype(TIPOS_PROCESSADOS).reset_index(drop=True)
@@ -0,0 +1,70 @@
+"""Resumo por linha (totais, percentual e status) calculado uma vez por snapshot"""
+import numpy as np
+import pandas as pd
+
+COLUNAS_RESUMO = [
+    'TOTAL_PRODUZIDO', 'TOTAL_OBJETIVO', 'PERCENTUAL', 'FAIXA',
+    'PRIORIDADE', 'COR', 'ICONE', 'STATUS_TEXTO'
+]
+
+# Faixas dos filtros da sidebar: No Target (≥90%), Em Andamento (75-89%), Atenção (<75%)
+FAIXAS_FILTRO = ['target', 'andamento', 'atencao']
+
+# (percentual mínimo, cor, ícone, texto, prioridade), do melhor status para o pior
+STATUS = [
+    (85, "#2878a7", "✅", "Meta Atingida", 1),
+    (70, "#28a745", "✅", "Próximo da Meta", 2),
+    (50, "#ffc107", "🟡", "Em Andamento", 3),
+    (None, "#dc3545", "🔴", "Atenção", 4),
+]
+
+def obter_cor_status(percentual):
+    """Retorna a cor e informações do status baseado no percentual"""
+    for minimo, cor, icone, texto, prioridade in STATUS:
+        if minimo is None or percentual >= minimo:
+            return cor, icone, texto, prioridade
+
+def resumir_por_linha(df):
+    """Agrega o df processado por LINHA, já ordenado do melhor status para o pior
+
+    O índice é a LINHA; empates de prioridade mantêm a ordem de aparição no arquivo.
+    """
+    if df is None or df.empty or 'LINHA' not in df.columns:
+        return pd.DataFrame(columns=COLUNAS_RESUMO, index=pd.Index([], name='LINHA'))
+
+    # Soma em float64 (o df processado guarda float32). Índice de objetos str: as listas de
+    # linhas filtradas de todas as sessões apontam para os mesmos textos, sem cópia por sessão
+    totais = df[['QTDAPONTADA', 'TOTALSEMANA']].astype('float64').groupby(df['LINHA'], sort=False).sum()
+    totais.index = pd.Index(totais.index.astype(object), dtype=object, name='LINHA')
+    produzido = totais['QTDAPONTADA']
+    objetivo = totais['TOTALSEMANA']
+    with np.errstate(divide='ignore', invalid='ignore'):
+        percentual = np.where(objetivo > 0, produzido / objetivo * 100, 0.0)
+
+    resumo = pd.DataFrame({
+        'TOTAL_PRODUZIDO': produzido,
+        'TOTAL_OBJETIVO': objetivo,
+        'PERCENTUAL': percentual,
+        'FAIXA': np.select([percentual >= 90, percentual >= 75], FAIXAS_FILTRO[:2], FAIXAS_FILTRO[2]),
+    }, index=totais.index)
+
+    # Poucas dezenas de linhas: reaproveitar obter_cor_status garante as mesmas faixas do card
+    status = [obter_cor_status(p) for p in percentual]
+    resumo['COR'] = [s[0] for s in status]
+    resumo['ICONE'] = [s[1] for s in status]
+    resumo['STATUS_TEXTO'] = [s[2] for s in status]
+    resumo['PRIORIDADE'] = [s[3] for s in status]
+
+    return resumo[COLUNAS_RESUMO].sort_values('PRIORIDADE', kind='stable')
+
+def filtrar_linhas(resumo, faixas, busca=""):
+    """Nomes das linhas nas faixas marcadas cujo nome contém a busca, na ordem do resumo"""
+    selecionadas = resumo['FAIXA'].isin(faixas)
+    if busca:
+        selecionadas &= resumo.index.str.lower().str.contains(busca.lower(), regex=False)
+    return resumo.index[selecionadas].tolist()
+
+def contar_faixas(resumo):
+    """Quantidade de linhas em cada faixa de filtro"""
+    contagem = resumo['FAIXA'].value_counts()
+    return {faixa: int(contagem.get(faixa, 0)) for faixa in FAIXAS_FILTRO}
@@ -0,0 +1,92 @@
+"""Rotação de produtos e páginas executada no navegador
+
+O servidor envia, uma vez por versão dos dados, o HTML de todos os produtos de
+todas as linhas filtradas; um script pequeno troca produto e página nos tempos
+configurados. Entre atualizações de dados o servidor não reexecuta o script.
+"""
+import hashlib
+import json
+
+from dashcore.pagina_html import grade, renderizar_card
+
+# Mesma máquina de estados de atualizar_rotacao(): após `tempoProduto` avança o
+# produto das linhas com mais de um produto e passa ao modo "linhas"; após
+# `tempoPagina` avança a página e volta ao modo "produtos".
+SCRIPT_ROTACAO = """
+(function () {
+  var id = %(id)s;
+  var dados = JSON.parse(document.getElementById(id + '-dados').textContent);
+  var raiz = document.getElementById(id);
+  // Estado global sobrevive à troca do elemento quando chega uma nova versão dos dados
+  var estado = window.__rotacaoDashprod = window.__rotacaoDashprod || {produtos: {}, pagina: 0, timer: null};
+  if (estado.timer) { clearInterval(estado.timer); }
+  var modo = 'produtos';
+  var ultimaTroca = Date.now();
+
+  function totalPaginas() {
+    return Math.max(1, Math.ceil(dados.linhas.length / dados.porPagina));
+  }
+
+  function desenhar() {
+    estado.pagina = estado.pagina %% totalPaginas();
+    var inicio = estado.pagina * dados.porPagina;
+    raiz.innerHTML = dados.linhas.slice(inicio, inicio + dados.porPagina).map(function (linha) {
+      return linha.cards[(estado.produtos[linha.nome] || 0) %% linha.cards.length];
+    }).join('');
+  }
+
+  function tique() {
+    if (!document.body.contains(raiz)) { clearInterval(estado.timer); return; }
+    if (!dados.ativa) { return; }
+    var decorrido = (Date.now() - ultimaTroca) / 1000;
+    if (modo === 'produtos' && decorrido >= dados.tempoProduto) {
+      dados.linhas.forEach(function (linha) {
+        if (linha.cards.length > 1) {
+          estado.produtos[linha.nome] = ((estado.produtos[linha.nome] || 0) + 1) %% linha.cards.length;
+        }
+      });
+      modo = 'linhas';
+      ultimaTroca = Date.now();
+      desenhar();
+    } else if (modo === 'linhas' && decorrido >= dados.tempoPagina) {
+      estado.pagina = (estado.pagina + 1) %% totalPaginas();
+      modo = 'produtos';
+      ultimaTroca = Date.now();
+      desenhar();
+    }
+  }
+
+  desenhar();
+  estado.timer = setInterval(tique, 1000);
+})();
+"""
+
+def renderizar_rotacao(cards_por_linha, colunas=2, linhas_por_pagina=None, tempo_por_produto=10,
+                       tempo_por_pagina=30, ativa=True, **opcoes):
+    """HTML + script para st.html(..., unsafe_allow_javascript=True)
+
+    `cards_por_linha` é uma lista de (linha, [modelo de card de cada produto]);
+    `linhas_por_pagina=None` exibe todas as linhas em uma página (painel TV).
+    """
+    linhas = [
+        {'nome': linha, 'cards': [renderizar_card(card, **opcoes) for card in cards]}
+        for linha, cards in cards_por_linha
+    ]
+    dados = {
+        'linhas': linhas,
+        'porPagina': linhas_por_pagina or max(1, len(linhas)),
+        'tempoProduto': tempo_por_produto,
+        'tempoPagina': tempo_por_pagina,
+        'ativa': ativa,
+    }
+    conteudo = json.dumps(dados, ensure_ascii=False).replace('</', '<\\/')
+    # O id muda com o conteúdo: uma versão nova dos dados substitui o elemento e reinicia o script
+    id_grade = 'rotacao-' + hashlib.blake2b(conteudo.encode('utf-8'), digest_size=6).hexdigest()
+
+    # Primeira página já renderizada no servidor: aparece mesmo antes (ou sem) o script
+    primeira_pagina = "".join(linha['cards'][0] for linha in linhas[:dados['porPagina']])
+    return (
+        grade(primeira_pagina, colunas, id_grade)
+        + f'<script type="application/json" id="{id_grade}-dados">{conteudo}</script>'
+        + '<script>' + SCRIPT_ROTACAO % {'id': json.dumps(id_grade)} + '</script>'
+    )
@@ -0,0 +1,114 @@
+"""Ingestão particionada por SEMANA_LABEL: semana atual processada na carga, as demais sob demanda"""
+import mmap
+import threading
+from datetime import date
+
+from dashcore.fonte_github import impressao_digital, impressao_digital_partes
+from dashcore.indice_cards import indexar_cards
+from dashcore.instrumentacao import Medicao
+from dashcore.leitura import REGISTROS_POR_BLOCO, dividir_por_semana, ler_csv_erp
+from dashcore.processamento import obter_dia_atual, processar_dados_base_real
+from dashcore.resumo import resumir_por_linha
+
+def rotulo_semana(data=None):
+    """Rótulo ISO da semana no formato do ERP ('2025-47')"""
+    ano, semana, _ = (data or date.today()).isocalendar()
+    return f"{ano}-{semana:02d}"
+
+def dia_processamento():
+    """(semana ISO, dia da semana) de que o processamento depende: META_DIA, COLUNA_USADA e a semana atual"""
+    return (rotulo_semana(), obter_dia_atual())
+
+def versao_dos_dados(digest, dia):
+    """Versão do que as telas exibem: o mesmo arquivo processado em outro dia é outra versão"""
+    return impressao_digital(f"{digest}|{dia[0]}|{dia[1]}".encode('utf-8'))
+
+def escolher_semana_atual(semanas):
+    """Semana corrente se estiver no arquivo; senão a mais recente disponível"""
+    semanas = [semana for semana in semanas if semana is not None]
+    if not semanas:
+        return None
+    atual = rotulo_semana()
+    return atual if atual in semanas else max(semanas)
+
+class ParticaoSemana:
+    """Linhas cruas de uma semana; leitura e processamento só no primeiro acesso
+
+    `partes` são os buffers da semana em ordem (cabeçalho e blocos): bytes ou
+    memoryviews de um arquivo mapeado, juntados só quando a semana é lida. Os
+    dados processados valem para o dia_processamento() em que foram calculados.
+    """
+
+    def __init__(self, semana, partes, versao=None, dados=None, dia=None):
+        self.semana = semana
+        self.partes = tuple(partes)
+        self.versao = versao or impressao_digital_partes(self.partes)
+        self._dados = dados
+        self._dia = dia
+        self._lock = threading.Lock()
+
+    @property
+    def carregada(self):
+        return self._dados is not None and self._dia == dia_processamento()
+
+    @property
+    def tamanho(self):
+        return sum(len(parte) for parte in self.partes)
+
+    @property
+    def tamanho_em_memoria(self):
+        """Bytes no heap do processo; views de um mmap ficam no cache de páginas do sistema"""
+        return sum(len(parte) for parte in self.partes if not isinstance(getattr(parte, 'obj', None), mmap.mmap))
+
+    def carregar(self, medicao=None):
+        """(df_processado, resumo_linhas, indice_cards, rejeitadas, colunas_origem), calculado uma vez por dia
+
+        Com `medicao`, o tempo de cada etapa entra como fase dela (só quando calcula).
+        Num dia novo (outra coluna de META_DIA) é calculado de novo.
+        """
+        dia = dia_processamento()
+        if self._dados is None or self._dia != dia:
+            medicao = medicao or Medicao('particao')
+            with self._lock:
+                if self._dados is None or self._dia != dia:
+                    with medicao.fase('leitura'):
+                        # Partição única (arquivo sem SEMANA_LABEL ou com aspas): em blocos, sem juntar o arquivo
+                        bloco = REGISTROS_POR_BLOCO if self.semana is None else None
+                        df, rejeitadas = ler_csv_erp(self.partes, registros_por_bloco=bloco)
+                    with medicao.fase('processamento'):
+                        df_processado = processar_dados_base_real(df)
+                    with medicao.fase('resumo_linhas'):
+                        resumo = resumir_por_linha(df_processado)
+                    with medicao.fase('indice_cards'):
+                        indice = indexar_cards(df_processado, resumo)
+                    self._dados = (df_processado, resumo, indice, rejeitadas, tuple(df.columns))
+                    self._dia = dia
+        return self._dados
+
+def particionar(conteudo, anteriores=None, copiar=True):
+    """Divide o arquivo em partições por semana, reaproveitando as que não mudaram
+
+    Retorna (particoes, rejeitadas). Semanas com os mesmos bytes da versão anterior
+    mantêm a partição antiga, já processada; sem SEMANA_LABEL o arquivo inteiro
+    vira uma partição só (chave None). Com copiar=False as partições novas
+    guardam views do conteúdo em vez de cópias (só para um conteúdo que ninguém
+    mais altera, como a cópia lida por fonte_github ou fonte_local).
+    """
+    anteriores = anteriores or {}
+    divisao = dividir_por_semana(conteudo)
+    if divisao is None or not divisao[0]:
+        return {None: ParticaoSemana(None, [bytes(conteudo) if copiar else memoryview(conteudo)])}, {}
+
+    blocos, sem_semana = divisao
+    particoes = {}
+    for semana, partes in blocos.items():
+        # Digest direto das partes: só a semana que mudou é copiada
+        versao = impressao_digital_partes(partes)
+        anterior = anteriores.get(semana)
+        if anterior is not None and anterior.versao == versao:
+            particoes[semana] = anterior
+        else:
+            particoes[semana] = ParticaoSemana(semana, [b''.join(partes)] if copiar else partes, versao)
+
+    rejeitadas = {'sem_semana': sem_semana} if sem_semana else {}
+    return particoes, rejeitadas
@@ -0,0 +1,252 @@
+"""Serviço HTTP leve (asyncio) com o estado agregado por linha para telas simples
+
+Telas em mini-PCs não precisam do app Streamlit inteiro, só dos números que o
+card de cada linha mostra. O serviço lê o mesmo RepositorioSnapshots dos
+dashboards (mesmo download, processamento e cache em disco) e monta o JSON uma
+vez por versão; todos os clientes recebem os mesmos bytes.
+
+- GET /linhas: JSON da versão atual, com a versão no ETag;
+- GET /linhas?versao=V (ou If-None-Match: "V"): long-poll, responde quando a
+  versão deixar de ser V ou com 304 depois de `espera` segundos (máx. ESPERA_MAXIMA);
+- GET /eventos: Server-Sent Events, um evento 'linhas' a cada versão nova
+  (Last-Event-ID com a versão atual pula o envio inicial).
+
+Uso: python -m dashcore.servico_tv URL [--porta 8765] [--host 0.0.0.0] [--intervalo 60]
+"""
+import argparse
+import asyncio
+import json
+import math
+import threading
+from urllib.parse import parse_qs, urlsplit
+
+from dashcore.indice_cards import CAMPOS_PRODUTO, produtos_na_linha
+
+PORTA_PADRAO = 8765
+ESPERA_PADRAO = 25   # segundos de long-poll sem versão nova antes do 304
+ESPERA_MAXIMA = 55   # abaixo do timeout ocioso comum de proxies (60s)
+INTERVALO_PING = 15  # comentário SSE para a conexão não ser derrubada por inatividade
+RETRY_SSE = 5000     # ms até o EventSource reconectar
+TAMANHO_MAXIMO_CABECALHOS = 16 * 1024
+
+STATUS_HTTP = {200: 'OK', 304: 'Not Modified', 400: 'Bad Request', 404: 'Not Found',
+               405: 'Method Not Allowed', 503: 'Service Unavailable'}
+
+def estado_linhas(snapshot):
+    """JSON compacto (bytes) com o que o card de cada linha exibe, na ordem da grade"""
+    resumo = snapshot.resumo_linhas
+    indice_cards = snapshot.indice_cards
+    linhas = []
+    for linha, percentual, cor, icone, status, faixa in zip(
+        resumo.index, resumo['PERCENTUAL'], resumo['COR'], resumo['ICONE'], resumo['STATUS_TEXTO'], resumo['FAIXA'],
+    ):
+        total_produtos = produtos_na_linha(indice_cards, linha)
+        if not total_produtos:
+            continue
+        inicio, fim = indice_cards.faixa(linha)
+        campos_linha = indice_cards.campos_linha(linha)
+        linhas.append({
+            'linha': linha,
+            'percentual': round(float(percentual), 1),
+            'cor': cor,
+            'icone': icone,
+            'status': status,
+            'faixa': faixa,
+            'produzido': campos_linha['total_produzido_texto'],
+            'objetivo': campos_linha['total_objetivo_texto'],
+            'ultimo_apontamento': campos_linha['ultimo_apontamento'],
+            'produtos': [list(produto) for produto in zip(
+                *(indice_cards.produtos[campo][inicio:fim] for campo in CAMPOS_PRODUTO)
+            )],
+        })
+    estado = {
+        'versao': snapshot.versao,
+        'semana': snapshot.semana,
+        'carregado_em': round(snapshot.carregado_em, 3),
+        'linhas': linhas,
+    }
+    return json.dumps(estado, ensure_ascii=False, separators=(',', ':')).encode('utf-8')
+
+class ServicoTV:
+    """Servidor asyncio de uma URL de dados; acorda os clientes só quando a versão muda"""
+
+    def __init__(self, repositorio, url, intervalo=60):
+        self.repositorio = repositorio
+        self.url = url
+        self.intervalo = intervalo
+        self.versao = None
+        self.corpo = None
+        self.carregado_em = None
+        self.clientes_sse = 0
+        self.porta = None
+        self.pronto = threading.Event()  # porta aberta (com porta 0, self.porta diz qual)
+        self._loop = None
+        self._mudou = None
+        self._servidor = None
+
+    def _ao_publicar(self, snapshot):
+        """Observador do repositório (thread de atualização): monta o JSON aqui, fora do loop"""
+        if snapshot.url != self.url or self._loop is None:
+            return
+        corpo = estado_linhas(snapshot)
+        try:
+            self._loop.call_soon_threadsafe(self._publicar, snapshot.versao, snapshot.carregado_em, corpo)
+        except RuntimeError:
+            pass  # loop já encerrado
+
+    def _publicar(self, versao, carregado_em, corpo):
+        # Snapshot mais antigo que o publicado (o do disco montado em iniciar() depois
+        # que a thread de atualização já publicou o novo) não volta para os clientes
+        if versao == self.versao or (self.carregado_em is not None and carregado_em < self.carregado_em):
+            return
+        self.versao, self.carregado_em, self.corpo = versao, carregado_em, corpo
+        # Quem espera guarda o evento da versão que viu; o próximo é novo e ainda não disparou
+        mudou, self._mudou = self._mudou, asyncio.Event()
+        mudou.set()
+
+    async def _aguardar_mudanca(self, versao, espera):
+        """True se a versão deixou de ser `versao` dentro de `espera` segundos"""
+        mudou = self._mudou
+        if self.versao != versao:
+            return True
+        try:
+            await asyncio.wait_for(mudou.wait(), espera)
+        except asyncio.TimeoutError:
+            return False
+        return True
+
+    async def iniciar(self, host='0.0.0.0', porta=PORTA_PADRAO):
+        """Abre a porta e liga o serviço ao repositório; retorna o asyncio.Server"""
+        self._loop = asyncio.get_running_loop()
+        self._mudou = asyncio.Event()
+        self.repositorio.observar(self._ao_publicar)
+        # Mesmo caminho do importar_csv_github: thread de atualização do repositório,
+        # mantida enquanto o serviço existir (leitor permanente)
+        self.repositorio.iniciar_atualizacao(self.url, self.intervalo, permanente=True)
+        snapshot = self.repositorio.obter(self.url)
+        if snapshot is not None:
+            self._publicar(snapshot.versao, snapshot.carregado_em, await asyncio.to_thread(estado_linhas, snapshot))
+        # Cabeçalhos acima do limite levantam LimitOverrunError e a conexão é fechada
+        self._servidor = await asyncio.start_server(self._atender, host, porta, limit=TAMANHO_MAXIMO_CABECALHOS)
+        self.porta = self._servidor.sockets[0].getsockname()[1]
+        self.pronto.set()
+        return self._servidor
+
+    async def servir(self, host='0.0.0.0', porta=PORTA_PADRAO):
+        servidor = await self.iniciar(host, porta)
+        async with servidor:
+            await servidor.serve_forever()
+
+    async def _atender(self, leitor, escritor):
+        try:
+            requisicao = await self._ler_requisicao(leitor)
+            if requisicao is None:
+                await self._responder(escritor, 400)
+                return
+            metodo, caminho, consulta, cabecalhos = requisicao
+            if metodo != 'GET':
+                await self._responder(escritor, 405)
+            elif caminho == '/linhas':
+                await self._linhas(escritor, consulta, cabecalhos)
+            elif caminho == '/eventos':
+                await self._eventos(escritor, cabecalhos)
+            else:
+                await self._responder(escritor, 404)
+        except (ConnectionError, asyncio.IncompleteReadError, asyncio.LimitOverrunError):
+            pass  # cliente desconectou no meio da requisição ou do stream
+        finally:
+            escritor.close()
+
+    async def _ler_requisicao(self, leitor):
+        """(método, caminho, consulta, cabeçalhos) da requisição; None se malformada"""
+        bloco = await leitor.readuntil(b'\r\n\r\n')
+        linhas = bloco.decode('latin-1').split('\r\n')
+        partes = linhas[0].split()
+        if len(partes) != 3:
+            return None
+        cabecalhos = {}
+        for linha in linhas[1:]:
+            nome, separador, valor = linha.partition(':')
+            if separador:
+                cabecalhos[nome.strip().lower()] = valor.strip()
+        alvo = urlsplit(partes[1])
+        consulta = {nome: valores[-1] for nome, valores in parse_qs(alvo.query).items()}
+        return partes[0], alvo.path, consulta, cabecalhos
+
+    async def _responder(self, escritor, status, corpo=b'', cabecalhos=None):
+        cabecalhos = {
+            'Content-Type': 'application/json; charset=utf-8',
+            'Cache-Control': 'no-cache',
+            'Access-Control-Allow-Origin': '*',
+            **(cabecalhos or {}),
+            'Content-Length': str(len(corpo)),
+            'Connection': 'close',
+        }
+        cabecalho = f"HTTP/1.1 {status} {STATUS_HTTP[status]}\r\n" + "".join(
+            f"{nome}: {valor}\r\n" for nome, valor in cabecalhos.items()
+        ) + "\r\n"
+        escritor.write(cabecalho.encode('latin-1'))
+        escritor.write(corpo)  # o mesmo objeto bytes para todos os clientes, sem cópia por resposta
+        await escritor.drain()
+
+    async def _linhas(self, escritor, consulta, cabecalhos):
+        versao_cliente = consulta.get('versao') or cabecalhos.get('if-none-match', '').strip('"') or None
+        if versao_cliente is not None:
+            try:
+                espera = float(consulta.get('espera', ESPERA_PADRAO))
+            except ValueError:
+                espera = math.nan
+            if not math.isfinite(espera):  # nan passaria pelo min()/max() e o wait_for nunca expiraria
+                await self._responder(escritor, 400)
+                return
+            espera = min(espera, ESPERA_MAXIMA)
+            if not await self._aguardar_mudanca(versao_cliente, max(espera, 0)):
+                await self._responder(escritor, 304, cabecalhos={'ETag': f'"{self.versao}"'})
+                return
+        if self.corpo is None:
+            await self._responder(escritor, 503, cabecalhos={'Retry-After': '5'})
+            return
+        await self._responder(escritor, 200, self.corpo, {'ETag': f'"{self.versao}"'})
+
+    async def _eventos(self, escritor, cabecalhos):
+        escritor.write(
+            b"HTTP/1.1 200 OK\r\nContent-Type: text/event-stream; charset=utf-8\r\n"
+            b"Cache-Control: no-cache\r\nAccess-Control-Allow-Origin: *\r\nConnection: keep-alive\r\n\r\n"
+            + f"retry: {RETRY_SSE}\n\n".encode()
+        )
+        await escritor.drain()
+        self.clientes_sse += 1
+        try:
+            enviada = cabecalhos.get('last-event-id')
+            while True:
+                if self.corpo is not None and self.versao != enviada:
+                    enviada = self.versao
+                    escritor.write(f"id: {enviada}\nevent: linhas\ndata: ".encode() + self.corpo + b"\n\n")
+                elif not await self._aguardar_mudanca(enviada, INTERVALO_PING):
+                    escritor.write(b": ping\n\n")
+                await escritor.drain()
+        finally:
+            self.clientes_sse -= 1
+
+def iniciar_em_thread(repositorio, url, porta=PORTA_PADRAO, host='0.0.0.0', intervalo=60):
+    """Serviço numa thread própria com seu loop, ao lado do dashboard no mesmo processo"""
+    servico = ServicoTV(repositorio, url, intervalo)
+    thread = threading.Thread(target=asyncio.run, args=(servico.servir(host, porta),),
+                              name=f"servico-tv {porta}", daemon=True)
+    thread.start()
+    return servico
+
+def main():
+    from dashcore.snapshot import RepositorioSnapshots
+
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('url', help="URL do CSV ou caminho do arquivo local (o mesmo configurado no dashboard)")
+    parser.add_argument('--porta', type=int, default=PORTA_PADRAO)
+    parser.add_argument('--host', default='0.0.0.0')
+    parser.add_argument('--intervalo', type=int, default=60, help="segundos entre verificações da fonte")
+    args = parser.parse_args()
+    print(f"Servindo {args.url} em http://{args.host}:{args.porta}/linhas e /eventos")
+    asyncio.run(ServicoTV(RepositorioSnapshots(), args.url, args.intervalo).servir(args.host, args.porta))
+
+if __name__ == '__main__':
+    main()
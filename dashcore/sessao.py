@@ -0,0 +1,341 @@
+"""Funções comuns ao dashprod.py e ao dashprodtv.py que leem o st.session_state
+
+É o único módulo do dashcore que importa o Streamlit. Os caches de processo
+(st.cache_resource) ficam aqui, então os dois dashboards no mesmo servidor
+compartilham repositório, registro de desempenho e planilhas processadas.
+"""
+import time
+
+import pandas as pd
+import streamlit as st
+
+from dashcore.compartilhado import CacheLRU
+from dashcore.fonte_github import converter_url_raw, impressao_digital
+from dashcore.fonte_local import eh_caminho_local
+from dashcore.indice_cards import indexar_cards, produtos_na_linha
+from dashcore.instrumentacao import RegistroDesempenho
+from dashcore.processamento import processar_dados_base_real
+from dashcore.resumo import resumir_por_linha
+from dashcore.semanas import dia_processamento, versao_dos_dados
+from dashcore.snapshot import ErroFonteDados, RepositorioSnapshots
+
+URL_PADRAO = "https://github.com/ALN84/produ/blob/main/backups/dash_prod.csv"
+
+@st.cache_resource
+def obter_registro_desempenho():
+    """Medições de todas as sessões e da thread de atualização, com o log JSON-lines do processo"""
+    return RegistroDesempenho()
+
+@st.cache_resource
+def obter_repositorio_snapshots():
+    """Repositório único por processo: todas as sessões compartilham o mesmo snapshot"""
+    return RepositorioSnapshots(registro_desempenho=obter_registro_desempenho())
+
+@st.cache_resource
+def obter_planilhas_processadas():
+    """Planilhas enviadas já processadas, por digest: a mesma planilha em várias telas é processada uma vez"""
+    return CacheLRU(capacidade=8)
+
+@st.cache_resource
+def obter_grades_rotacao():
+    """HTML da grade de rotação por dados, linhas e configuração, o mesmo para todas as telas iguais"""
+    return CacheLRU(capacidade=16)
+
+@st.cache_resource(ttl=60)
+def carregar_dados_exemplo():
+    """Amostra sintética no formato do ERP, processada uma vez por minuto para todas as sessões
+
+    A semente fixa as linhas e metas; só a produção do dia avança com o relógio.
+    """
+    # Só o caminho sem fonte configurada usa o gerador da amostra
+    from dashcore.leitura import ler_csv_erp
+    from dashcore.sintetico import gerar_csv
+
+    df, _ = ler_csv_erp(gerar_csv(linhas=12, semente=42))
+    df_processado = processar_dados_base_real(df)
+    resumo_linhas = resumir_por_linha(df_processado)
+    return df_processado, resumo_linhas, indexar_cards(df_processado, resumo_linhas)
+
+def registrar_medicao(medicao):
+    """Anota os dados exibidos pela sessão e entrega a medição ao registro do processo"""
+    medicao.anotar(**st.session_state.dados_exibidos)
+    obter_registro_desempenho().adicionar(medicao.concluir())
+
+def exibir_diagnostico():
+    """p50/p95 por fase na janela recente (todas as sessões do processo)"""
+    registro = obter_registro_desempenho()
+    percentis = registro.percentis()
+    if not percentis:
+        st.caption("Nenhuma medição ainda.")
+        return
+    st.dataframe(pd.DataFrame(percentis), hide_index=True)
+    ultima = registro.ultimo('atualizacao')
+    if ultima is not None:
+        st.caption(
+            f"Última atualização: status {ultima.get('status', '-')}, versão {(ultima.get('versao') or '-')[:8]}, "
+            f"{ultima.get('bytes', 0) / 1024:.1f} KB, {ultima.get('registros', 0)} registros, "
+            f"{ultima.get('linhas', 0)} linhas"
+        )
+    memoria = registro.ultimo('atualizacao', 'memoria')
+    if memoria is not None:
+        partes = ", ".join(f"{nome} {tamanho / 1024:.0f} KB" for nome, tamanho in memoria['memoria'].items())
+        st.caption(f"Memória do snapshot {(memoria.get('versao') or '-')[:8]}: {partes}")
+    if registro.erro_log:
+        st.caption(f"⚠️ Log não gravado: {registro.erro_log}")
+    elif registro.arquivo is not None:
+        st.caption(f"Log: {registro.arquivo}")
+
+def importar_csv_github(url, forcar=False):
+    """Obtém o snapshot compartilhado do CSV no GitHub e o retorna se for mais novo que o da sessão"""
+    try:
+        # Log para debug
+        st.sidebar.write(f"📡 Tentando acessar URL: {url}")
+        st.sidebar.write(f"🔄 URL convertida: {converter_url_raw(url)}")
+
+        repositorio = obter_repositorio_snapshots()
+        if forcar:
+            # Pedido explícito do usuário: revalidar a fonte agora
+            snapshot = repositorio.atualizar(url)
+        elif st.session_state.auto_refresh:
+            # Rerun sem I/O: a thread de atualização baixa e processa em segundo plano.
+            # Só a primeira carga do processo espera pelo download.
+            repositorio.iniciar_atualizacao(url, st.session_state.refresh_interval)
+            snapshot = repositorio.obter(url, aguardar=30)
+            erro = repositorio.ultimo_erro(url)
+            if snapshot is None:
+                if erro:
+                    raise ErroFonteDados(erro)
+                st.sidebar.info("⏳ Carregando dados em segundo plano...")
+                return None
+            if erro:
+                st.sidebar.warning(f"⚠️ Falha na última atualização, exibindo dados anteriores: {erro}")
+        else:
+            # Sem auto-refresh não há thread de atualização: só a primeira carga busca a fonte, aqui mesmo
+            snapshot = repositorio.obter(url) or repositorio.atualizar(url)
+
+        # Sessão já exibe esta versão (ou o arquivo não mudou): nada para processar
+        mesma_versao = snapshot.url == st.session_state.snapshot_url and snapshot.versao == st.session_state.snapshot_versao
+        if mesma_versao and not forcar:
+            return None
+
+        if snapshot.rejeitadas:
+            motivos = ", ".join(f"{motivo}: {qtd}" for motivo, qtd in snapshot.rejeitadas.items())
+            st.sidebar.caption(f"⚠️ Linhas descartadas na leitura ({motivos})")
+
+        # Avisar se coluna DHAPO não existe
+        if 'DHAPO' not in snapshot.colunas_origem:
+            st.warning("⚠️ Coluna DHAPO não encontrada no CSV. Os dados de último apontamento não serão exibidos.")
+
+        st.sidebar.success("✅ Dados carregados com sucesso!")
+        return snapshot
+
+    except ErroFonteDados as e:
+        st.error(f"❌ {e}")
+        return None
+    except Exception as e:
+        st.error(f"❌ Erro ao importar arquivo CSV do GitHub: {str(e)}")
+        return None
+
+def aplicar_snapshot(snapshot, medicao=None):
+    """Aponta o cursor da sessão para o snapshot compartilhado (uma semana anterior é processada aqui)"""
+    semana = st.session_state.semana_selecionada
+    if semana not in snapshot.particoes:
+        semana = snapshot.semana
+    snapshot.dados_semana(semana, medicao)
+    st.session_state.snapshot_url = snapshot.url
+    st.session_state.snapshot_versao = snapshot.versao
+    st.session_state.snapshot_semana = semana
+    st.session_state.data_last_updated = snapshot.carregado_em
+
+def dados_da_sessao():
+    """(df_processado, resumo_linhas, indice_cards) do cursor da sessão; None se não houver"""
+    versao = st.session_state.snapshot_versao
+    if versao is None:
+        return None
+    if st.session_state.snapshot_url is None:
+        return obter_planilhas_processadas().obter(versao)
+    snapshot = obter_repositorio_snapshots().versao(st.session_state.snapshot_url, versao)
+    if snapshot is None:
+        return None
+    return snapshot.dados_semana(st.session_state.snapshot_semana)
+
+def url_da_fonte():
+    """URL do GitHub ou caminho do arquivo local da fonte escolhida; None para a planilha enviada"""
+    if st.session_state.data_source == "github":
+        return st.session_state.github_url or None
+    if st.session_state.data_source == "local":
+        return st.session_state.caminho_local or None
+    return None
+
+def verificar_atualizacao_github(considerar_erro=True):
+    """Verifica se a thread de atualização publicou um snapshot mais novo (sem acessar a rede)"""
+    if not st.session_state.auto_refresh:
+        return False
+
+    url = url_da_fonte()
+    if not url:
+        return False
+
+    repositorio = obter_repositorio_snapshots()
+    repositorio.iniciar_atualizacao(url, st.session_state.refresh_interval)
+
+    snapshot = repositorio.obter(url)
+    if snapshot is None:
+        return considerar_erro and repositorio.ultimo_erro(url) is not None
+
+    return (snapshot.url, snapshot.versao) != (st.session_state.snapshot_url, st.session_state.snapshot_versao)
+
+def importar_excel(arquivo):
+    try:
+        df = pd.read_excel(arquivo)
+        st.session_state.data_last_updated = time.time()
+        return df
+    except Exception as e:
+        st.error(f"Erro ao importar arquivo Excel: {e}")
+        return None
+
+def limitar_texto(texto, max_caracteres=20):
+    if len(str(texto)) > max_caracteres:
+        return str(texto)[:max_caracteres-3] + "..."
+    return str(texto)
+
+def montar_card(linha_nome, indice_cards, posicao=0):
+    """Modelo do card: registro pré-formatado do índice + textos cortados conforme a configuração"""
+    total_produtos = produtos_na_linha(indice_cards, linha_nome)
+    if not total_produtos:
+        return None
+
+    # Consulta direta por (LINHA, posição): meta e quantidade são do produto nesta linha
+    registro = indice_cards.registro(linha_nome, posicao % total_produtos)
+
+    max_caracteres_linha = st.session_state.get('max_caracteres_linha', 50)
+    max_caracteres_produto = st.session_state.get('max_caracteres_produto', 50)
+
+    return {
+        **registro,
+        'linha_exibida': limitar_texto(linha_nome, max_caracteres_linha),
+        'descrprod_exibido': limitar_texto(registro['descrprod'], max_caracteres_produto),
+    }
+
+# Blocos da barra lateral iguais nos dois dashboards; o que cada um faz depois
+# (rerun, mensagem, página da rotação) fica no script
+
+def exibir_fonte_local():
+    """Caminho do CSV exportado pelo ERP e botão de carga; True quando o arquivo passou a ser o exibido"""
+    caminho_local = st.sidebar.text_input(
+        "📁 Caminho do CSV exportado pelo ERP:",
+        value=st.session_state.caminho_local,
+        placeholder="/mnt/erp/querygerencial.csv",
+        help="Caminho absoluto (ou file://) no servidor do dashboard; alterações no arquivo são detectadas sozinhas"
+    )
+
+    if st.sidebar.button("📥 Carregar arquivo", type="primary"):
+        if caminho_local and eh_caminho_local(caminho_local):
+            with st.spinner("Lendo arquivo local..."):
+                snapshot = importar_csv_github(caminho_local, forcar=True)
+            if snapshot is not None:
+                aplicar_snapshot(snapshot)
+                st.session_state.caminho_local = caminho_local
+                return True
+        else:
+            st.sidebar.warning("⚠️ Informe o caminho absoluto do arquivo CSV")
+    return False
+
+def exibir_upload_excel(medicao):
+    """Upload da planilha Excel; retorna o arquivo quando ele passou a ser o exibido, senão None
+
+    A planilha é processada uma vez por processo para cada conteúdo e dia
+    (obter_planilhas_processadas): no dia seguinte é outra versão.
+    """
+    arquivo = st.sidebar.file_uploader(
+        "📤 Carregar planilha Excel",
+        type=['xlsx', 'xls'],
+        help="Faça upload da planilha com os dados de produção"
+    )
+    if arquivo is None:
+        return None
+
+    # Mesmo arquivo (mesmo digest) já exibido nesta sessão: não reprocessar a cada rerun
+    versao_arquivo = versao_dos_dados(impressao_digital(arquivo.getvalue()), dia_processamento())
+    if versao_arquivo == st.session_state.snapshot_versao:
+        return None
+
+    with st.spinner("Processando arquivo Excel..."), medicao.fase('upload'):
+        planilhas = obter_planilhas_processadas()
+        dados_planilha = planilhas.obter(versao_arquivo)
+        if dados_planilha is None:
+            df_importado = importar_excel(arquivo)
+            if df_importado is None:
+                return None
+            df_processado = processar_dados_base_real(df_importado)
+            resumo_linhas = resumir_por_linha(df_processado)
+            planilhas.guardar(versao_arquivo, (
+                df_processado, resumo_linhas, indexar_cards(df_processado, resumo_linhas),
+            ))
+    st.session_state.snapshot_url = None  # Planilha enviada, fora dos snapshots das URLs
+    st.session_state.snapshot_versao = versao_arquivo
+    st.session_state.data_last_updated = time.time()
+    return arquivo
+
+def exibir_seletor_semana(medicao):
+    """Seleção da semana do arquivo; True quando a sessão passou a exibir outra semana
+
+    A atual já vem processada; uma anterior é processada aqui, ao ser aberta.
+    """
+    if not st.session_state.snapshot_url:
+        return False
+    snapshot = obter_repositorio_snapshots().obter(st.session_state.snapshot_url)
+    if snapshot is None or len(snapshot.semanas) <= 1:
+        return False
+
+    semanas = snapshot.semanas[::-1]
+    semana_exibida = st.session_state.snapshot_semana
+    semana = st.sidebar.selectbox(
+        "📅 Semana:",
+        semanas,
+        index=semanas.index(semana_exibida) if semana_exibida in semanas else 0,
+        format_func=lambda s: f"{s} (atual)" if s == snapshot.semana else s
+    )
+    selecionada = None if semana == snapshot.semana else semana
+    if selecionada == st.session_state.semana_selecionada:
+        return False
+    st.session_state.semana_selecionada = selecionada
+    aplicar_snapshot(snapshot, medicao)
+    return True
+
+def exibir_limpar_dados():
+    """Botão "Limpar Dados Atuais"; True quando a sessão voltou à fonte padrão, sem dados"""
+    if st.session_state.snapshot_versao is None or not st.sidebar.button("🗑️ Limpar Dados Atuais"):
+        return False
+    st.session_state.github_url = URL_PADRAO
+    st.session_state.caminho_local = ""
+    st.session_state.data_last_updated = None
+    st.session_state.snapshot_url = None
+    st.session_state.snapshot_versao = None
+    st.session_state.snapshot_semana = None
+    st.session_state.semana_selecionada = None
+    return True
+
+def exibir_status_sistema():
+    """Seção "Status do Sistema": tempo até o próximo refresh e métricas de busca da fonte"""
+    st.sidebar.markdown("---")
+    st.sidebar.subheader("🔄 Status do Sistema")
+
+    if st.session_state.auto_refresh:
+        tempo_restante = max(0, st.session_state.refresh_interval - (time.time() - st.session_state.last_refresh_time))
+        st.sidebar.info(f"**⏱️ Próximo refresh em: {int(tempo_restante)}s**")
+
+    # Métricas de download da fonte (compartilhadas por todas as sessões)
+    if url_da_fonte():
+        repositorio = obter_repositorio_snapshots()
+        estatisticas = repositorio.estatisticas_busca(url_da_fonte())
+        if estatisticas:
+            ultima = estatisticas['ultima']
+            st.sidebar.caption(
+                f"📡 Última busca: status {ultima['status']} em {ultima['latencia'] * 1000:.0f} ms, "
+                f"{ultima['bytes'] / 1024:.1f} KB ({ultima['tentativas']} tentativa(s)) | "
+                f"{estatisticas['buscas']} buscas, {estatisticas['bytes_total'] / 1024:.0f} KB no total"
+            )
+        erro_cache = repositorio.erro_cache(url_da_fonte())
+        if erro_cache:
+            st.sidebar.caption(f"⚠️ Cache em disco não gravado: {erro_cache}")
@@ -0,0 +1,179 @@
+"""Dados sintéticos determinísticos no esquema do querygerencial.csv
+
+A mesma semente e o mesmo instante geram sempre os mesmos bytes. Linhas,
+produtos, metas por dia e ritmo de produção saem da semente; o instante só
+decide até onde a produção já foi apontada. Os dias anteriores da semana
+atual estão completos, o dia do instante cresce ao longo do turno e os
+seguintes ainda estão vazios. Uma sequência de instantes do mesmo dia
+(gerar_snapshots) simula o arquivo sendo reexportado durante a produção.
+
+O formato segue a exportação do ERP:
+- BOM, ';' como separador e CRLF;
+- metas inteiras;
+- APONT_* no formato brasileiro ('1.239,00000');
+- QTDAPONTADA, TOTALSEMANA e SALDOSEMANA com ponto decimal;
+- a linha de totais sem semana no fim.
+
+DHAPO, que a exportação de exemplo não traz, sai como 'aaaa-mm-dd hh:mm:ss'.
+"""
+from datetime import datetime, timedelta
+
+import numpy as np
+import pandas as pd
+
+from dashcore.leitura import COLUNAS_FORMATO_BR
+
+DIAS_SEMANA = ['SEGUNDA', 'TERCA', 'QUARTA', 'QUINTA', 'SEXTA', 'SABADO', 'DOMINGO']
+
+COLUNAS_CSV = [
+    'SEMANA_LABEL', 'CODWCP', 'LINHA', 'CODPROD', 'DESCRPROD', 'OBSETIQUETA', 'CODVOL', 'USOPROD',
+    *DIAS_SEMANA, 'SEQ', 'QTDAPONTADA', *COLUNAS_FORMATO_BR, 'TOTALSEMANA', 'SALDOSEMANA', 'DHAPO',
+]
+
+INICIO_TURNO = 6  # horas
+FIM_TURNO = 22
+INTERVALO_APONTAMENTO = 15  # minutos entre dois apontamentos
+
+# (nome da linha, produtos, CODVOL, USOPROD, faixa da meta diária)
+FAMILIAS = [
+    ('VINAGRE 500', ['VINAGRE DE ALCOOL 500ML', 'VINAGRE DE MACA 500ML', 'VINAGRE DE VINHO TINTO 500ML'],
+     'CX', 'Venda', (500, 7000)),
+    ('MOLHINHO 150', ['MOLHO INGLES 150ML', 'MOLHO DE PIMENTA 150ML', 'MOLHO SHOYU 150ML'],
+     'CX', 'Venda', (50, 1500)),
+    ('PURO ALHO 200-440-1000-2000', ['PURO ALHO 200G', 'PURO ALHO 440G', 'PURO ALHO 1KG', 'PURO ALHO 2KG'],
+     'CX', 'Venda', (100, 1500)),
+    ('TEMPERO SECO SACHE', ['ALECRIM PC 7G', 'TEMPERO DO CHEF PC 30G', 'OREGANO PC 10G', 'COMINHO PC 20G'],
+     'CX', 'Venda', (100, 2000)),
+    ('TEMPERO SECO MANUAL', ['PIMENTA PRETA REFIL 40G', 'TEMPERO DO CHEF POTE 130G', 'COLORAU POTE 100G'],
+     'CX', 'Venda', (50, 800)),
+    ('CATCHUP 400', ['CATCHUP TRADICIONAL 400G', 'CATCHUP PICANTE 400G'],
+     'CX', 'Venda', (300, 4000)),
+    ('MAIONESE 200', ['MAIONESE TRADICIONAL 200G', 'MAIONESE TEMPERADA 200G'],
+     'CX', 'Venda', (300, 4000)),
+    ('SOPRO MANUAL', ['GARRAFA ROSCA 3400/3000 TRANSLUCIDA', 'FRASCO PET 500ML', 'FRASCO PET 150ML'],
+     'UN', 'Produto-Intermediário', (2000, 8000)),
+    ('TANQUE ALIMENTO 780 - PREPARAÇÃO QUENTE', ['POLPA DE MOSTARDA AMARELA 72 PROCESSO',
+                                                 'MOLHO DE TOMATE TRADICIONAL 780 PROCESSO'],
+     'TQ', 'Produto-Intermediário', (1, 40)),
+    ('EQUIPE MOAGEM', ['ACAFRAO/CURCUMA MOIDO FINO PROCESSO/ENVASE', 'PIMENTA DO REINO MOIDA PROCESSO'],
+     'KG', 'Produto-Intermediário', (50, 500)),
+]
+
+MARCAS = ['SADIO', 'MR MAKER', 'BOM DA REDE']
+
+def formatar_br(valor, casas=5):
+    """1239.0 -> '1.239,00000' (formato das colunas APONT_* do ERP); '' para zero"""
+    if not valor:
+        return ''
+    return f"{valor:,.{casas}f}".translate(str.maketrans(',.', '.,'))
+
+def _formatar_decimal(valor):
+    """Número com ponto decimal e sem zeros à direita, como QTDAPONTADA no ERP ('6211', '0.04')"""
+    return f"{valor:.5f}".rstrip('0').rstrip('.')
+
+def _cadastro(linhas, produtos_por_linha, rng):
+    """DataFrame com um produto por registro: LINHA, CODWCP, CODPROD, DESCRPROD, CODVOL, USOPROD, SEQ e faixa de meta"""
+    minimo, maximo = (produtos_por_linha, produtos_por_linha) if isinstance(produtos_por_linha, int) else produtos_por_linha
+    quantidades = rng.integers(minimo, maximo + 1, size=linhas)
+    registros = []
+    for indice, quantidade in enumerate(quantidades):
+        familia, produtos, codvol, usoprod, faixa = FAMILIAS[indice % len(FAMILIAS)]
+        linha = f"{familia} {indice // len(FAMILIAS) + 1}"
+        for seq in range(quantidade):
+            descricao = produtos[seq % len(produtos)]
+            if seq >= len(produtos):
+                descricao += f" V{seq // len(produtos) + 1}"
+            if usoprod == 'Venda':
+                descricao += f" {MARCAS[(indice + seq) % len(MARCAS)]}"
+            registros.append((linha, indice + 1, descricao, codvol, usoprod, seq + 1, *faixa))
+    cadastro = pd.DataFrame(registros, columns=['LINHA', 'CODWCP', 'DESCRPROD', 'CODVOL', 'USOPROD', 'SEQ',
+                                                'META_MIN', 'META_MAX'])
+    # Códigos de produto espalhados entre as linhas, como no ERP (o arquivo sai ordenado por CODPROD)
+    cadastro['CODPROD'] = rng.permutation(len(cadastro)) * 7 + 8
+    return cadastro
+
+def _progresso_do_dia(instante):
+    """Fração do turno já apontada no instante, em passos de INTERVALO_APONTAMENTO"""
+    minutos = (instante.hour - INICIO_TURNO) * 60 + instante.minute
+    minutos -= minutos % INTERVALO_APONTAMENTO
+    return min(max(minutos / ((FIM_TURNO - INICIO_TURNO) * 60), 0.0), 1.0)
+
+def _ultimo_apontamento(instante):
+    """Horário do último apontamento feito até o instante (mesmo passo do progresso)"""
+    fim_turno = instante.replace(hour=FIM_TURNO, minute=0, second=0, microsecond=0)
+    ultimo = min(instante, fim_turno).replace(second=0, microsecond=0)
+    return ultimo - timedelta(minutes=ultimo.minute % INTERVALO_APONTAMENTO)
+
+def gerar_csv(semanas=1, linhas=30, produtos_por_linha=(1, 3), semente=0, instante=None):
+    """Bytes de um CSV no esquema do ERP com `semanas` semanas terminando na semana do instante
+
+    `produtos_por_linha` é um número fixo ou uma faixa (mínimo, máximo). Sem
+    `instante`, usa o momento atual (o conteúdo muda conforme o dia avança).
+    """
+    instante = instante or datetime.now()
+    rng = np.random.default_rng(semente)
+    cadastro = _cadastro(linhas, produtos_por_linha, rng)
+    produtos = len(cadastro)
+
+    # Metas por produto e dia: dias úteis na faixa da família, sábado às vezes, domingo raramente
+    base = rng.uniform(cadastro['META_MIN'], cadastro['META_MAX'])
+    trabalha = np.column_stack([np.ones((produtos, 5), dtype=bool),
+                                rng.random(produtos) < 0.5, rng.random(produtos) < 0.15])
+    variacao = rng.uniform(0.8, 1.2, size=(semanas, produtos, 7))
+    metas = np.rint(base[None, :, None] * variacao * trabalha[None]).astype('int64')
+
+    # Ritmo de cada produto em cada dia: fração da meta produzida no dia todo (alguns não rodam)
+    ritmo = np.clip(rng.normal(0.9, 0.25, size=(semanas, produtos, 7)), 0, 1.3)
+    ritmo[rng.random((semanas, produtos, 7)) < 0.1] = 0
+
+    # Até onde a produção já foi apontada: semanas anteriores inteiras, dia do instante pelo turno
+    hoje = instante.weekday()
+    andamento = np.ones((semanas, 1, 7))
+    andamento[-1, 0, hoje + 1:] = 0
+    andamento[-1, 0, hoje] = _progresso_do_dia(instante)
+    apontado = np.round(metas * ritmo * andamento, 5)
+
+    segunda_atual = instante.date() - timedelta(days=hoje)
+    registros = []
+    for semana in range(semanas):
+        segunda = segunda_atual - timedelta(weeks=semanas - 1 - semana)
+        ano, numero, _ = segunda.isocalendar()
+        bloco = cadastro[['CODWCP', 'LINHA', 'CODPROD', 'DESCRPROD', 'CODVOL', 'USOPROD', 'SEQ']].copy()
+        bloco.insert(0, 'SEMANA_LABEL', f"{ano}-{numero:02d}")
+        bloco['OBSETIQUETA'] = ''
+        for dia, coluna in enumerate(DIAS_SEMANA):
+            bloco[coluna] = [str(meta) if meta else '' for meta in metas[semana, :, dia]]
+        for dia, coluna in enumerate(COLUNAS_FORMATO_BR):
+            bloco[coluna] = [formatar_br(valor) for valor in apontado[semana, :, dia]]
+        qtd_apontada = apontado[semana].sum(axis=1)
+        total_semana = metas[semana].sum(axis=1)
+        bloco['QTDAPONTADA'] = [_formatar_decimal(valor) for valor in qtd_apontada]
+        bloco['TOTALSEMANA'] = [str(total) if total else '' for total in total_semana]
+        bloco['SALDOSEMANA'] = [_formatar_decimal(total - qtd) if total else ''
+                                for total, qtd in zip(total_semana, qtd_apontada)]
+
+        # DHAPO: último dia com produção; no dia do instante, o último apontamento até ele
+        dias_com_producao = apontado[semana] > 0
+        ultimo_dia = np.where(dias_com_producao.any(axis=1), 6 - np.argmax(dias_com_producao[:, ::-1], axis=1), -1)
+        apontamentos = {}
+        for dia in set(ultimo_dia.tolist()) - {-1}:
+            dia_apontamento = datetime.combine(segunda + timedelta(days=dia), datetime.min.time())
+            if semana == semanas - 1 and dia == hoje:
+                apontamentos[dia] = _ultimo_apontamento(instante).strftime('%Y-%m-%d %H:%M:%S')
+            else:
+                apontamentos[dia] = dia_apontamento.replace(hour=FIM_TURNO).strftime('%Y-%m-%d %H:%M:%S')
+        bloco['DHAPO'] = [apontamentos.get(dia, '') for dia in ultimo_dia]
+        registros.append(bloco.sort_values('CODPROD', kind='stable'))
+
+    tabela = pd.concat(registros, ignore_index=True)[COLUNAS_CSV]
+    totais = {coluna: formatar_br(apontado[:, :, dia].sum(), casas=2) for dia, coluna in enumerate(COLUNAS_FORMATO_BR)}
+    tabela.loc[len(tabela)] = {coluna: totais.get(coluna, '') for coluna in COLUNAS_CSV}
+    texto = tabela.to_csv(sep=';', index=False, lineterminator='\r\n')
+    return b'\xef\xbb\xbf' + texto.encode('utf-8')
+
+def gerar_snapshots(inicio, fim, passo=timedelta(minutes=INTERVALO_APONTAMENTO), **opcoes):
+    """(instante, bytes) de inicio a fim: o mesmo arquivo reexportado a cada passo ao longo do dia"""
+    instante = inicio
+    while instante <= fim:
+        yield instante, gerar_csv(instante=instante, **opcoes)
+        instante += passo
@@ -0,0 +1,405 @@
+"""Snapshot dos dados processados compartilhado por todas as sessões do servidor"""
+import threading
+import time
+from dataclasses import dataclass, field
+
+from dashcore import cache_disco
+from dashcore.compartilhado import CacheLRU
+from dashcore.fonte_github import buscar_csv, converter_url_raw, impressao_digital
+from dashcore.fonte_local import INTERVALO_VERIFICACAO, eh_caminho_local, ler_arquivo
+from dashcore.indice_cards import IndiceCards
+from dashcore.instrumentacao import Medicao, relatorio_memoria, resumo_dados
+from dashcore.processamento import COLUNAS_NECESSARIAS
+from dashcore.semanas import dia_processamento, escolher_semana_atual, particionar, versao_dos_dados
+
+VERSOES_ANTERIORES = 2  # snapshots substituídos ainda disponíveis para sessões que não trocaram de versão
+INTERVALOS_SEM_LEITOR = 3  # intervalos sem iniciar_atualizacao() até o leitor deixar de contar
+
+class ErroFonteDados(Exception):
+    """Falha ao obter ou validar o arquivo da fonte de dados"""
+
+@dataclass(frozen=True)
+class Snapshot:
+    """Versão imutável dos dados de uma fonte; as sessões só guardam a referência
+
+    `digest` é o BLAKE2 do arquivo e `dia` o dia_processamento() dos dados; a
+    versão combina os dois (versao_dos_dados), então é a mesma em qualquer
+    processo no mesmo dia e muda na virada do dia mesmo sem arquivo novo.
+    df_processado, resumo_linhas e indice_cards são da semana atual; as
+    outras semanas ficam em `particoes` e só são processadas quando alguém as pede.
+    """
+    url: str
+    versao: str
+    df_processado: object
+    resumo_linhas: object
+    carregado_em: float
+    colunas_origem: tuple = ()
+    rejeitadas: dict = field(default_factory=dict)
+    semana: str = None
+    particoes: dict = field(default_factory=dict)
+    indice_cards: IndiceCards = field(default_factory=IndiceCards)
+    digest: str = None
+    dia: tuple = None
+
+    @property
+    def semanas(self):
+        """Índice das semanas disponíveis no arquivo, em ordem crescente"""
+        return sorted(semana for semana in self.particoes if semana is not None)
+
+    def dados_semana(self, semana, medicao=None):
+        """(df_processado, resumo_linhas, indice_cards) da semana; a atual já está pronta"""
+        if semana == self.semana or semana not in self.particoes:
+            return self.df_processado, self.resumo_linhas, self.indice_cards
+        return self.particoes[semana].carregar(medicao)[:3]
+
+class AtualizadorSnapshot(threading.Thread):
+    """Thread que revalida uma fonte periodicamente e publica o snapshot pronto
+
+    Antes de cada verificação pergunta ao repositório se a URL ainda tem leitores
+    (e com que intervalo); sem leitores, a thread termina.
+    """
+
+    def __init__(self, repositorio, url, intervalo):
+        super().__init__(name=f"atualizador-snapshot {url}", daemon=True)
+        self.repositorio = repositorio
+        self.url = url
+        self.intervalo = intervalo
+        self.primeira_carga = threading.Event()
+        self._parar = threading.Event()
+        self._acordar = threading.Event()
+
+    def run(self):
+        ultima = None
+        while not self._parar.is_set():
+            if ultima is not None:
+                espera = ultima + self.intervalo - time.monotonic()
+                if espera > 0:
+                    # Acordada antes (intervalo menor ou parar()): recalcula a espera
+                    self._acordar.wait(espera)
+                    self._acordar.clear()
+                    continue
+            if not self.repositorio._manter_atualizador(self):
+                return
+            ultima = time.monotonic()
+            try:
+                self.repositorio.atualizar(self.url)
+            except Exception:
+                pass  # o erro fica registrado no repositório para as sessões exibirem
+            self.primeira_carga.set()
+
+    def acordar(self):
+        """Aplica um intervalo novo já, sem esperar o fim da espera atual"""
+        self._acordar.set()
+
+    def parar(self):
+        self._parar.set()
+        self._acordar.set()
+
+class RepositorioSnapshots:
+    """Mantém um snapshot por URL e garante um único download por vez para cada fonte
+
+    A URL pode ser HTTP (fonte_github) ou um caminho local/file:// (fonte_local,
+    verificado por stat() a cada INTERVALO_VERIFICACAO segundos).
+
+    As sessões guardam só (URL, versão, semana) e pedem os dados aqui a cada
+    execução. Os últimos snapshots substituídos continuam disponíveis por
+    versao(), para quem está sem auto-refresh seguir na versão que exibe.
+
+    A thread de atualização de uma URL existe enquanto alguém a lê: cada chamada
+    de iniciar_atualizacao() renova o leitor daquele intervalo, e a thread usa o
+    menor intervalo entre os leitores ativos. Sem leitor há INTERVALOS_SEM_LEITOR
+    intervalos, a thread para e o snapshot da URL sai da memória.
+
+    Funções passadas a observar() recebem cada snapshot novo logo depois da
+    publicação, na thread que o processou (o serviço para TVs acorda os clientes assim).
+
+    Com `registro_desempenho`, cada verificação da fonte vira um registro 'atualizacao'
+    com o tempo de busca, leitura, processamento, agregações por linha e cache em disco.
+    """
+
+    def __init__(self, diretorio_cache=cache_disco.DIRETORIO_CACHE, registro_desempenho=None):
+        self._diretorio_cache = diretorio_cache
+        self._registro_desempenho = registro_desempenho
+        self._urls_lidas_do_disco = set()
+        self._lock = threading.Lock()
+        self._travas = {}
+        self._snapshots = {}
+        self._anteriores = CacheLRU(VERSOES_ANTERIORES)
+        self._validadores = {}
+        self._ultima_verificacao = {}
+        self._erros = {}
+        self._erros_cache = {}
+        self._atualizadores = {}
+        self._leitores = {}
+        self._estatisticas = {}
+        self._observadores = []
+
+    def _trava(self, url):
+        with self._lock:
+            return self._travas.setdefault(url, threading.Lock())
+
+    def obter(self, url, aguardar=None):
+        """Retorna o snapshot atual da URL (ou None) sem acessar a rede
+
+        Com `aguardar`, espera até esse tempo pela primeira carga da thread de atualização.
+        """
+        snapshot = self._snapshots.get(url) or self._carregar_do_disco(url)
+        atualizador = self._atualizadores.get(url)
+        if snapshot is None and aguardar and atualizador is not None:
+            atualizador.primeira_carga.wait(aguardar)
+            snapshot = self._snapshots.get(url)
+        return snapshot
+
+    def versao(self, url, versao):
+        """Snapshot da URL com essa versão: o atual ou um dos substituídos há pouco (None se já saiu)"""
+        snapshot = self.obter(url)
+        if snapshot is not None and snapshot.versao == versao:
+            return snapshot
+        return self._anteriores.obter((url, versao))
+
+    def observar(self, funcao):
+        """Chama funcao(snapshot) a cada snapshot publicado por atualizar()"""
+        with self._lock:
+            self._observadores.append(funcao)
+
+    def _carregar_do_disco(self, url):
+        """Na primeira consulta da URL, publica o snapshot salvo em disco (se houver)"""
+        if self._diretorio_cache is None or url in self._urls_lidas_do_disco:
+            return self._snapshots.get(url)
+        self._urls_lidas_do_disco.add(url)
+        try:
+            salvo = cache_disco.carregar_snapshot(url, self._diretorio_cache)
+        except Exception:
+            salvo = None  # cache corrompido ou de outra versão: ignorar e baixar de novo
+        if salvo is None:
+            return self._snapshots.get(url)
+        campos, validadores = salvo
+        with self._lock:
+            if url not in self._snapshots:
+                self._validadores[url] = validadores
+                self._snapshots[url] = Snapshot(**campos)
+        return self._snapshots[url]
+
+    def _salvar_no_disco(self, snapshot, medicao):
+        """Grava o cache em disco; uma falha não é falha da atualização (os dados publicados valem)"""
+        if self._diretorio_cache is None:
+            return
+        try:
+            cache_disco.salvar_snapshot(snapshot, self._validadores.get(snapshot.url), self._diretorio_cache)
+        except Exception as e:
+            self._erros_cache[snapshot.url] = str(e)
+            medicao.anotar(erro_cache=str(e))
+        else:
+            self._erros_cache.pop(snapshot.url, None)
+
+    def ultimo_erro(self, url):
+        """Mensagem da última atualização que falhou para a URL (None se a última deu certo)
+
+        Só busca e processamento; falhas ao gravar o cache em disco ficam em erro_cache().
+        """
+        return self._erros.get(url)
+
+    def erro_cache(self, url):
+        """Mensagem da última gravação do cache em disco que falhou para a URL (None se deu certo)"""
+        return self._erros_cache.get(url)
+
+    def estatisticas_busca(self, url):
+        """Contadores de download da URL: buscas, bytes acumulados e métricas da última busca"""
+        return self._estatisticas.get(url)
+
+    def _registrar_busca(self, url, metricas):
+        anteriores = self._estatisticas.get(url, {'buscas': 0, 'bytes_total': 0, 'latencia_total': 0.0})
+        self._estatisticas[url] = {
+            'buscas': anteriores['buscas'] + 1,
+            'bytes_total': anteriores['bytes_total'] + metricas['bytes'],
+            'latencia_total': anteriores['latencia_total'] + metricas['latencia'],
+            'ultima': metricas,
+        }
+
+    def iniciar_atualizacao(self, url, intervalo, permanente=False):
+        """Garante uma thread de atualização em segundo plano para a URL e registra o leitor
+
+        Quem lê a URL chama de novo a cada `intervalo` segundos (no máximo) para
+        continuar contando; um leitor `permanente` (o serviço para TVs) não expira.
+        """
+        with self._lock:
+            leitores = self._leitores.setdefault(url, {})
+            if leitores.get(intervalo, 0) is not None:
+                leitores[intervalo] = None if permanente else time.monotonic()
+            intervalo = self._intervalo_leitura(url)
+            atualizador = self._atualizadores.get(url)
+            if atualizador is not None and atualizador.is_alive():
+                if intervalo < atualizador.intervalo:
+                    atualizador.intervalo = intervalo
+                    atualizador.acordar()
+                return atualizador
+            atualizador = AtualizadorSnapshot(self, url, intervalo)
+            self._atualizadores[url] = atualizador
+            atualizador.start()
+            return atualizador
+
+    def _intervalo_leitura(self, url):
+        """Menor intervalo entre os leitores ativos da URL (None sem leitores); chamado com o lock"""
+        agora = time.monotonic()
+        leitores = self._leitores.get(url, {})
+        for intervalo, instante in list(leitores.items()):
+            if instante is not None and agora - instante > INTERVALOS_SEM_LEITOR * intervalo:
+                del leitores[intervalo]
+        if not leitores:
+            return None
+        intervalo = min(leitores)
+        if eh_caminho_local(url):
+            intervalo = min(intervalo, INTERVALO_VERIFICACAO)  # um stat() por verificação
+        return intervalo
+
+    def _manter_atualizador(self, atualizador):
+        """Chamado pela thread antes de cada verificação: False quando a URL ficou sem leitores
+
+        Nesse caso a thread sai do repositório e o snapshot da URL é descartado
+        (uma consulta depois disso volta a partir do cache em disco).
+        """
+        url = atualizador.url
+        with self._lock:
+            intervalo = self._intervalo_leitura(url)
+            if intervalo is not None:
+                atualizador.intervalo = intervalo
+                return True
+            if self._atualizadores.get(url) is atualizador:
+                del self._atualizadores[url]
+            self._leitores.pop(url, None)
+            self._snapshots.pop(url, None)
+            self._validadores.pop(url, None)
+            self._erros.pop(url, None)
+            self._erros_cache.pop(url, None)
+            self._urls_lidas_do_disco.discard(url)
+            return False
+
+    def parar_atualizacoes(self):
+        with self._lock:
+            for atualizador in self._atualizadores.values():
+                atualizador.parar()
+            self._atualizadores.clear()
+
+    def atualizar(self, url, intervalo=0):
+        """Revalida a fonte se ninguém a verificou nos últimos `intervalo` segundos
+
+        Sessões que chegam enquanto outra está baixando esperam e recebem o mesmo snapshot.
+        """
+        with self._trava(url):
+            atual = self._snapshots.get(url) or self._carregar_do_disco(url)
+            medicao = Medicao('atualizacao', url=url)
+            try:
+                snapshot = self._atualizar(url, intervalo, medicao)
+            except Exception as e:
+                self._erros[url] = str(e)
+                medicao.anotar(erro=str(e))
+                self._registrar_medicao(medicao, atual)
+                raise
+            self._erros.pop(url, None)
+            if snapshot is not atual:
+                with medicao.fase('cache_disco'):
+                    self._salvar_no_disco(snapshot, medicao)
+                with medicao.fase('observadores'):
+                    for funcao in list(self._observadores):
+                        funcao(snapshot)
+            self._registrar_medicao(medicao, snapshot)
+            return snapshot
+
+    def _registrar_medicao(self, medicao, snapshot):
+        # Sem fases: o intervalo mínimo ainda não passou e a fonte nem foi consultada
+        if self._registro_desempenho is None or not medicao.fases:
+            return
+        if snapshot is not None:
+            medicao.anotar(**resumo_dados(snapshot.df_processado, snapshot.resumo_linhas, snapshot.versao,
+                                          medicao.campos.get('bytes', 0)))
+        self._registro_desempenho.adicionar(medicao.concluir())
+
+    def _atualizar(self, url, intervalo, medicao):
+        """Corpo de atualizar(); chamado com a trava da URL já adquirida"""
+        atual = self._snapshots.get(url)
+        agora = time.time()
+        if atual is not None and agora - self._ultima_verificacao.get(url, 0) < intervalo:
+            return atual
+
+        validadores = self._validadores.get(url) if atual is not None else None
+        with medicao.fase('busca'):
+            if eh_caminho_local(url):
+                status, conteudo, novos_validadores, metricas = ler_arquivo(url, validadores)
+            else:
+                status, conteudo, novos_validadores, metricas = buscar_csv(converter_url_raw(url), validadores)
+        self._ultima_verificacao[url] = agora
+        self._registrar_busca(url, metricas)
+        medicao.anotar(status=status, bytes=metricas['bytes'], novo=False)
+
+        # 304: arquivo não mudou, o snapshot atual continua valendo (no mesmo dia)
+        dia = dia_processamento()
+        if status == 304:
+            return atual if atual.dia == dia else self._reprocessar(atual, dia, medicao)
+
+        if status != 200:
+            raise ErroFonteDados(f"Erro ao acessar URL: Status {status}")
+
+        # Mesmos bytes (servidor sem ETag/Last-Modified): nada a reprocessar
+        with medicao.fase('versao'):
+            digest = impressao_digital(conteudo)
+        if atual is not None and atual.digest == digest:
+            self._validadores[url] = novos_validadores
+            return atual if atual.dia == dia else self._reprocessar(atual, dia, medicao)
+
+        # Só a semana atual é lida e processada agora; semanas com os mesmos bytes
+        # da versão anterior reaproveitam a partição já pronta. Na primeira carga as
+        # semanas ficam como views da cópia lida (download ou arquivo local); depois só
+        # as que mudaram são copiadas, e a cópia da versão é liberada.
+        with medicao.fase('particionar'):
+            particoes, rejeitadas = particionar(conteudo, atual.particoes if atual is not None else None,
+                                                copiar=atual is not None)
+        self._validadores[url] = novos_validadores
+        return self._publicar(self._montar(url, digest, dia, particoes, rejeitadas, medicao), atual, medicao)
+
+    def _reprocessar(self, atual, dia, medicao):
+        """Mesmo arquivo num dia novo: monta a semana atual de novo a partir das partições"""
+        medicao.anotar(reprocessado=True)
+        # Só a contagem do arquivo inteiro; a da semana atual é somada de novo em _montar
+        rejeitadas = {motivo: qtd for motivo, qtd in atual.rejeitadas.items() if motivo == 'sem_semana'}
+        novo = self._montar(atual.url, atual.digest, dia, atual.particoes, rejeitadas, medicao)
+        return self._publicar(novo, atual, medicao)
+
+    def _montar(self, url, digest, dia, particoes, rejeitadas, medicao):
+        """Snapshot com a semana atual do dia processada (as demais ficam sob demanda)"""
+        semana = escolher_semana_atual(particoes)
+        (df_processado, resumo_linhas, indice_cards,
+         rejeitadas_semana, colunas_origem) = particoes[semana].carregar(medicao)
+        for motivo, quantidade in rejeitadas_semana.items():
+            rejeitadas[motivo] = rejeitadas.get(motivo, 0) + quantidade
+
+        colunas_faltantes = [col for col in COLUNAS_NECESSARIAS if col not in colunas_origem]
+        if colunas_faltantes:
+            raise ErroFonteDados(
+                f"Colunas faltantes no CSV: {colunas_faltantes} (disponíveis: {list(colunas_origem)})"
+            )
+
+        return Snapshot(
+            url=url,
+            versao=versao_dos_dados(digest, dia),
+            df_processado=df_processado,
+            resumo_linhas=resumo_linhas,
+            carregado_em=time.time(),
+            colunas_origem=colunas_origem,
+            rejeitadas=rejeitadas,
+            semana=semana,
+            particoes=particoes,
+            indice_cards=indice_cards,
+            digest=digest,
+            dia=dia,
+        )
+
+    def _publicar(self, novo, atual, medicao):
+        # Publicação atômica: quem lê obtém o snapshot anterior ou o novo, nunca um parcial
+        if atual is not None:
+            self._anteriores.guardar((novo.url, atual.versao), atual)
+        self._snapshots[novo.url] = novo
+        medicao.anotar(novo=True)
+        if self._registro_desempenho is not None:
+            with medicao.fase('memoria'):
+                medicao.anotar(memoria=relatorio_memoria(novo))
+        return novo
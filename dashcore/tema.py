@@ -0,0 +1,85 @@
+"""Folha de estilo dos dashboards, injetada uma vez por execução completa do script
+
+Cards, grade e gauge só carregam nomes de classe (prefixo `dp-`); cores de
+status, tamanhos e tipografia ficam aqui. A única regra por card que sobra no
+markup é a largura da barra de progresso.
+"""
+from dashcore.gauge_svg import FAIXAS_FUNDO
+from dashcore.resumo import STATUS
+
+COLUNAS_GRADE = range(1, 9)
+
+CSS_BASE = """
+.auto-refresh-indicator {
+    position: fixed; top: 10px; right: 10px; z-index: 9999;
+    background: linear-gradient(45deg, #FF6B6B, #4ECDC4); color: white;
+    padding: 8px 15px; border-radius: 20px; font-size: 14px; font-weight: bold;
+    box-shadow: 0 4px 15px rgba(0,0,0,0.2);
+}
+.dp-grade { display: grid; column-gap: 16px; }
+.dp-card { min-width: 0; }
+.dp-cabecalho {
+    border: 3px solid var(--dp-cor); border-radius: 12px; padding: 12px; margin: 8px;
+    background: var(--dp-cor-fundo); box-shadow: 0 2px 4px rgba(0,0,0,0.1); height: 80px;
+    display: flex; flex-direction: column; justify-content: space-between;
+}
+.dp-titulo { display: flex; justify-content: space-between; align-items: center; margin-bottom: 8px; }
+.dp-linha {
+    color: white; margin: 0; font-size: 24px; max-width: 300px;
+    white-space: nowrap; overflow: hidden; text-overflow: ellipsis;
+}
+.dp-icone {
+    font-size: 12px; background: var(--dp-cor-fundo); margin: 8px; border-radius: 12px;
+    color: var(--dp-cor); font-weight: bold;
+}
+.dp-produto {
+    font-size: 20px; color: white; line-height: 1.0; margin: 3px;
+    white-space: nowrap; overflow: hidden; text-overflow: ellipsis;
+}
+.dp-progresso { background: #e9ecef; border-radius: 10px; height: 30px; margin: 8px 0; position: relative; }
+.dp-progresso-barra { background: var(--dp-cor); border-radius: 10px; height: 100%; transition: width 0.3s ease; }
+.dp-progresso-texto {
+    position: absolute; top: 0; left: 0; right: 0; bottom: 0;
+    display: flex; align-items: center; justify-content: center;
+    font-size: 26px; font-weight: bold; color: black;
+}
+.dp-progresso-texto.dp-sobre-barra { color: white; }
+.dp-rodape { display: flex; gap: 16px; align-items: center; }
+.dp-rodape > div { flex: 1; min-width: 0; }
+.dp-apontamento-titulo { font-size: 14px; }
+.dp-apontamento { font-size: 24px; }
+.dp-produtos { font-size: 14px; opacity: 0.6; }
+.dp-gauge { width: 100%; height: 100px; margin: 10px 0; }
+.dp-gauge-barra { fill: var(--dp-cor, #6c757d); }
+.dp-gauge-meta { stroke: red; stroke-width: 3; }
+.dp-gauge-texto { font-family: Arial; font-size: 36px; fill: currentColor; text-anchor: middle; }
+.dp-destaque .dp-linha, .dp-destaque .dp-produto, .dp-destaque .dp-apontamento { font-weight: bold; }
+.dp-destaque .dp-produtos { font-size: inherit; opacity: 1; color: white; font-weight: bold; }
+.dp-destaque .dp-gauge { height: 130px; }
+.dp-destaque .dp-gauge-texto { font-size: 38px; }
+"""
+
+# Menos espaço acima e abaixo do conteúdo (painel de mesa)
+CSS_MARGENS_COMPACTAS = """
+.main .block-container { padding-top: 1rem; padding-bottom: 1rem; }
+"""
+
+def _css_gerado():
+    """Regras que dependem das tabelas do núcleo: cores de status, faixas do gauge e colunas"""
+    regras = [
+        f".dp-status-{prioridade} {{ --dp-cor: {cor}; --dp-cor-fundo: {cor}20; }}"
+        for _, cor, _, _, prioridade in STATUS
+    ]
+    regras += [f".dp-faixa-{i} {{ fill: {cor}; }}" for i, (_, _, cor) in enumerate(FAIXAS_FUNDO, 1)]
+    regras += [
+        f".dp-colunas-{colunas} {{ grid-template-columns: repeat({colunas}, minmax(0, 1fr)); }}"
+        for colunas in COLUNAS_GRADE
+    ]
+    return "\n".join(regras)
+
+CSS_TEMA = CSS_BASE + _css_gerado()
+
+def estilo_tema(margens_compactas=False):
+    """Bloco <style> com todo o CSS do dashboard, para um único st.html por execução"""
+    css = CSS_TEMA + (CSS_MARGENS_COMPACTAS if margens_compactas else "")
+    return f"<style>{css}</style>"
@@ -1,49 +1,32 @@
 import streamlit as st
-import pandas as pd
-import random
-from datetime import datetime
-import plotly.graph_objects as go
 import time
-from streamlit_autorefresh import st_autorefresh
-import requests
-import io
+
+from dashcore.indice_cards import produtos_na_linha
+from dashcore.instrumentacao import Medicao, resumo_dados
+from dashcore.pagina_html import renderizar_pagina
+from dashcore.processamento import obter_dia_atual
+from dashcore.resumo import FAIXAS_FILTRO, contar_faixas, filtrar_linhas
+from dashcore.rotacao_cliente import renderizar_rotacao
+from dashcore.sessao import (URL_PADRAO, aplicar_snapshot, carregar_dados_exemplo, dados_da_sessao,
+                             exibir_diagnostico, exibir_fonte_local, exibir_limpar_dados, exibir_seletor_semana,
+                             exibir_status_sistema, exibir_upload_excel, importar_csv_github, montar_card,
+                             obter_grades_rotacao, registrar_medicao, url_da_fonte, verificar_atualizacao_github)
+from dashcore.tema import estilo_tema
 
 # Configuração da página
 st.set_page_config(page_title="Dashboard - Linhas de Produção", layout="wide")
+# Tempo de cada fase desta execução; registrado no fim do script
+medicao_rerun = Medicao('rerun')
+
+# Todo o CSS do painel (indicador de auto-refresh, cards, gauge) em um bloco só, fora da grade:
+# os ciclos do fragmento não o reenviam e os cards só carregam nomes de classe
+st.html(estilo_tema(margens_compactas=True))
 
-# CSS para auto-refresh
-st.markdown("""
-<style>
-    .auto-refresh-indicator {
-        position: fixed;
-        top: 10px;
-        right: 10px;
-        background: linear-gradient(45deg, #FF6B6B, #4ECDC4);
-        color: white;
-        padding: 8px 15px;
-        border-radius: 20px;
-        font-size: 14px;
-        z-index: 9999;
-        font-weight: bold;
-        box-shadow: 0 4px 15px rgba(0,0,0,0.2);
-    }
-    /* Remover espaçamento extra entre elementos */
-    .main .block-container {
-        padding-top: 1rem;
-        padding-bottom: 1rem;
-    }
-</style>
-""", unsafe_allow_html=True)
-
-# SOLUÇÃO: Inicialização do session_state para manter os dados
-if 'df_processado' not in st.session_state:
-    st.session_state.df_processado = None
-if 'produtos_por_linha' not in st.session_state:
-    st.session_state.produtos_por_linha = None
+# SOLUÇÃO: Inicialização do session_state só com cursores e configurações da tela.
+# Os dados ficam nas estruturas do processo, compartilhadas por todas as sessões:
+# snapshot_url, snapshot_versao e snapshot_semana dizem quais a sessão exibe.
 if 'auto_refresh' not in st.session_state:
     st.session_state.auto_refresh = True
-if 'rotation_index' not in st.session_state:
-    st.session_state.rotation_index = 0
 if 'last_refresh_time' not in st.session_state:
     st.session_state.last_refresh_time = time.time()
 if 'max_caracteres_linha' not in st.session_state:
@@ -59,13 +42,21 @@ if 'refresh_interval' not in st.session_state:
 if 'rotacao_ativa' not in st.session_state:
     st.session_state.rotacao_ativa = True
 if 'github_url' not in st.session_state:
-    st.session_state.github_url = "https://github.com/ALN84/produ/blob/main/backups/dash_prod.csv"
+    st.session_state.github_url = URL_PADRAO
+if 'caminho_local' not in st.session_state:  # Exportação do ERP em disco (fonte "local")
+    st.session_state.caminho_local = ""
 if 'data_source' not in st.session_state:
     st.session_state.data_source = "github"
 if 'data_last_updated' not in st.session_state:
     st.session_state.data_last_updated = None
-if 'last_github_hash' not in st.session_state:
-    st.session_state.last_github_hash = None
+if 'snapshot_url' not in st.session_state:  # Snapshot compartilhado em uso pela sessão
+    st.session_state.snapshot_url = None
+if 'snapshot_versao' not in st.session_state:  # Digest BLAKE2 dos dados exibidos
+    st.session_state.snapshot_versao = None
+if 'snapshot_semana' not in st.session_state:  # Semana (SEMANA_LABEL) exibida
+    st.session_state.snapshot_semana = None
+if 'semana_selecionada' not in st.session_state:  # None: acompanhar a semana atual
+    st.session_state.semana_selecionada = None
 
 # NOVO: Variáveis de paginação e rotação
 if 'pagina_atual' not in st.session_state:
@@ -78,299 +69,19 @@ if 'tempo_por_pagina' not in st.session_state:
     st.session_state.tempo_por_pagina = 30
 if 'modo_rotacao' not in st.session_state:
     st.session_state.modo_rotacao = "produtos"
-if 'ultima_troca' not in st.session_state:
-    st.session_state.ultima_troca = time.time()
-if 'last_github_check' not in st.session_state:
-    st.session_state.last_github_check = 0
-if 'produto_refresh_count' not in st.session_state:
-    st.session_state.produto_refresh_count = 0
-if 'pagina_refresh_count' not in st.session_state:
-    st.session_state.pagina_refresh_count = 0
 if 'data_loaded' not in st.session_state:
     st.session_state.data_loaded = False
 if 'last_rotation_update' not in st.session_state:  # ✅ NOVO: Controlar tempo da rotação
     st.session_state.last_rotation_update = time.time()
-
-# Funções de negócio (mantidas iguais)
-def obter_dia_atual():
-    """Retorna o dia da semana atual em português MAIÚSCULO para compatibilidade"""
-    dias_semana_ingles = ['MONDAY', 'TUESDAY', 'WEDNESDAY', 'THURSDAY', 'FRIDAY', 'SATURDAY', 'SUNDAY']
-    dias_semana_portugues = ['SEGUNDA', 'TERCA', 'QUARTA', 'QUINTA', 'SEXTA', 'SABADO', 'DOMINGO']
-    dia_numero = datetime.now().weekday()
-    return dias_semana_portugues[dia_numero]
-
-def detectar_coluna_dia(df):
-    """Detecta automaticamente qual coluna corresponde ao dia atual"""
-    dia_atual = obter_dia_atual()
-    
-    if dia_atual in df.columns:
-        return dia_atual
-    
-    variacoes = {
-        'SEGUNDA': ['SEGUNDA', 'SEG', 'SEGUNDA-FEIRA', 'MONDAY', 'MON'],
-        'TERCA': ['TERCA', 'TER', 'TERÇA', 'TERCA-FEIRA', 'TUESDAY', 'TUE'],
-        'QUARTA': ['QUARTA', 'QUA', 'QUARTA-FEIRA', 'WEDNESDAY', 'WED'],
-        'QUINTA': ['QUINTA', 'QUI', 'QUINTA-FEIRA', 'THURSDAY', 'THU'],
-        'SEXTA': ['SEXTA', 'SEX', 'SEXTA-FEIRA', 'FRIDAY', 'FRI'],
-        'SABADO': ['SABADO', 'SAB', 'SÁBADO', 'SATURDAY', 'SAT'],
-        'DOMINGO': ['DOMINGO', 'DOM', 'SUNDAY', 'SUN']
-    }
-    
-    for coluna in df.columns:
-        coluna_upper = str(coluna).upper().strip()
-        if dia_atual in variacoes:
-            if coluna_upper in variacoes[dia_atual]:
-                return coluna
-    
-    return dia_atual
-
-def importar_csv_github(url):
-    """Importa dados de um arquivo CSV no GitHub"""
-    try:
-        # Log para debug
-        st.sidebar.write(f"📡 Tentando acessar URL: {url}")
-        
-        # Converter URL do GitHub para formato raw
-        url_raw = url
-        
-        # Se for uma URL de visualização do GitHub, converter para raw
-        if 'github.com' in url and '/blob/' in url:
-            url_raw = url.replace('github.com', 'raw.githubusercontent.com')
-            url_raw = url_raw.replace('/blob/', '/')
-        # Se já for raw.githubusercontent.com, usar diretamente
-        elif 'raw.githubusercontent.com' in url:
-            url_raw = url
-        # Se for um link direto do GitHub sem /blob/
-        elif 'github.com' in url and '/raw/' not in url:
-            url_raw = url.replace('github.com', 'raw.githubusercontent.com')
-        
-        st.sidebar.write(f"🔄 URL convertida: {url_raw}")
-        
-        # Fazer requisição para o arquivo
-        response = requests.get(url_raw)
-        st.sidebar.write(f"📥 Status da resposta: {response.status_code}")
-        
-        if response.status_code != 200:
-            st.error(f"❌ Erro ao acessar URL: Status {response.status_code}")
-            return None
-            
-        response.raise_for_status()
-        
-        # Calcular hash para detectar mudanças
-        current_hash = hash(response.text)
-        
-        # Ler CSV com ponto e vírgula como separador
-        try:
-            df = pd.read_csv(io.StringIO(response.text), sep=';')
-        except:
-            # Tentar com separador padrão (vírgula)
-            try:
-                df = pd.read_csv(io.StringIO(response.text))
-            except Exception as e:
-                st.error(f"❌ Erro ao ler CSV: {e}")
-                return None
-        
-        # Verificar colunas necessárias
-        colunas_necessarias = ['LINHA', 'DESCRPROD', 'QTDAPONTADA', 'TOTALSEMANA', 'SALDOSEMANA']
-        colunas_faltantes = [col for col in colunas_necessarias if col not in df.columns]
-        
-        if colunas_faltantes:
-            st.error(f"❌ Colunas faltantes no CSV: {colunas_faltantes}")
-            st.error(f"✅ Colunas disponíveis: {list(df.columns)}")
-            return None
-        
-        # Avisar se coluna DHAPO não existe
-        if 'DHAPO' not in df.columns:
-            st.warning("⚠️ Coluna DHAPO não encontrada no CSV. Os dados de último apontamento não serão exibidos.")
-        
-        # Atualizar timestamp e hash
-        st.session_state.data_last_updated = time.time()
-        st.session_state.last_github_hash = current_hash
-        
-        st.sidebar.success("✅ Dados carregados com sucesso!")
-        return df
-        
-    except Exception as e:
-        st.error(f"❌ Erro ao importar arquivo CSV do GitHub: {str(e)}")
-        return None
-
-def verificar_atualizacao_github():
-    """Verifica se o arquivo no GitHub foi atualizado"""
-    if not st.session_state.auto_refresh or st.session_state.data_source != "github":
-        return False
-    
-    if not st.session_state.github_url:
-        return False
-    
-    try:
-        current_time = time.time()
-        
-        # Verificar se passou tempo suficiente desde a última atualização
-        time_since_last_check = current_time - st.session_state.last_github_check
-        if time_since_last_check < st.session_state.refresh_interval:
-            return False
-        
-        st.session_state.last_github_check = current_time
-        return True
-            
-    except Exception as e:
-        st.sidebar.error(f"Erro ao verificar GitHub: {e}")
-    
-    return False
-
-def importar_excel(arquivo):
-    try:
-        df = pd.read_excel(arquivo)
-        st.session_state.data_last_updated = time.time()
-        return df
-    except Exception as e:
-        st.error(f"Erro ao importar arquivo Excel: {e}")
-        return None
-
-def processar_dados_base_real(df):
-    """Processa os dados usando a coluna correspondente ao dia atual"""
-    if df is None or df.empty:
-        return pd.DataFrame()
-    
-    coluna_dia_atual = detectar_coluna_dia(df)
-    dia_atual_nome = obter_dia_atual()
-    
-    dados_processados = []
-    
-    # ✅ NOVO: Calcular o último DHAPO por linha
-    dh_apontamento_por_linha = {}
-    if 'DHAPO' in df.columns:
-        for linha in df['LINHA'].unique():
-            dh_linha = df[df['LINHA'] == linha]['DHAPO']
-            # Encontrar o maior DHAPO (mais recente) para a linha
-            dh_validos = [dh for dh in dh_linha if pd.notna(dh)]
-            if dh_validos:
-                try:
-                    # Converter para datetime e pegar o mais recente
-                    dh_dates = [pd.to_datetime(dh) for dh in dh_validos]
-                    dh_apontamento_por_linha[linha] = max(dh_dates)
-                except:
-                    # Se não conseguir converter, usar o último não-nulo
-                    dh_apontamento_por_linha[linha] = dh_validos[-1]
-    
-    for index, row in df.iterrows():
-        try:
-            if pd.isna(row['LINHA']) or row['LINHA'] == '':
-                continue
-                
-            linha = str(row['LINHA']).strip()
-            descrprod = str(row['DESCRPROD']).strip()
-            
-            try:
-                meta_dia_atual = float(row[coluna_dia_atual]) if pd.notna(row[coluna_dia_atual]) else 0
-            except KeyError:
-                meta_dia_atual = 0
-            
-            try:
-                qtd_apontada = float(row['QTDAPONTADA']) if pd.notna(row['QTDAPONTADA']) else 0
-                total_semana = float(row['TOTALSEMANA']) if pd.notna(row['TOTALSEMANA']) else 0
-                saldo_semana = float(row['SALDOSEMANA']) if pd.notna(row['SALDOSEMANA']) else 0
-            except ValueError:
-                continue
-            
-            if total_semana > 0:
-                percentual = (qtd_apontada / total_semana) * 100
-            else:
-                percentual = 0
-                
-            dados_processados.append({
-                'LINHA': linha,
-                'DESCRPROD': descrprod,
-                'SEQ': int(row.get('SEQ', 0)) if pd.notna(row.get('SEQ')) else 0,
-                'META_DIA': int(meta_dia_atual),
-                'QTDAPONTADA': qtd_apontada,
-                'TOTALSEMANA': total_semana,
-                'PERC': round(percentual, 1),
-                'SALDOSEMANA': saldo_semana,
-                'DIA_ATUAL': dia_atual_nome,
-                'COLUNA_USADA': coluna_dia_atual,
-                'DHAPO_LINHA': dh_apontamento_por_linha.get(linha)
-            })
-            
-        except Exception:
-            continue
-    
-    return pd.DataFrame(dados_processados)
-
-def obter_produtos_por_linha(df):
-    produtos_por_linha = {}
-    for linha in df['LINHA'].unique():
-        produtos = df[df['LINHA'] == linha][['DESCRPROD', 'QTDAPONTADA', 'SEQ']].to_dict('records')
-        produtos.sort(key=lambda x: x.get('SEQ', 0))
-        produtos_por_linha[linha] = produtos
-    return produtos_por_linha
-
-def limitar_texto(texto, max_caracteres=20):
-    if len(str(texto)) > max_caracteres:
-        return str(texto)[:max_caracteres-3] + "..."
-    return str(texto)
-
-def create_gauge_chart(percentual, height=150):
-    if percentual >= 85:
-        color = "#2878a7"
-    elif percentual >= 70:
-        color = "#28a745"
-    elif percentual >= 50:
-        color = "#ffc107"
-    else:
-        color = "#dc3545"
-    
-    fig = go.Figure(go.Indicator(
-        mode = "gauge+number",
-        value = percentual,
-        number = {
-            'suffix': '%', 
-            'font': {'size': 50},
-            'valueformat': '.0f'
-        },
-        domain = {'x': [0, 1], 'y': [0, 1]},
-        gauge = {
-            'axis': {
-                'range': [None, 100], 
-                'tickwidth': 0,
-                'tickcolor': "rgba(0,0,0,0)",
-                'showticklabels': False
-            },
-            'bar': {'color': color, 'thickness': 1},
-            'bgcolor': "white",
-            'borderwidth': 0,
-            'bordercolor': "black",
-            'steps': [
-                {'range': [0, 50], 'color': '#f8f9fa'},
-                {'range': [50, 70], 'color': '#e9ecef'},
-                {'range': [70, 100], 'color': '#dee2e6'}],
-            'threshold': {
-                'line': {'color': "red", 'width': 4},
-                'thickness': 0.85,
-                'value': 90}}))
-    
-    fig.update_layout(
-        height=height,
-        margin=dict(l=10, r=10, t=10, b=10),
-        font={'family': "Arial"},
-        paper_bgcolor='rgba(0,0,0,0)',
-        plot_bgcolor='rgba(0,0,0,0)'
-    )
-    
-    return fig
-
-def obter_cor_status(percentual):
-    """Retorna a cor e informações do status baseado no percentual"""
-    if percentual >= 85:
-        return "#2878a7", "✅", "Meta Atingida", 1
-    elif percentual >= 70:
-        return "#28a745", "✅", "Próximo da Meta", 2
-    elif percentual >= 50:
-        return "#ffc107", "🟡", "Em Andamento", 3
-    else:
-        return "#dc3545", "🔴", "Atenção", 4
-
-def atualizar_rotacao():
+if 'rotacao_no_navegador' not in st.session_state:
+    st.session_state.rotacao_no_navegador = True
+if 'diagnostico' not in st.session_state:  # Painel de p50/p95 por fase na barra lateral
+    st.session_state.diagnostico = False
+if 'dados_exibidos' not in st.session_state:  # Versão, registros e linhas anotados em cada medição
+    st.session_state.dados_exibidos = resumo_dados(None, None)
+
+# Funções de negócio (as comuns aos dois dashboards ficam em dashcore.sessao)
+def atualizar_rotacao(linhas_filtradas, indice_cards):
     """Versão simplificada - sempre alterna entre produtos e páginas por tempo"""
     if not st.session_state.rotacao_ativa:
         return
@@ -381,14 +92,14 @@ def atualizar_rotacao():
     if st.session_state.modo_rotacao == "produtos":
         if time_since_last_rotation >= st.session_state.tempo_por_produto:
             # Avança produtos apenas nas linhas que têm múltiplos produtos
-            for linha in st.session_state.get('linhas_filtradas', []):
-                produtos_da_linha = st.session_state.produtos_por_linha.get(linha, [])
-                if len(produtos_da_linha) > 1:
+            for linha in linhas_filtradas:
+                total_produtos = produtos_na_linha(indice_cards, linha)
+                if total_produtos > 1:
                     if linha not in st.session_state.rotacao_por_linha:
                         st.session_state.rotacao_por_linha[linha] = 0
                     st.session_state.rotacao_por_linha[linha] = (
                         st.session_state.rotacao_por_linha[linha] + 1
-                    ) % len(produtos_da_linha)
+                    ) % total_produtos
             
             st.session_state.last_rotation_update = current_time
             
@@ -398,158 +109,138 @@ def atualizar_rotacao():
     
     else:  # modo_rotacao == "linhas"
         if time_since_last_rotation >= st.session_state.tempo_por_pagina:
-            total_linhas = len(st.session_state.get('linhas_filtradas', []))
+            total_linhas = len(linhas_filtradas)
             total_paginas = max(1, (total_linhas + st.session_state.linhas_por_pagina - 1) // st.session_state.linhas_por_pagina)
             
             st.session_state.pagina_atual = (st.session_state.pagina_atual + 1) % total_paginas
             st.session_state.last_rotation_update = current_time
             st.session_state.modo_rotacao = "produtos"
 
-def obter_linhas_pagina_atual():
+def obter_linhas_pagina_atual(linhas_filtradas):
     """Retorna as linhas que devem ser exibidas na página atual"""
-    if not st.session_state.linhas_filtradas:
+    if not linhas_filtradas:
         return []
     
     start_idx = st.session_state.pagina_atual * st.session_state.linhas_por_pagina
     end_idx = start_idx + st.session_state.linhas_por_pagina
     
-    return st.session_state.linhas_filtradas[start_idx:end_idx]
+    return linhas_filtradas[start_idx:end_idx]
 
-def create_compact_card(linha_nome, linha_data, produtos_por_linha, product_rotation_index=0):
-    dados_linha = linha_data[linha_data['LINHA'] == linha_nome]
+def obter_html_rotacao(linhas, indice_cards):
+    """Grade com todos os produtos das linhas filtradas para a rotação no navegador
+
+    O HTML só é remontado quando mudam os dados, o filtro ou a configuração.
+    """
+    chave = (
+        st.session_state.snapshot_versao, st.session_state.snapshot_semana, tuple(linhas),
+        st.session_state.max_caracteres_linha, st.session_state.max_caracteres_produto,
+        st.session_state.rotacao_ativa, st.session_state.tempo_por_produto,
+        st.session_state.tempo_por_pagina, st.session_state.linhas_por_pagina,
+    )
+    grades = obter_grades_rotacao()
+    html_atual = grades.obter(chave)
+    if html_atual is not None:
+        return html_atual
+
+    cards_por_linha = []
+    for linha in linhas:
+        cards = [montar_card(linha, indice_cards, indice) for indice in range(produtos_na_linha(indice_cards, linha))]
+        if cards:
+            cards_por_linha.append((linha, cards))
+
+    html_rotacao = renderizar_rotacao(
+        cards_por_linha,
+        colunas=2,
+        linhas_por_pagina=st.session_state.linhas_por_pagina,
+        tempo_por_produto=st.session_state.tempo_por_produto,
+        tempo_por_pagina=st.session_state.tempo_por_pagina,
+        ativa=st.session_state.rotacao_ativa,
+    )
+    return grades.guardar(chave, html_rotacao)
+
+def exibir_status_rotacao(total_linhas):
+    """Modo e página da rotação feita no servidor"""
+    modo_atual = "Produtos" if st.session_state.modo_rotacao == "produtos" else "Páginas"
+    tempo_atual = st.session_state.tempo_por_produto if st.session_state.modo_rotacao == "produtos" else st.session_state.tempo_por_pagina
     
-    if dados_linha.empty:
-        return
+    st.info(f"**🔄 Modo: {modo_atual}**")
+    st.caption(f"Tempo: {tempo_atual}s")
     
-    total_produzido_linha = dados_linha['QTDAPONTADA'].sum()
-    total_objetivo_linha = dados_linha['TOTALSEMANA'].sum()
-    percentual_conclusao_linha = (total_produzido_linha / total_objetivo_linha * 100) if total_objetivo_linha > 0 else 0
+    # Informações da paginação
+    total_paginas = max(1, (total_linhas + st.session_state.linhas_por_pagina - 1) // st.session_state.linhas_por_pagina)
     
-    produtos_da_linha = produtos_por_linha.get(linha_nome, [])
+    if total_paginas > 1:
+        st.progress((st.session_state.pagina_atual + 1) / total_paginas)
+        st.caption(f"Página {st.session_state.pagina_atual + 1} de {total_paginas}")
+
+def exibir_grade_navegador(indice_cards, linhas_filtradas, medicao):
+    """Grade da rotação no navegador: todas as páginas e produtos em um só elemento
+
+    Fica fora do ciclo do fragmento: o HTML só vai de novo ao navegador num rerun
+    completo (dados novos, filtro ou configuração), não a cada verificação.
+    """
+    if linhas_filtradas:
+        with medicao.fase('cards'):
+            html_rotacao = obter_html_rotacao(linhas_filtradas, indice_cards)
+        with medicao.fase('envio'):
+            st.html(html_rotacao, unsafe_allow_javascript=True)
+
+def exibir_grade(indice_cards, linhas_filtradas):
+    """Ciclo de atualização (st.fragment): verifica os dados e, com a rotação no servidor, troca os cards"""
+    medicao = Medicao('grade')
+    # Dados novos publicados pela thread de atualização: rerun completo, para a barra lateral acompanhar
+    with medicao.fase('verificacao'):
+        dados_novos = verificar_atualizacao_github(considerar_erro=False)
+    if dados_novos:
+        st.rerun()
     
-    if not produtos_da_linha:
+    if st.session_state.rotacao_no_navegador:
+        # A grade já está na página (exibir_grade_navegador); o ciclo só verifica a versão
+        registrar_medicao(medicao)
         return
     
-    produto_index = product_rotation_index % len(produtos_da_linha)
-    produto_atual = produtos_da_linha[produto_index]
+    # ✅ ATUALIZAR ROTAÇÃO a cada ciclo (controlado por tempo)
+    atualizar_rotacao(linhas_filtradas, indice_cards)
     
-    descrprod = produto_atual['DESCRPROD']
-    qtd_produzida_produto = produto_atual['QTDAPONTADA']
-    
-    # Encontrar dados específicos do produto atual
-    produto_data = linha_data[linha_data['DESCRPROD'] == descrprod]
-    if not produto_data.empty:
-        qtd_objetivo_produto = produto_data['META_DIA'].iloc[0]
-        percentual_produto = (qtd_produzida_produto / qtd_objetivo_produto * 100) if qtd_objetivo_produto > 0 else 0
-        dia_atual = produto_data['DIA_ATUAL'].iloc[0]
-        dh_apontamento_linha = produto_data['DHAPO_LINHA'].iloc[0] if 'DHAPO_LINHA' in produto_data.columns else None
-    else:
-        qtd_objetivo_produto = 0
-        percentual_produto = 0
-        dia_atual = ""
-        dh_apontamento_linha = None
-    
-    cor_borda, status, status_text, _ = obter_cor_status(percentual_conclusao_linha)
-    
-    max_caracteres_linha = st.session_state.get('max_caracteres_linha', 50)
-    max_caracteres_produto = st.session_state.get('max_caracteres_produto', 50)
-    
-    linha_nome_limitado = limitar_texto(linha_nome, max_caracteres_linha)
-    descrprod_limitado = limitar_texto(descrprod, max_caracteres_produto)
-    
-    # Formatar a data/hora do apontamento
-    dh_apontamento_formatado = ""
-    if dh_apontamento_linha and pd.notna(dh_apontamento_linha):
-        try:
-            if isinstance(dh_apontamento_linha, str):
-                dh_apontamento_dt = pd.to_datetime(dh_apontamento_linha)
-            else:
-                dh_apontamento_dt = dh_apontamento_linha
-            dh_apontamento_formatado = dh_apontamento_dt.strftime("%d/%m/%Y %H:%M")
-        except:
-            dh_apontamento_formatado = str(dh_apontamento_linha)
+    # Organizar em grid com paginação
+    linhas_pagina_atual = obter_linhas_pagina_atual(linhas_filtradas)
     
-    with st.container():
-        st.markdown(f"""
-        <div style="border: 3px solid {cor_borda}; border-radius: 12px; padding: 12px; margin: 8px; background: {cor_borda}20; box-shadow: 0 2px 4px rgba(0,0,0,0.1); height: 80px; display: flex; flex-direction: column; justify-content: space-between;">
-            <div>
-                <div style="display: flex; justify-content: space-between; align-items: center; margin-bottom: 8px;">
-                    <h4 style="color: white; margin: 0; font-size: 24px; white-space: nowrap; overflow: hidden; font-weight: bold; text-overflow: ellipsis; max-width: 300px;" title="{linha_nome}">{linha_nome_limitado}</h4>
-                    <span style="font-size: 12px; background: {cor_borda}20; margin: 8px; border-radius: 12px; color: {cor_borda}; font-weight: bold;">
-                        {status}
-                    </span>
-                </div>
-        """, unsafe_allow_html=True)
-        
-        st.markdown(f"<div style='font-size: 20px; color: white; margin-bottom: 8px; line-height: 1.0; margin: 3px; font-weight: bold; white-space: nowrap; overflow: hidden; text-overflow: ellipsis;' title='{descrprod}'>{descrprod_limitado}</div>", unsafe_allow_html=True)
-        st.markdown(f"<div style='font-size: 20px; color: white; margin-bottom: 8px; line-height: 1.0; margin: 3px; font-weight: bold; white-space: nowrap; overflow: hidden; text-overflow: ellipsis;' title='{descrprod}'>| ⚙️: {produto_index + 1}º | ✅: {qtd_produzida_produto:,.0f} | 🎯: {qtd_objetivo_produto:,.0f} | 📊: {percentual_produto:.0f}% |</div>".replace(",", "."), unsafe_allow_html=True)
-
-        st.markdown(f"""
-        <div style="background: #e9ecef; border-radius: 10px; height: 30px; margin: 8px 0; position: relative;">
-            <div style="background: {cor_borda}; border-radius: 10px; height: 100%; width: {min(percentual_conclusao_linha, 100)}%; transition: width 0.3s ease;"></div>
-            <div style="position: absolute; top: 0; left: 0; right: 0; bottom: 0; display: flex; align-items: center; justify-content: center; font-size: 26px; font-weight: bold; color: {'white' if percentual_conclusao_linha > 70 else 'black'};">
-                {total_produzido_linha:,.0f} / {total_objetivo_linha:,.0f}
-            </div>
-        </div>
-        """.replace(",", "."), unsafe_allow_html=True)
-
-        col1, col2 = st.columns(2)
-        with col1:
-            fig = create_gauge_chart(percentual_conclusao_linha)
-            st.plotly_chart(fig, use_container_width=True, key=f"gauge_{linha_nome}_{product_rotation_index}")
-            st.markdown("""
-            <style>
-            div[data-testid="stMetricValue"] {
-                font-size: 24px !important;
-                font-weight: bold;
-            }
-            </style>
-            """, unsafe_allow_html=True)
-
-        with col2:            
-            if dh_apontamento_formatado:
-                st.metric(
-                    "Último Apontamento",
-                    dh_apontamento_formatado,
-                    label_visibility="visible"
-                )
-            else:
-                st.metric(
-                    "Último Apontamento",
-                    "N/A",
-                    label_visibility="visible"
-                )
-            st.markdown(f"<p style='color: white; font-weight: bold;'>📦 {produto_index + 1}/{len(produtos_da_linha)} produtos</p>", unsafe_allow_html=True)
+    if len(linhas_pagina_atual) > 0:
+        # Página inteira em um único bloco HTML: um elemento por rerun em vez de ~10 por card
+        with medicao.fase('cards'):
+            cards = []
+            for linha in linhas_pagina_atual:
+                posicao = st.session_state.rotacao_por_linha.get(linha, 0)
+                card = montar_card(linha, indice_cards, posicao)
+                if card is not None:
+                    cards.append(card)
+            pagina = renderizar_pagina(cards, colunas=2)
+        with medicao.fase('envio'):
+            st.markdown(pagina, unsafe_allow_html=True)
+    registrar_medicao(medicao)
 
 # ✅ CARREGAMENTO AUTOMÁTICO AO INICIAR
-if not st.session_state.data_loaded:
-    if st.session_state.df_processado is None and st.session_state.github_url:
-        with st.spinner("Carregando dados do GitHub..."):
-            df_importado = importar_csv_github(st.session_state.github_url)
-            if df_importado is not None:
-                st.session_state.df_processado = processar_dados_base_real(df_importado)
-                st.session_state.produtos_por_linha = obter_produtos_por_linha(st.session_state.df_processado)
-                st.session_state.data_last_updated = time.time()
-                st.session_state.data_loaded = True
-
-# ✅ VERIFICAÇÃO DE ATUALIZAÇÃO DO GITHUB
-if verificar_atualizacao_github():
-    df_importado = importar_csv_github(st.session_state.github_url)
-    if df_importado is not None:
-        st.session_state.df_processado = processar_dados_base_real(df_importado)
-        st.session_state.produtos_por_linha = obter_produtos_por_linha(st.session_state.df_processado)
-        st.session_state.refresh_counter += 1
-        st.session_state.data_last_updated = time.time()
-
-# ✅ CORREÇÃO: Usar apenas UM auto-refresh principal
-refresh_count = st_autorefresh(
-    interval=1000,  # ✅ Atualizar a cada 1 segundo para verificar temporizadores
-    limit=None,     # ✅ Sem limite
-    key="main_refresh"
-)
+with medicao_rerun.fase('dados'):
+    # Versão que saiu das estruturas compartilhadas (processo reiniciado, planilha descartada): recarregar
+    if st.session_state.snapshot_versao is not None and dados_da_sessao() is None:
+        st.session_state.snapshot_url = None
+        st.session_state.snapshot_versao = None
+        st.session_state.data_loaded = False
 
-# ✅ ATUALIZAR ROTAÇÃO a cada ciclo (controlado por tempo)
-atualizar_rotacao()
+    if not st.session_state.data_loaded:
+        if st.session_state.snapshot_versao is None and url_da_fonte():
+            with st.spinner("Carregando dados..."):
+                snapshot = importar_csv_github(url_da_fonte())
+                if snapshot is not None:
+                    aplicar_snapshot(snapshot)
+                    st.session_state.data_loaded = True
+
+    # ✅ VERIFICAÇÃO DE ATUALIZAÇÃO DO GITHUB
+    if verificar_atualizacao_github():
+        snapshot = importar_csv_github(url_da_fonte())
+        if snapshot is not None:
+            aplicar_snapshot(snapshot)
+            st.session_state.refresh_counter += 1
 
 # Interface principal
 st.sidebar.header("📤 Fonte de Dados")
@@ -557,7 +248,7 @@ st.sidebar.header("📤 Fonte de Dados")
 # Seleção da fonte de dados
 data_source = st.sidebar.radio(
     "Selecione a fonte de dados:",
-    ["GitHub CSV", "Upload Excel"],
+    ["GitHub CSV", "Arquivo local", "Upload Excel"],
     index=0,
     key="data_source_radio"
 )
@@ -578,58 +269,50 @@ if data_source == "GitHub CSV":
         if st.button("📥 Carregar do GitHub", type="primary"):
             if github_url:
                 with st.spinner("Carregando dados do GitHub..."):
-                    df_importado = importar_csv_github(github_url)
-                    if df_importado is not None:
-                        st.session_state.df_processado = processar_dados_base_real(df_importado)
-                        st.session_state.produtos_por_linha = obter_produtos_por_linha(st.session_state.df_processado)
+                    snapshot = importar_csv_github(github_url, forcar=True)
+                    if snapshot is not None:
+                        aplicar_snapshot(snapshot)
                         st.session_state.github_url = github_url
-                        st.session_state.data_last_updated = time.time()
                         st.session_state.data_loaded = True
                         st.rerun()
             else:
                 st.sidebar.warning("⚠️ Por favor, insira uma URL do GitHub")
     
     with col2:
-        if st.session_state.github_url and st.session_state.df_processado is not None:
+        if st.session_state.github_url and st.session_state.snapshot_versao is not None:
             if st.button("🔄 Atualizar Dados"):
                 with st.spinner("Atualizando dados do GitHub..."):
-                    df_importado = importar_csv_github(st.session_state.github_url)
-                    if df_importado is not None:
-                        st.session_state.df_processado = processar_dados_base_real(df_importado)
-                        st.session_state.produtos_por_linha = obter_produtos_por_linha(st.session_state.df_processado)
+                    snapshot = importar_csv_github(st.session_state.github_url, forcar=True)
+                    if snapshot is not None:
+                        aplicar_snapshot(snapshot)
                         st.session_state.refresh_counter += 1
-                        st.session_state.data_last_updated = time.time()
                         st.rerun()
 
+elif data_source == "Arquivo local":
+    st.session_state.data_source = "local"
+    
+    if exibir_fonte_local():
+        st.session_state.data_loaded = True
+        st.rerun()
+
 else:
     st.session_state.data_source = "upload"
     
-    arquivo = st.sidebar.file_uploader(
-        "📤 Carregar planilha Excel",
-        type=['xlsx', 'xls'],
-        help="Faça upload da planilha com os dados de produção"
-    )
-    
-    if arquivo is not None:
-        with st.spinner("Processando arquivo Excel..."):
-            df_importado = importar_excel(arquivo)
-            if df_importado is not None:
-                st.session_state.df_processado = processar_dados_base_real(df_importado)
-                st.session_state.produtos_por_linha = obter_produtos_por_linha(st.session_state.df_processado)
-                st.session_state.data_last_updated = time.time()
-                st.session_state.data_loaded = True
-                st.rerun()
+    if exibir_upload_excel(medicao_rerun) is not None:
+        st.session_state.data_loaded = True
+        registrar_medicao(medicao_rerun)
+        st.rerun()
+
+# Seleção da semana: a atual já vem processada, as anteriores são processadas ao abrir
+if exibir_seletor_semana(medicao_rerun):
+    st.session_state.pagina_atual = 0
+    registrar_medicao(medicao_rerun)
+    st.rerun()
 
 # Botão para limpar dados carregados
-if st.session_state.df_processado is not None:
-    if st.sidebar.button("🗑️ Limpar Dados Atuais"):
-        st.session_state.df_processado = None
-        st.session_state.produtos_por_linha = None
-        st.session_state.github_url = "https://github.com/ALN84/produ/blob/main/backups/dash_prod.csv"
-        st.session_state.data_last_updated = None
-        st.session_state.last_github_hash = None
-        st.session_state.data_loaded = False
-        st.rerun()
+if exibir_limpar_dados():
+    st.session_state.data_loaded = False
+    st.rerun()
 
 # Exibir dia atual na sidebar
 dia_atual = obter_dia_atual()
@@ -678,6 +361,12 @@ rotacao_ativa = st.sidebar.checkbox(
     value=st.session_state.rotacao_ativa
 )
 
+rotacao_no_navegador = st.sidebar.checkbox(
+    "Rotação no navegador",
+    value=st.session_state.rotacao_no_navegador,
+    help="Troca produtos e páginas no próprio navegador, sem reexecutar o painel no servidor a cada segundo"
+)
+
 # Configurações de tempo
 st.sidebar.subheader("⏱️ Temporização")
 
@@ -707,88 +396,49 @@ linhas_por_pagina = st.sidebar.selectbox(
 st.session_state.auto_refresh = auto_refresh
 st.session_state.refresh_interval = refresh_interval
 st.session_state.rotacao_ativa = rotacao_ativa
+st.session_state.rotacao_no_navegador = rotacao_no_navegador
 st.session_state.tempo_por_produto = tempo_produto
 st.session_state.tempo_por_pagina = tempo_pagina
 st.session_state.linhas_por_pagina = linhas_por_pagina
 
 # Indicador de status da rotação
-if st.session_state.rotacao_ativa:
-    modo_atual = "Produtos" if st.session_state.modo_rotacao == "produtos" else "Páginas"
-    tempo_atual = st.session_state.tempo_por_produto if st.session_state.modo_rotacao == "produtos" else st.session_state.tempo_por_pagina
-    
-    st.sidebar.info(f"**🔄 Modo: {modo_atual}**")
-    st.sidebar.caption(f"Tempo: {tempo_atual}s")
-    
-    # Informações da paginação
-    total_linhas = len(st.session_state.get('linhas_filtradas', []))
-    total_paginas = max(1, (total_linhas + st.session_state.linhas_por_pagina - 1) // st.session_state.linhas_por_pagina)
-    
-    if total_paginas > 1:
-        st.sidebar.progress((st.session_state.pagina_atual + 1) / total_paginas)
-        st.sidebar.caption(f"Página {st.session_state.pagina_atual + 1} de {total_paginas}")
+if st.session_state.rotacao_ativa and st.session_state.rotacao_no_navegador:
+    st.sidebar.info("**🔄 Rotação no navegador**")
+    st.sidebar.caption(
+        f"Produto: {st.session_state.tempo_por_produto}s · Página: {st.session_state.tempo_por_pagina}s"
+    )
+elif st.session_state.rotacao_ativa:
+    # Lugar reservado aqui; o fragmento entra depois dos filtros, quando o total de linhas é conhecido
+    status_rotacao = st.sidebar.container()
 
 # Botão manual para forçar atualização
-if st.sidebar.button("🔄 Forçar Refresh Manual", type="primary"):
-    st.session_state.refresh_counter += 1
-    if st.session_state.rotacao_ativa:
-        for linha in st.session_state.get('linhas_filtradas', []):
-            if linha not in st.session_state.rotacao_por_linha:
-                st.session_state.rotacao_por_linha[linha] = 0
-            st.session_state.rotacao_por_linha[linha] += 1
-    st.session_state.last_refresh_time = time.time()
-    st.rerun()
+# (tratado depois dos filtros: avança os produtos das linhas filtradas nesta execução)
+forcar_refresh = st.sidebar.button("🔄 Forçar Refresh Manual", type="primary")
 
 # Carregar dados - Prioridade para dados carregados
-if st.session_state.df_processado is not None:
-    df_processado = st.session_state.df_processado
-    produtos_por_linha = st.session_state.produtos_por_linha
+dados = dados_da_sessao()
+if dados is not None:
+    df_processado, resumo_linhas, indice_cards = dados
     
     if st.session_state.data_source == "github":
         st.sidebar.info("📊 **Fonte:** GitHub CSV")
         if st.session_state.github_url:
             st.sidebar.caption(f"URL: {st.session_state.github_url[:50]}...")
+    elif st.session_state.data_source == "local":
+        st.sidebar.info("📊 **Fonte:** Arquivo local")
+        if st.session_state.caminho_local:
+            st.sidebar.caption(f"Arquivo: {st.session_state.caminho_local}")
     else:
         st.sidebar.info("📊 **Fonte:** Arquivo Excel")
     
 else:
-    @st.cache_data(ttl=60)
-    def load_data():
-        data = []
-        linhas_produtos = {
-            "VINAGRE 500 1": ["8 - VINAGRE DE ALCOOL 500ML SADIO"],
-            "TEMPERO SECO SACHE 1": ["3343 - ALECRIM PC 7G SADIO", "9961 - TEMPERO DO CHEF PC 30G SADIO"],
-            "TEMPERO SECO MANUAL 1": ["7488 - PIMENTA PRETA REFIL 40G MR MAKER", "9704 - TEMPERO DO CHEF POTE 130G MR MAKER"]
-        }
-        
-        dia_atual = obter_dia_atual()
-        
-        for linha, produtos in linhas_produtos.items():
-            for i, produto in enumerate(produtos):
-                total_semana = random.randint(1000, 7000)
-                qtd_apontada = random.randint(0, total_semana)
-                percentual = (qtd_apontada / total_semana) * 100
-                saldo_semana = total_semana - qtd_apontada
-                
-                data.append({
-                    'LINHA': linha,
-                    'DESCRPROD': produto,
-                    'SEQ': i + 1,
-                    'META_DIA': random.randint(100, 1000),
-                    'QTDAPONTADA': qtd_apontada,
-                    'TOTALSEMANA': total_semana,
-                    'PERC': round(percentual, 1),
-                    'SALDOSEMANA': saldo_semana,
-                    'DIA_ATUAL': dia_atual,
-                    'COLUNA_USADA': dia_atual
-                })
-        
-        return pd.DataFrame(data)
-    
-    df_processado = load_data()
-    produtos_por_linha = obter_produtos_por_linha(df_processado)
+    df_processado, resumo_linhas, indice_cards = carregar_dados_exemplo()
     
     st.sidebar.info("📝 **Usando dados de exemplo**")
 
+# Versão, registros e linhas que as medições desta sessão anotam
+st.session_state.dados_exibidos = resumo_dados(df_processado, resumo_linhas, st.session_state.snapshot_versao)
+
 # Filtros
 st.sidebar.header("🔍 Filtros")
 status_todos = st.sidebar.checkbox("Todos", value=True, key="todos")
@@ -798,93 +448,57 @@ status_atencao = st.sidebar.checkbox("Atenção (<75%)", value=True, key="atenca
 buscar_linha = st.sidebar.text_input("🔎 Buscar Linha:")
 
 # Filtrar e ORDENAR linhas por status (do melhor para o pior)
-linhas_disponiveis = df_processado['LINHA'].unique()
-linhas_com_status = []
-
-for linha in linhas_disponiveis:
-    dados_linha = df_processado[df_processado['LINHA'] == linha]
-    total_produzido = dados_linha['QTDAPONTADA'].sum()
-    total_objetivo = dados_linha['TOTALSEMANA'].sum()
-    percentual_linha = (total_produzido / total_objetivo * 100) if total_objetivo > 0 else 0
-    
-    # Obter cor e prioridade do status
-    _, _, _, prioridade = obter_cor_status(percentual_linha)
-    
-    status_ok = False
-    if percentual_linha >= 90 and status_target:
-        status_ok = True
-    elif 75 <= percentual_linha < 90 and status_andamento:
-        status_ok = True
-    elif percentual_linha < 75 and status_atencao:
-        status_ok = True
-    
-    if buscar_linha and buscar_linha.lower() not in linha.lower():
-        status_ok = False
-    
-    if status_ok:
-        linhas_com_status.append({
-            'nome': linha,
-            'percentual': percentual_linha,
-            'prioridade': prioridade,
-            'cor': obter_cor_status(percentual_linha)[0]
-        })
-
-# Ordenar linhas por status (do melhor para o pior)
-linhas_ordenadas = sorted(linhas_com_status, key=lambda x: x['prioridade'])
-linhas_filtradas = [linha['nome'] for linha in linhas_ordenadas]
-st.session_state.linhas_filtradas = linhas_filtradas
+# O resumo já vem ordenado por prioridade: 1 (Azul) > 2 (Verde) > 3 (Amarelo) > 4 (Vermelho)
+faixas_marcadas = [
+    faixa for faixa, marcada in zip(FAIXAS_FILTRO, [status_target, status_andamento, status_atencao]) if marcada
+]
+with medicao_rerun.fase('filtros'):
+    linhas_filtradas = filtrar_linhas(resumo_linhas, faixas_marcadas, buscar_linha)
+
+if forcar_refresh:
+    st.session_state.refresh_counter += 1
+    if st.session_state.rotacao_ativa:
+        for linha in linhas_filtradas:
+            if linha not in st.session_state.rotacao_por_linha:
+                st.session_state.rotacao_por_linha[linha] = 0
+            st.session_state.rotacao_por_linha[linha] += 1
+    st.session_state.last_refresh_time = time.time()
+    st.rerun()
+
+if st.session_state.rotacao_ativa and not st.session_state.rotacao_no_navegador:
+    # Fragmento próprio: acompanha a troca de página sem reexecutar o resto da barra lateral
+    with status_rotacao:
+        st.fragment(exibir_status_rotacao, run_every=1)(len(linhas_filtradas))
 
 # ✅ CORREÇÃO: Usar um container único para os gráficos
 dashboard_container = st.container()
 
 with dashboard_container:
-    # Organizar em grid com paginação
-    linhas_pagina_atual = obter_linhas_pagina_atual()
-
-    if len(linhas_pagina_atual) > 0:
-        # Calcular layout baseado no número de linhas por página
-        num_cols = 2  # Sempre 2 colunas
-        num_rows = (len(linhas_pagina_atual) + num_cols - 1) // num_cols
-        
-        for row in range(num_rows):
-            cols = st.columns(num_cols)
-            for col in range(num_cols):
-                idx = row * num_cols + col
-                if idx < len(linhas_pagina_atual):
-                    linha = linhas_pagina_atual[idx]
-                    with cols[col]:
-                        rotation_idx = st.session_state.rotacao_por_linha.get(linha, 0)
-                        create_compact_card(linha, df_processado, produtos_por_linha, rotation_idx)
-        
-        # Indicador de paginação
-        total_linhas = len(st.session_state.get('linhas_filtradas', []))
-        total_paginas = max(1, (total_linhas + st.session_state.linhas_por_pagina - 1) // st.session_state.linhas_por_pagina)
+    # Só o fragmento reexecuta nos ciclos: a cada segundo com a rotação no servidor (e a grade
+    # dentro dele), ou no intervalo de verificação dos dados com a rotação no navegador (a grade
+    # fica fora dele). A barra lateral só reexecuta quando um controle muda ou quando chega uma
+    # versão nova dos dados.
+    intervalo_grade = st.session_state.refresh_interval if st.session_state.rotacao_no_navegador else 1
+    with medicao_rerun.fase('grade'):
+        if st.session_state.rotacao_no_navegador:
+            exibir_grade_navegador(indice_cards, linhas_filtradas, medicao_rerun)
+        st.fragment(exibir_grade, run_every=intervalo_grade)(
+            indice_cards, linhas_filtradas
+        )
 
 # Resumo geral
 st.sidebar.markdown("---")
 st.sidebar.subheader("📊 Resumo Geral")
 
-total_geral_produzido = df_processado['QTDAPONTADA'].sum()
-total_geral_objetivo = df_processado['TOTALSEMANA'].sum()
+total_geral_produzido = resumo_linhas['TOTAL_PRODUZIDO'].sum()
+total_geral_objetivo = resumo_linhas['TOTAL_OBJETIVO'].sum()
 perc_geral = (total_geral_produzido / total_geral_objetivo * 100) if total_geral_objetivo > 0 else 0
 
 # Estatísticas
-linhas_target = 0
-linhas_andamento = 0
-linhas_atencao = 0
-
-for linha in linhas_disponiveis:
-    dados_linha = df_processado[df_processado['LINHA'] == linha]
-    total_produzido = dados_linha['QTDAPONTADA'].sum()
-    total_objetivo = dados_linha['TOTALSEMANA'].sum()
-    percentual_linha = (total_produzido / total_objetivo * 100) if total_objetivo > 0 else 0
-    
-    if percentual_linha >= 90:
-        linhas_target += 1
-    elif percentual_linha >= 75:
-        linhas_andamento += 1
-    else:
-        linhas_atencao += 1
+linhas_por_faixa = contar_faixas(resumo_linhas)
+linhas_target = linhas_por_faixa['target']
+linhas_andamento = linhas_por_faixa['andamento']
+linhas_atencao = linhas_por_faixa['atencao']
 
 st.sidebar.metric("Total Produzido", f"{total_geral_produzido:,}")
 st.sidebar.metric("Meta Total", f"{total_geral_objetivo:,}")
@@ -896,14 +510,18 @@ st.sidebar.warning(f"**Em Andamento:** {linhas_andamento} linhas")
 st.sidebar.error(f"**Atenção:** {linhas_atencao} linhas")
 
 # Informações de sistema
-st.sidebar.markdown("---")
-st.sidebar.subheader("🔄 Status do Sistema")
+exibir_status_sistema()
 
-if st.session_state.auto_refresh:
-    current_time = time.time()
-    time_since_last_refresh = current_time - st.session_state.last_refresh_time
-    tempo_restante = max(0, st.session_state.refresh_interval - time_since_last_refresh)
-    st.sidebar.info(f"**⏱️ Próximo refresh em: {int(tempo_restante)}s**")
+diagnostico = st.sidebar.checkbox(
+    "📈 Diagnóstico de desempenho",
+    value=st.session_state.diagnostico,
+    help="Tempo por fase (p50/p95) das execuções, dos ciclos da grade e das atualizações de dados"
+)
+st.session_state.diagnostico = diagnostico
+if diagnostico:
+    # Fragmento próprio: os percentis acompanham os ciclos sem reexecutar o resto da barra lateral
+    with st.sidebar:
+        st.fragment(exibir_diagnostico, run_every=5)()
 
 # Legenda das cores
 st.sidebar.markdown("---")
@@ -914,3 +532,6 @@ st.sidebar.markdown("""
 - **🟡 Amarelo**: Em Andamento (50-69%)
 - **🔴 Vermelho**: Atenção (<50%)
 """)
+
+# Tempo total e fases desta execução no registro de desempenho
+registrar_medicao(medicao_rerun)
@@ -0,0 +1,128 @@
+"""buscar_csv contra um servidor HTTP local no lugar do raw.githubusercontent.com"""
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+import requests
+
+from dashcore import fonte_github
+from dashcore.fonte_github import buscar_csv
+
+CSV = b'SEMANA_LABEL;LINHA\n2025-47;VINAGRE 500 1\n'
+ETAG = '"abc123"'
+LAST_MODIFIED = 'Wed, 19 Nov 2025 10:00:00 GMT'
+
+class ServidorCSV:
+    """Responde a cada GET com o próximo status da fila (200 quando acaba) e anota as requisições"""
+
+    def __init__(self):
+        self.respostas = []
+        self.requisicoes = []  # (porta do cliente, cabeçalhos)
+        self.atraso = 0
+        servidor = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = 'HTTP/1.1'  # keep-alive
+
+            def do_GET(self):
+                servidor.requisicoes.append((self.client_address[1], dict(self.headers)))
+                time.sleep(servidor.atraso)
+                status = servidor.respostas.pop(0) if servidor.respostas else 200
+                corpo = CSV if status == 200 else b''
+                self.send_response(status)
+                self.send_header('Content-Length', str(len(corpo)))
+                self.send_header('ETag', ETAG)
+                self.send_header('Last-Modified', LAST_MODIFIED)
+                self.end_headers()
+                self.wfile.write(corpo)
+
+            def log_message(self, *args):
+                pass
+
+        self.http = ThreadingHTTPServer(('127.0.0.1', 0), Handler)
+        self.url = f"http://127.0.0.1:{self.http.server_address[1]}/dados.csv"
+        threading.Thread(target=self.http.serve_forever, daemon=True).start()
+
+    def encerrar(self):
+        self.http.shutdown()
+        self.http.server_close()
+
+@pytest.fixture
+def servidor(monkeypatch):
+    monkeypatch.setattr(fonte_github, 'ESPERA_BASE', 0)  # sem backoff entre tentativas
+    servidor = ServidorCSV()
+    yield servidor
+    servidor.encerrar()
+
+@pytest.fixture
+def sessao():
+    with requests.Session() as sessao:
+        yield sessao
+
+def test_status_temporario_e_repetido(servidor, sessao):
+    servidor.respostas = [503, 503]
+    status, conteudo, validadores, metricas = buscar_csv(servidor.url, sessao=sessao)
+    assert status == 200
+    assert conteudo == CSV
+    assert metricas['tentativas'] == 3
+    assert len(servidor.requisicoes) == 3
+    assert validadores == {'etag': ETAG, 'last_modified': LAST_MODIFIED}
+
+def test_desiste_depois_das_tentativas(servidor, sessao):
+    servidor.respostas = [503, 503, 503]
+    status, conteudo, _, metricas = buscar_csv(servidor.url, sessao=sessao)
+    assert status == 503
+    assert conteudo is None
+    assert metricas['tentativas'] == 3
+
+def test_reaproveita_a_conexao(servidor, sessao):
+    servidor.respostas = [503]
+    buscar_csv(servidor.url, sessao=sessao)
+    buscar_csv(servidor.url, sessao=sessao)
+    portas = {porta for porta, _ in servidor.requisicoes}
+    assert len(servidor.requisicoes) == 3
+    assert len(portas) == 1
+
+def test_reaproveita_a_conexao_depois_de_304(servidor, sessao):
+    validadores = buscar_csv(servidor.url, sessao=sessao)[2]
+    servidor.respostas = [304, 304]
+    buscar_csv(servidor.url, validadores, sessao=sessao)
+    buscar_csv(servidor.url, validadores, sessao=sessao)
+    assert len({porta for porta, _ in servidor.requisicoes}) == 1
+
+def test_timeout_de_leitura(servidor, sessao):
+    servidor.atraso = 1
+    with pytest.raises(requests.exceptions.ReadTimeout):
+        buscar_csv(servidor.url, sessao=sessao, timeout=(1, 0.2), tentativas=1)
+
+def test_timeout_de_leitura_e_repetido(servidor, sessao):
+    servidor.atraso = 0.5
+    with pytest.raises(requests.exceptions.ReadTimeout):
+        buscar_csv(servidor.url, sessao=sessao, timeout=(1, 0.2), tentativas=2)
+    assert len(servidor.requisicoes) == 2
+
+def test_requisicao_condicional_304(servidor, sessao):
+    validadores = {'etag': ETAG, 'last_modified': LAST_MODIFIED}
+    servidor.respostas = [304]
+    status, conteudo, novos_validadores, metricas = buscar_csv(servidor.url, validadores, sessao=sessao)
+    assert status == 304
+    assert conteudo is None
+    assert novos_validadores == validadores
+    assert metricas['bytes'] == 0
+    _, cabecalhos = servidor.requisicoes[0]
+    assert cabecalhos['If-None-Match'] == ETAG
+    assert cabecalhos['If-Modified-Since'] == LAST_MODIFIED
+
+def test_primeira_busca_sem_cabecalhos_condicionais(servidor, sessao):
+    buscar_csv(servidor.url, sessao=sessao)
+    _, cabecalhos = servidor.requisicoes[0]
+    assert 'If-None-Match' not in cabecalhos
+    assert 'If-Modified-Since' not in cabecalhos
+
+def test_corpo_grande_vai_para_mmap(servidor, sessao, monkeypatch):
+    monkeypatch.setattr(fonte_github, 'LIMITE_EM_MEMORIA', 16)
+    status, conteudo, _, metricas = buscar_csv(servidor.url, sessao=sessao)
+    assert status == 200
+    assert conteudo[:] == CSV
+    assert metricas['bytes'] == len(CSV)